@@ -0,0 +1,123 @@
+"""Benchmark: Frame-Quality-Gate (Stichprobenraster) gegen die bisherige Vollbild-Variante.
+
+Aufruf aus dem sidecar-Verzeichnis:
+
+    python -m benchmarks.frame_quality_gate [--repeat 20]
+
+Erzeugt einen synthetischen Referenzsatz (schwarz, ueberbelichtet, uniform,
+dunkel texturiert, unscharf, verrauscht, Rohr-Szenen in 3 Aufloesungen),
+prueft, dass beide Varianten dieselben Entscheidungen treffen, und misst die
+Laufzeit je Frame.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+from scipy.ndimage import gaussian_filter, uniform_filter
+
+from sidecar.config import settings
+from sidecar.models import frame_quality
+
+SIZES = [(1080, 1920), (720, 1280), (576, 720)]
+
+
+def legacy_is_frame_usable(img_array: np.ndarray) -> tuple[bool, str]:
+    """Bisherige Implementierung (float32-Vollbild + scipy.ndimage.laplace)."""
+    from scipy.ndimage import laplace
+
+    arr = np.array(img_array, dtype=np.float32)
+    gray = arr.mean(axis=2)
+    mean_brightness = gray.mean()
+    std_brightness = gray.std()
+    if mean_brightness < settings.frame_min_brightness:
+        return False, "too_dark"
+    if mean_brightness > settings.frame_max_brightness:
+        return False, "too_bright"
+    if std_brightness < settings.frame_min_std:
+        return False, "too_uniform"
+    if laplace(gray).var() < settings.frame_min_edge_var:
+        return False, "too_blurry"
+    return True, "ok"
+
+
+def _rgb(gray: np.ndarray) -> np.ndarray:
+    gray = np.clip(gray, 0, 255).astype(np.uint8)
+    return np.stack([gray, gray, gray], axis=2)
+
+
+def _pipe(h: int, w: int, rng: np.random.Generator, brightness: float, noise: float) -> np.ndarray:
+    """Rohrblick: heller Rand, dunkler Fluchtpunkt, Muffenringe, Rauschen."""
+    yy, xx = np.mgrid[0:h, 0:w]
+    r = np.hypot((yy - h / 2) / (h / 2), (xx - w / 2) / (w / 2))
+    gray = brightness * (0.3 + 0.7 * np.clip(r, 0, 1))
+    gray += 25 * (np.sin(r * 40) > 0.95)
+    gray += rng.normal(0, noise, (h, w))
+    color = _rgb(gray).astype(np.int16)
+    color[..., 0] += 12  # braeunlicher Stich
+    color[..., 2] -= 8
+    return np.clip(color, 0, 255).astype(np.uint8)
+
+
+def reference_frames(sizes=SIZES, seed: int = 0) -> list[tuple[str, np.ndarray]]:
+    rng = np.random.default_rng(seed)
+    frames: list[tuple[str, np.ndarray]] = []
+    for h, w in sizes:
+        tag = f"{w}x{h}"
+        noise = rng.normal(0, 1, (h, w))
+        checker = (np.indices((h, w)).sum(axis=0) % 2) * 10 + 2
+        frames += [
+            (f"{tag} black", np.zeros((h, w, 3), np.uint8)),
+            (f"{tag} lens cap", _rgb(1.5 + noise)),
+            (f"{tag} white", np.full((h, w, 3), 255, np.uint8)),
+            (f"{tag} overexposed", _rgb(252 + noise)),
+            (f"{tag} uniform", np.full((h, w, 3), 100, np.uint8)),
+            (f"{tag} uniform + sensor noise", _rgb(100 + 0.6 * noise)),
+            (f"{tag} dark checkerboard", _rgb(checker)),
+            (f"{tag} smooth gradient", _rgb(np.tile(np.linspace(40, 200, w), (h, 1)))),
+            (f"{tag} heavy blur", _rgb(120 + gaussian_filter(noise, 12) * 400)),
+            (f"{tag} motion blur", _rgb(uniform_filter(120 + 40 * noise, size=(1, 41)))),
+            (f"{tag} sharp texture", _rgb(120 + 30 * noise)),
+        ]
+        for brightness, pipe_noise in [(25, 3), (90, 6), (180, 2), (60, 0.5)]:
+            frames.append((f"{tag} pipe b={brightness} n={pipe_noise}", _pipe(h, w, rng, brightness, pipe_noise)))
+    return frames
+
+
+def _time_per_frame(fn, frames: list[np.ndarray], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            fn(frame)
+    return (time.perf_counter() - started) * 1000 / (repeat * len(frames))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = reference_frames()
+    mismatches = 0
+    print(f"{'frame':44s} {'legacy':12s} {'gate':12s}")
+    for name, frame in frames:
+        legacy = legacy_is_frame_usable(frame)[1]
+        current = frame_quality.assess_frame(frame).reason
+        mismatches += legacy != current
+        marker = "" if legacy == current else "  <-- MISMATCH"
+        print(f"{name:44s} {legacy:12s} {current:12s}{marker}")
+
+    arrays = [frame for _, frame in frames]
+    legacy_ms = _time_per_frame(legacy_is_frame_usable, arrays, args.repeat)
+    gate_ms = _time_per_frame(frame_quality.assess_frame, arrays, args.repeat)
+    print()
+    print(f"frames: {len(frames)}  mismatches: {mismatches}")
+    print(f"legacy: {legacy_ms:8.2f} ms/frame")
+    print(f"gate:   {gate_ms:8.2f} ms/frame  ({legacy_ms / gate_ms:.1f}x)")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
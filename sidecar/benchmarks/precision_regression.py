@@ -0,0 +1,159 @@
+"""Benchmark: DINO-Boxen und SAM-Masken in reduzierter Praezision gegen FP32.
+
+Aufruf aus dem sidecar-Verzeichnis:
+
+    python -m benchmarks.precision_regression --precision bf16 --device cpu
+    python -m benchmarks.precision_regression --precision fp16 --device cuda:0 --models sam
+
+Jedes Modell wird einmal geladen und auf einem festen, synthetischen
+Referenzsatz (Rohr-Szenen und Texturen aus benchmarks.frame_quality_gate,
+Seed 0) in FP32 ausgewertet, dann per precision.prepare_model umgestellt und
+erneut ausgewertet. Berichtet werden Masken-IoU je Box (SAM), Box-IoU der
+besten Zuordnung und Recall@0.5 (DINO) sowie die Laufzeit je Frame.
+Fehlen Gewichte oder Pakete, wird das Modell uebersprungen.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.frame_quality_gate import reference_frames
+from sidecar.config import settings
+from sidecar.models import dino_wrapper, precision, sam_wrapper
+from sidecar.models.box_utils import box_iou
+from sidecar.models.mask_utils import mask_iou
+
+SIZES = [(480, 640), (720, 1280)]
+
+# SAM-Prompts relativ zur Bildgroesse (x1, y1, x2, y2)
+RELATIVE_BOXES = [(0.1, 0.1, 0.45, 0.5), (0.35, 0.3, 0.7, 0.8), (0.55, 0.05, 0.95, 0.6)]
+
+
+def benchmark_frames(frames: int) -> list[tuple[str, np.ndarray]]:
+    """Rohr-Szenen und scharfe Texturen; uniforme/leere Frames sind fuer IoU wertlos."""
+    selected = [
+        (name, frame)
+        for name, frame in reference_frames(sizes=SIZES)
+        if "pipe" in name or "sharp texture" in name
+    ]
+    return selected[:frames]
+
+
+def _timed(fn, frames: list[np.ndarray]) -> tuple[list, float]:
+    started = time.perf_counter()
+    outputs = [fn(frame) for frame in frames]
+    return outputs, (time.perf_counter() - started) * 1000 / len(frames)
+
+
+def _sam_boxes(frame: np.ndarray) -> list[tuple[float, float, float, float]]:
+    h, w = frame.shape[:2]
+    return [(x1 * w, y1 * h, x2 * w, y2 * h) for x1, y1, x2, y2 in RELATIVE_BOXES]
+
+
+def compare_sam(frames: list[np.ndarray], target: str, device: str) -> dict:
+    settings.sam_precision = "fp32"
+    model, predictor = sam_wrapper._load_sam_on(device)
+
+    def run(frame):
+        embedding = sam_wrapper._embed_images(predictor, [frame])[0]
+        sam_wrapper._use_embedding(predictor, embedding)
+        return sam_wrapper._predict_boxes(predictor, _sam_boxes(frame))
+
+    reference, fp32_ms = _timed(run, frames)
+    settings.sam_precision = target
+    active = precision.prepare_model("sam", model, device)
+    candidate, target_ms = _timed(run, frames)
+
+    ious, score_diffs = [], []
+    for ref, cand in zip(reference, candidate):
+        if ref is None or cand is None:
+            continue
+        for ref_mask, cand_mask in zip(ref[0], cand[0]):
+            ious.append(mask_iou(ref_mask, cand_mask))
+        score_diffs.extend(np.abs(ref[1] - cand[1]).tolist())
+    return {
+        "precision": active,
+        "pairs": len(ious),
+        "mean_iou": float(np.mean(ious)) if ious else 0.0,
+        "min_iou": float(np.min(ious)) if ious else 0.0,
+        "max_score_diff": max(score_diffs, default=0.0),
+        "fp32_ms": fp32_ms,
+        "target_ms": target_ms,
+    }
+
+
+def _xyxy(prediction, frame: np.ndarray) -> list[tuple[float, float, float, float]]:
+    if prediction is None:
+        return []
+    h, w = frame.shape[:2]
+    return [
+        ((cx - bw / 2) * w, (cy - bh / 2) * h, (cx + bw / 2) * w, (cy + bh / 2) * h)
+        for cx, cy, bw, bh in prediction[0].tolist()
+    ]
+
+
+def compare_dino(frames: list[np.ndarray], target: str, device: str) -> dict:
+    settings.dino_precision = "fp32"
+    model, _ = dino_wrapper._load_dino_on(device)
+    thresholds = [(0.30, 0.25)]
+
+    def run(frame):
+        return dino_wrapper._predict_many(model, [frame], settings.dino_labels, thresholds)[0]
+
+    reference, fp32_ms = _timed(run, frames)
+    settings.dino_precision = target
+    active = precision.prepare_model("dino", model, device)
+    dino_wrapper._clear_text_caches()  # Text-Features in FP32 nicht wiederverwenden
+    candidate, target_ms = _timed(run, frames)
+
+    best_ious, ref_count, cand_count = [], 0, 0
+    for frame, ref, cand in zip(frames, reference, candidate):
+        ref_boxes, cand_boxes = _xyxy(ref, frame), _xyxy(cand, frame)
+        ref_count += len(ref_boxes)
+        cand_count += len(cand_boxes)
+        for box in ref_boxes:
+            best_ious.append(max((box_iou(box, other) for other in cand_boxes), default=0.0))
+    return {
+        "precision": active,
+        "pairs": len(best_ious),
+        "mean_iou": float(np.mean(best_ious)) if best_ious else 1.0,
+        "recall_at_0_5": float(np.mean([iou >= 0.5 for iou in best_ious])) if best_ious else 1.0,
+        "boxes_fp32": ref_count,
+        "boxes_target": cand_count,
+        "fp32_ms": fp32_ms,
+        "target_ms": target_ms,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--precision", default="bf16", choices=precision.PRECISIONS)
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--models", default="sam,dino")
+    parser.add_argument("--frames", type=int, default=6)
+    parser.add_argument("--min-iou", type=float, default=0.9)
+    args = parser.parse_args()
+
+    frames = [frame for _, frame in benchmark_frames(args.frames)]
+    comparisons = {"sam": compare_sam, "dino": compare_dino}
+    failed = False
+    for name in (part.strip() for part in args.models.split(",") if part.strip()):
+        try:
+            result = comparisons[name](frames, args.precision, args.device)
+        except (ImportError, FileNotFoundError) as exc:
+            print(f"{name}: skipped ({exc})")
+            continue
+        ok = result["mean_iou"] >= args.min_iou
+        failed |= not ok
+        print(f"{name} ({result.pop('precision')} vs fp32 on {args.device}, {len(frames)} frames)")
+        for key, value in result.items():
+            print(f"  {key:16s} {value:.4f}" if isinstance(value, float) else f"  {key:16s} {value}")
+        print(f"  {'verdict':16s} {'ok' if ok else 'REGRESSION'}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,76 @@
+"""Benchmark: JPEG-Dekodieren in voller Aufloesung gegen reduziertes Dekodieren (draft).
+
+Aufruf aus dem sidecar-Verzeichnis:
+
+    python -m benchmarks.reduced_decode [--repeat 20] [--quality 90]
+
+Kodiert die Rohr-Frames aus benchmarks.frame_quality_gate (plus ein 4K-Frame)
+als JPEG und dekodiert sie ueber image_decode.decode_image_bytes einmal ohne
+und einmal mit der Ziel-Groesse von YOLO (detect_decode_size), YOLO-cls (224)
+und DINO (_working_size). Berichtet werden ms/Frame und die dekodierte Groesse.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import time
+
+import numpy as np
+from PIL import Image
+
+from benchmarks.frame_quality_gate import reference_frames
+from sidecar.config import settings
+from sidecar.models import dino_wrapper, yolo_wrapper
+from sidecar.models.image_decode import DecodeSize, decode_image_bytes, short_side_size
+
+SIZES = [(720, 1280), (1080, 1920), (2160, 3840)]
+
+
+def jpeg_frames(quality: int) -> list[tuple[str, bytes]]:
+    frames = []
+    for name, frame in reference_frames(sizes=SIZES):
+        if "pipe" not in name:
+            continue
+        buf = io.BytesIO()
+        Image.fromarray(frame).save(buf, format="JPEG", quality=quality)
+        frames.append((name, buf.getvalue()))
+    return frames
+
+
+def decode_ms(raw: bytes, min_size: DecodeSize | None, repeat: int) -> tuple[float, tuple[int, int]]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        img = np.asarray(decode_image_bytes(
+            raw,
+            max_bytes=len(raw),
+            max_pixels=settings.max_image_pixels,
+            min_size=min_size,
+        ))
+    return (time.perf_counter() - started) * 1000 / repeat, (img.shape[1], img.shape[0])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--quality", type=int, default=90)
+    args = parser.parse_args()
+
+    targets: list[tuple[str, DecodeSize | None]] = [
+        ("full", None),
+        (f"yolo {settings.yolo_imgsz}", yolo_wrapper.detect_decode_size),
+        ("yolo-cls 224", lambda w, h: short_side_size(w, h, 224)),
+        ("dino", dino_wrapper._working_size),
+    ]
+    print(f"repeat: {args.repeat}  jpeg quality: {args.quality}")
+    for name, raw in jpeg_frames(args.quality):
+        full_ms = None
+        for label, min_size in targets:
+            ms, size = decode_ms(raw, min_size, args.repeat)
+            full_ms = full_ms or ms
+            print(f"{name:32s} {label:12s} {ms:8.1f} ms  {size[0]}x{size[1]}  ({full_ms / ms:.2f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,98 @@
+"""Benchmark: YOLO auf der CPU – ONNX Runtime gegen PyTorch (Ultralytics) auf denselben Frames.
+
+Aufruf aus dem sidecar-Verzeichnis (Gewichte und ONNX-Export in models/):
+
+    python -m benchmarks.yolo_cpu_backends [--repeat 5] [--intra-op 4] [--int8]
+
+Beide Backends werden ueber yolo_wrapper._load_yolo_on("cpu") geladen (einmal
+mit yolo_cpu_backend=pytorch, einmal mit onnxruntime) und mit
+yolo_wrapper._predict_many auf dem Rohr-Referenzsatz aus
+benchmarks.frame_quality_gate ausgewertet. Berichtet werden ms/Frame und die
+Uebereinstimmung der Detektionen (Recall@0.5 der PyTorch-Boxen, gleiche Klasse).
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.frame_quality_gate import reference_frames
+from sidecar.config import settings
+from sidecar.models import yolo_wrapper
+from sidecar.models.box_utils import box_iou
+
+SIZES = [(720, 1280), (576, 720)]
+
+
+def benchmark_frames() -> list[np.ndarray]:
+    return [frame for name, frame in reference_frames(sizes=SIZES) if "pipe" in name or "texture" in name]
+
+
+def run_backend(backend: str, frames: list[np.ndarray], conf: float, repeat: int) -> tuple[list, float]:
+    settings.yolo_cpu_backend = backend
+    model, _ = yolo_wrapper._load_yolo_on("cpu")
+    yolo_wrapper._predict_many(model, frames[:1], conf)  # Warm-up
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        detections = [
+            yolo_wrapper._detections_from_result(yolo_wrapper._predict_many(model, [frame], conf)[0])
+            for frame in frames
+        ]
+    return detections, (time.perf_counter() - started) * 1000 / (repeat * len(frames))
+
+
+def agreement(reference: list, candidate: list) -> tuple[float, int, int]:
+    """Anteil der Referenz-Boxen mit IoU >= 0.5 und gleicher Klasse im Kandidaten."""
+    matched = total = candidate_total = 0
+    for ref_frame, cand_frame in zip(reference, candidate):
+        candidate_total += len(cand_frame)
+        for ref in ref_frame:
+            total += 1
+            matched += any(
+                cand.class_name == ref.class_name
+                and box_iou((ref.x1, ref.y1, ref.x2, ref.y2), (cand.x1, cand.y1, cand.x2, cand.y2)) >= 0.5
+                for cand in cand_frame
+            )
+    return (matched / total if total else 1.0), total, candidate_total
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--conf", type=float, default=settings.yolo_confidence)
+    parser.add_argument("--intra-op", type=int, default=settings.onnx_intra_op_threads)
+    parser.add_argument("--inter-op", type=int, default=settings.onnx_inter_op_threads)
+    parser.add_argument("--graph-optimization", default=settings.onnx_graph_optimization)
+    parser.add_argument("--int8", action="store_true", help="INT8-quantisierte ONNX-Gewichte")
+    args = parser.parse_args()
+
+    settings.onnx_intra_op_threads = args.intra_op
+    settings.onnx_inter_op_threads = args.inter_op
+    settings.onnx_graph_optimization = args.graph_optimization
+    settings.onnx_quantize_int8 = args.int8
+
+    frames = benchmark_frames()
+    try:
+        torch_detections, torch_ms = run_backend("pytorch", frames, args.conf, args.repeat)
+        onnx_detections, onnx_ms = run_backend("onnxruntime", frames, args.conf, args.repeat)
+    except (ImportError, FileNotFoundError) as exc:
+        print(f"skipped: {exc}")
+        return 0
+
+    recall, reference_boxes, onnx_boxes = agreement(torch_detections, onnx_detections)
+    print(f"frames: {len(frames)}  imgsz: {settings.yolo_imgsz}  repeat: {args.repeat}")
+    print(
+        f"onnxruntime: intra_op={args.intra_op or 'default'} inter_op={args.inter_op or 'default'} "
+        f"graph={args.graph_optimization} int8={args.int8}"
+    )
+    print(f"pytorch:     {torch_ms:8.1f} ms/frame  ({reference_boxes} boxes)")
+    print(f"onnxruntime: {onnx_ms:8.1f} ms/frame  ({onnx_boxes} boxes, {torch_ms / onnx_ms:.2f}x)")
+    print(f"recall@0.5 vs pytorch: {recall:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,236 @@
+"""Dynamic micro-batching – coalesces concurrent single-frame requests per model slot.
+
+Requests for the same slot are collected for a short window (``batch_window_ms``)
+or until ``batch_max_size`` items are pending, then executed together in one
+``run_batch`` call on a dedicated worker thread. Callers block on a future and
+receive their own result together with the measured queue wait.
+
+Every batch runs under the slot's ``inference_lock``, also when batching is
+disabled and ``run_batch`` executes inline on the caller's executor thread.
+Predict paths outside the batcher (batch endpoints, warm-up) take the same
+lock, so one model instance never runs two forward passes at once.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from . import timing
+from .config import settings
+from .gpu_manager import ModelSlot, gpu_manager
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+# Ein Lock je Modellinstanz: Ultralytics- und SAM-Predictoren sind nicht thread-safe
+_inference_locks: dict[str, threading.RLock] = {}
+_inference_locks_guard = threading.Lock()
+
+
+def inference_lock(slot: ModelSlot | str) -> threading.RLock:
+    """Lock serialising predict calls and predictor mutations on *slot*'s model."""
+    key = slot.value if isinstance(slot, ModelSlot) else str(slot)
+    with _inference_locks_guard:
+        return _inference_locks.setdefault(key, threading.RLock())
+
+
+@dataclass
+class BatchOutcome:
+    """Result of one item plus scheduling metadata."""
+    value: Any
+    queue_wait_ms: float
+    batch_size: int
+    batch_time_ms: float
+    stages_ms: dict[str, float] = field(default_factory=dict)  # Stufen des gesamten Batches
+
+
+@dataclass
+class _Pending:
+    item: Any
+    future: Future
+    enqueued_at: float
+
+
+class MicroBatcher:
+    """Collects items for one model slot and runs them as a batch.
+
+    *run_batch* receives the list of items and must return one output per
+    item in the same order. Exceptions are fanned out to every caller of the
+    batch. Window and batch size are read from settings at collection time
+    unless fixed explicitly (tests, special slots).
+    """
+
+    def __init__(
+        self,
+        slot: ModelSlot,
+        run_batch: Callable[[list[Any]], list[Any]],
+        *,
+        window_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None,
+    ) -> None:
+        self.slot = slot
+        self._run_batch = run_batch
+        self._window_ms = window_ms
+        self._max_batch_size = max_batch_size
+        self._queue: queue.Queue = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+
+    # ── Public API ──────────────────────────────────────────────────────
+
+    def submit(self, item: Any) -> Future:
+        """Queue *item* and return a future resolving to a BatchOutcome."""
+        future: Future = Future()
+        if not settings.batching_enabled:
+            self._execute([_Pending(item, future, time.perf_counter())])
+            return future
+
+        self._ensure_worker()
+        self._queue.put(_Pending(item, future, time.perf_counter()))
+        return future
+
+    def run(self, item: Any) -> BatchOutcome:
+        """Submit *item* and wait for its outcome (re-raises batch errors).
+
+        Queue wait and the stages measured for the whole batch are added to
+        the caller's request timing.
+        """
+        outcome = self.submit(item).result()
+        timing.add("queue", outcome.queue_wait_ms)
+        timing.merge(outcome.stages_ms)
+        return outcome
+
+    def stats(self) -> dict:
+        return {
+            "batches": self._batches,
+            "items": self._items,
+            "largest_batch": self._largest_batch,
+            "window_ms": self._current_window_ms(),
+            "max_batch_size": self._current_max_batch_size(),
+        }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Stop the worker thread after draining pending items."""
+        with self._start_lock:
+            worker = self._worker
+            if worker is None:
+                return
+            self._queue.put(_STOP)
+            self._worker = None
+        worker.join(timeout)
+
+    # ── Internal ────────────────────────────────────────────────────────
+
+    def _current_window_ms(self) -> float:
+        if self._window_ms is not None:
+            return self._window_ms
+        return max(0.0, float(settings.batch_window_ms))
+
+    def _current_max_batch_size(self) -> int:
+        if self._max_batch_size is not None:
+            return self._max_batch_size
+        configured = getattr(settings, f"{self.slot.value}_batch_max_size", 1)
+        return max(1, int(configured))
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._start_lock:
+            if self._worker is not None:
+                return
+            self._worker = threading.Thread(
+                target=self._loop,
+                name=f"batcher-{self.slot.value}",
+                daemon=True,
+            )
+            self._worker.start()
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+
+            batch = [first]
+            stop_after = False
+            max_size = self._current_max_batch_size()
+            deadline = first.enqueued_at + self._current_window_ms() / 1000
+            while len(batch) < max_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if pending is _STOP:
+                    stop_after = True
+                    break
+                batch.append(pending)
+
+            self._execute(batch)
+            if stop_after:
+                return
+
+    def _execute(self, batch: list[_Pending]) -> None:
+        # Wartezeit auf den Lock zaehlt als Queue-Wartezeit, nicht als Batch-Zeit
+        with inference_lock(self.slot):
+            self._execute_locked(batch)
+
+    def _execute_locked(self, batch: list[_Pending]) -> None:
+        started = time.perf_counter()
+        try:
+            # Slot als belegt markieren: das VRAM-Budget verdraengt ihn nicht mitten im Batch
+            with gpu_manager.in_use(self.slot), timing.track(f"{self.slot.value}_batch") as batch_timing:
+                outputs = self._run_batch([pending.item for pending in batch])
+            if len(outputs) != len(batch):
+                raise RuntimeError(
+                    f"{self.slot.value} batch returned {len(outputs)} results for {len(batch)} items"
+                )
+        except BaseException as exc:
+            logger.debug("Batch for %s failed: %s", self.slot.value, exc)
+            for pending in batch:
+                pending.future.set_exception(exc)
+            return
+
+        batch_time_ms = (time.perf_counter() - started) * 1000
+        self._batches += 1
+        self._items += len(batch)
+        self._largest_batch = max(self._largest_batch, len(batch))
+
+        for pending, value in zip(batch, outputs):
+            pending.future.set_result(BatchOutcome(
+                value=value,
+                queue_wait_ms=(started - pending.enqueued_at) * 1000,
+                batch_size=len(batch),
+                batch_time_ms=batch_time_ms,
+                stages_ms=batch_timing.stages_ms,
+            ))
+
+
+# Registry: ein Batcher pro Slot (fuer /health und Shutdown)
+_batchers: dict[ModelSlot, MicroBatcher] = {}
+
+
+def register(batcher: MicroBatcher) -> MicroBatcher:
+    _batchers[batcher.slot] = batcher
+    return batcher
+
+
+def get_status() -> dict:
+    return {slot.value: batcher.stats() for slot, batcher in _batchers.items()}
+
+
+def shutdown_all() -> None:
+    for batcher in list(_batchers.values()):
+        batcher.shutdown()
@@ -0,0 +1,93 @@
+"""Thread-safe LRU cache with a byte budget (decoded frames, embeddings, ...)."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class ByteBudgetLRU:
+    """Least-recently-used cache bounded by total byte size and entry count.
+
+    Entries larger than the whole budget are not stored. Hit/miss/eviction
+    counters are kept for /health and /metrics.
+    """
+
+    def __init__(self, max_bytes: int, max_entries: Optional[int] = None) -> None:
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value (marking it recently used) or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size_bytes: int) -> bool:
+        """Store *value*; evicts least-recently-used entries until it fits."""
+        size_bytes = max(0, int(size_bytes))
+        if size_bytes > self.max_bytes:
+            return False
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+
+            while self._entries and (
+                self._bytes + size_bytes > self.max_bytes
+                or (self.max_entries is not None and len(self._entries) >= self.max_entries)
+            ):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+            self._entries[key] = (value, size_bytes)
+            self._bytes += size_bytes
+            return True
+
+    def pop(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            self._bytes -= entry[1]
+            return entry[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
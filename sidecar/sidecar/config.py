@@ -14,12 +14,26 @@ class SidecarSettings(BaseSettings):
     auth_token: str = ""
     telemetry_enabled: bool = True
     telemetry_dir: str = ""
+    # Hintergrund-Writer: Requests legen Events nur in die Queue, ist sie voll, wird verworfen
+    telemetry_queue_size: int = 10_000
+    telemetry_flush_interval_sec: float = 1.0
+    telemetry_flush_batch: int = 500
+    telemetry_rotate_mb: float = 64.0  # 0 = keine groessenbasierte Rotation
+    telemetry_rotate_daily: bool = True  # neue Datei je UTC-Tag
+    telemetry_compress_rotated: bool = True  # rotierte Dateien als .jsonl.gz
+    telemetry_keep_rotated: int = 30  # aelteste rotierte Dateien loeschen, 0 = alle behalten
+    metrics_enabled: bool = True  # Latenz-Histogramme und Zaehler fuer /metrics
 
     # Training export sandbox. output_dir in /training/export-yolo must stay inside this root.
     training_export_root: str = "./training_export"
     training_max_image_bytes: int = 25 * 1024 * 1024
     inference_max_image_bytes: int = 25 * 1024 * 1024
     max_image_pixels: int = 50_000_000
+    # JPEGs fuer YOLO/DINO per DCT-Skalierung (draft) nur so gross dekodieren, wie das Modell braucht
+    reduced_decode_enabled: bool = True
+    # /images: dekodierte RGB-Frames, per image_id wiederverwendbar (YOLO -> DINO -> SAM)
+    image_cache_max_bytes: int = 512 * 1024 * 1024
+    images_max_concurrency: int = 2
 
     # Per-model device overrides (empty = fallback to gpu_device)
     yolo_device: str = ""
@@ -38,12 +52,68 @@ class SidecarSettings(BaseSettings):
     def effective_sam_device(self) -> str:
         return self.sam_device if self.sam_device else self.gpu_device
 
+    # Rechengenauigkeit DINO/SAM: fp32 | fp16 | bf16 | autocast (YOLO: FP16 ueber TensorRT-Engine)
+    dino_precision: str = "fp32"
+    sam_precision: str = "fp32"
+
+    # Beim Start parallel im Hintergrund laden, z.B. "yolo,dino,sam" (leer = erst beim ersten Request)
+    preload_models: str = ""
+
+    # VRAM-Budget fuer residente Modelle (0 = unbegrenzt, alle Slots bleiben geladen).
+    # Ueberschreitet ein Ladevorgang das Budget, werden die am laengsten ungenutzten
+    # Slots entladen ("unload") oder in den RAM verschoben ("offload").
+    vram_budget_gb: float = 0.0
+    vram_eviction_mode: str = "unload"
+    vram_pinned_slots: str = ""  # z.B. "yolo" -> nie verdraengen
+
+    # Slots nach so vielen Sekunden ohne Request entladen (0 = nie); naechster Request laedt neu
+    yolo_idle_timeout_sec: float = 0.0
+    dino_idle_timeout_sec: float = 0.0
+    sam_idle_timeout_sec: float = 0.0
+    idle_reaper_interval_sec: float = 30.0
+
+    # GPU-Auslastung/VRAM im Hintergrund abfragen (NVML, sonst nvidia-smi)
+    gpu_metrics_enabled: bool = True
+    gpu_metrics_interval_sec: float = 1.0
+
+    # Inferenz-Executor pro Slot (blockierender Code laeuft nie im Event-Loop).
+    # Workers >= <slot>_batch_max_size, damit der Micro-Batcher buendeln kann.
+    yolo_max_concurrency: int = 8
+    dino_max_concurrency: int = 4
+    sam_max_concurrency: int = 2
+    classify_max_concurrency: int = 2
+    training_max_concurrency: int = 1
+    quality_max_concurrency: int = 4  # /quality/check: nur Dekodierung + Gate, kein Modell
+    slot_max_queue: int = 32        # wartende Aufrufe pro Slot, danach 503 + Retry-After
+    busy_retry_after_sec: int = 1
+
+    # Micro-Batching: gleichzeitige Einzel-Requests pro Slot zu einem Forward-Pass buendeln
+    batching_enabled: bool = True
+    batch_window_ms: float = 10.0  # Sammelfenster ab dem ersten wartenden Request
+    yolo_batch_max_size: int = 8
+    dino_batch_max_size: int = 4
+    sam_batch_max_size: int = 2    # ViT-H-Encoder ist VRAM-hungrig
+
     # YOLO
     yolo_confidence: float = 0.25
     yolo_imgsz: int = 1280  # Inferenz-Aufloesung: 1280 statt Default 640 -> kleine Schaeden besser sichtbar
     yolo_model_name: str = "yolo26m.pt"
     yolo_cls_model_path: str = ""
+    # Klassifikator auf der CPU: "auto" = ONNX Runtime, wenn <name>.onnx neben den Gewichten
+    # liegt; "onnxruntime" exportiert bei Bedarf; "pytorch" = Ultralytics wie bisher
+    yolo_cls_backend: str = "auto"
+    yolo_cls_quantize_int8: bool = False  # dynamische INT8-Gewichte (<name>.int8.onnx)
+    yolo_cls_batch_max_frames: int = 64  # Obergrenze fuer /classify/yolo/batch
     require_custom_yolo: bool = False
+    # CPU-Pfad: "auto" = ONNX Runtime, wenn ein .onnx-Export neben den Gewichten liegt,
+    # sonst PyTorch; "onnxruntime" erzwingt ONNX, "pytorch" das bisherige model.to("cpu")
+    yolo_cpu_backend: str = "auto"
+    yolo_onnx_model_name: str = ""  # leer = yolo_model_name mit Endung .onnx
+    onnx_intra_op_threads: int = 0  # 0 = ONNX-Runtime-Default (alle physischen Kerne)
+    onnx_inter_op_threads: int = 0  # > 0 schaltet parallele Graph-Ausfuehrung ein
+    onnx_graph_optimization: str = "all"  # disable | basic | extended | all
+    onnx_quantize_int8: bool = False  # <name>.int8.onnx nutzen (wird bei Bedarf erzeugt)
+    yolo_batch_max_frames: int = 32  # Obergrenze fuer /detect/yolo/batch (ein predict-Aufruf)
 
     # Frame-Quality-Gate (_is_frame_usable) -- env-konfigurierbar, entschaerft fuer
     # dunkle Kanaele: gueltige dunkle Frames mit Inhalt wurden frueher hart verworfen.
@@ -51,10 +121,23 @@ class SidecarSettings(BaseSettings):
     frame_max_brightness: float = 250.0  # frueher hart 245
     frame_min_std: float = 2.0           # frueher hart 5 -> Glattrohr nicht als "leer" verwerfen
     frame_min_edge_var: float = 1.0      # frueher hart 3 -> dunkle, aber scharfe Frames behalten
+    frame_quality_sample_side: int = 320  # Stichprobenraster: lange Seite ~320 Punkte (0 = Vollbild)
+    quality_batch_max_frames: int = 64    # Obergrenze fuer /quality/check/batch
+
+    # Standbild-Filter pro session_id: nahezu identische Folge-Frames -> letztes Ergebnis
+    dedup_enabled: bool = True
+    dedup_thumbnail_size: int = 16       # Vergleich auf 16x16-Graustufen-Thumbnail
+    dedup_max_mean_diff: float = 2.0     # mittlere Abweichung in Grauwerten (0-255)
+    dedup_max_reuse: int = 50            # spaetestens nach so vielen Wiederverwendungen neu analysieren
+    dedup_max_sessions: int = 64
 
     # Grounding DINO
     dino_box_threshold: float = 0.25
     dino_text_threshold: float = 0.20
+    # Arbeitsaufloesung wie im DINO-Training (kurze Seite 800, lange max. 1333)
+    dino_input_size: int = 800
+    dino_input_max_size: int = 1333
+    dino_batch_max_frames: int = 16  # Obergrenze fuer /detect/dino/batch (ein Forward-Pass)
     dino_labels: str = (
         "crack . fracture . break . deformation . "
         "corrosion . surface damage . erosion . "
@@ -69,9 +152,17 @@ class SidecarSettings(BaseSettings):
         "lateral connection . junction . inlet . branch . side opening . "
         "pipe bend . bend"
     )
+    # Tokenisierung + BERT-Textmerkmale je Prompt wiederverwenden (0 = aus)
+    dino_text_cache_size: int = 16
+    dino_text_cache_max_bytes: int = 64 * 1024 * 1024
 
     # SAM
     sam_model_type: str = "vit_h"
+    # Bild-Einbettungen (ViT-H: ~4 MB pro Frame) pro Frame-Hash wiederverwenden
+    sam_embedding_cache_max_bytes: int = 256 * 1024 * 1024
+    sam_embedding_cache_device: str = ""  # leer = auf dem SAM-Device (VRAM), "cpu" = im RAM
+    # Boxen je predict_torch-Aufruf; hochskalierte Masken (B, H, W) wachsen mit der Frame-Groesse
+    sam_max_boxes_per_call: int = 16
 
     model_config = {"env_prefix": "SEWER_SIDECAR_"}
 
@@ -0,0 +1,137 @@
+"""Bounded per-slot executors – keeps blocking inference off the asyncio event loop.
+
+Each model slot gets its own thread pool, so a long SAM segmentation cannot
+starve YOLO pre-screening or /health. When a slot already has
+``<slot>_max_concurrency`` running plus ``slot_max_queue`` waiting calls, new
+calls are rejected immediately with 503 and a Retry-After header.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+from . import timing
+from .config import settings
+from .gpu_manager import ModelSlot
+
+logger = logging.getLogger(__name__)
+
+
+class SlotExecutor:
+    """Thread pool with a hard limit on running + queued calls."""
+
+    def __init__(self, name: str, max_workers: int, max_queue: int) -> None:
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.capacity = self.max_workers + max(0, int(max_queue))
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix=f"infer-{name}",
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run *fn* on the slot's pool and await its result.
+
+        The caller's context variables are carried into the worker thread,
+        so stages recorded there land in the caller's request timing.
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"{self.name} slot busy",
+                    headers={"Retry-After": str(max(1, int(settings.busy_retry_after_sec)))},
+                )
+            self._in_flight += 1
+
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+
+        def call() -> Any:
+            timing.add("queue", (time.perf_counter() - submitted) * 1000)
+            return fn(*args, **kwargs)
+
+        try:
+            future = self._pool.submit(context.run, call)
+        except BaseException:
+            self._release()
+            raise
+        # Freigabe erst, wenn der Thread wirklich fertig ist (auch bei Client-Abbruch)
+        future.add_done_callback(lambda _: self._release())
+        result = await asyncio.wrap_future(future)
+        timing.mark_handler_done()
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "capacity": self.capacity,
+            "in_flight": self._in_flight,
+            "rejected": self._rejected,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+
+_executors: dict[str, SlotExecutor] = {}
+_registry_lock = threading.Lock()
+
+
+def _slot_name(slot: ModelSlot | str) -> str:
+    return slot.value if isinstance(slot, ModelSlot) else str(slot)
+
+
+def get_executor(slot: ModelSlot | str) -> SlotExecutor:
+    """Executor for *slot* (ModelSlot or auxiliary name like "training")."""
+    name = _slot_name(slot)
+    executor = _executors.get(name)
+    if executor is not None:
+        return executor
+    with _registry_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = SlotExecutor(
+                name,
+                max_workers=getattr(settings, f"{name}_max_concurrency", 1),
+                max_queue=settings.slot_max_queue,
+            )
+            _executors[name] = executor
+            logger.info(
+                "Executor %s: %d workers, capacity %d",
+                name, executor.max_workers, executor.capacity,
+            )
+        return executor
+
+
+async def run_in_slot(slot: ModelSlot | str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Dispatch blocking *fn* to the bounded executor of *slot*."""
+    return await get_executor(slot).run(fn, *args, **kwargs)
+
+
+def get_status() -> dict:
+    return {name: executor.stats() for name, executor in _executors.items()}
+
+
+def shutdown_all() -> None:
+    with _registry_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown()
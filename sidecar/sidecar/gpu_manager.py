@@ -7,8 +7,12 @@ import enum
 import time
 import threading
 import logging
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any, Callable, Tuple, Optional
+from typing import Any, Callable, Iterable, Iterator, Tuple, Optional
+
+from . import gpu_metrics
+from .config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -20,6 +24,9 @@ class ModelSlot(str, enum.Enum):
     SAM = "sam"
 
 
+_GB = 1024 ** 3
+
+
 @dataclass
 class SlotState:
     """State for a single loaded model slot."""
@@ -27,17 +34,56 @@ class SlotState:
     processor: Any = None
     device: str = ""
     load_time_sec: float = 0.0
+    size_bytes: int = 0        # beim Laden gemessener VRAM-Bedarf
+    last_used: float = 0.0     # Zeitpunkt (clock) der letzten Nutzung
+    offloaded: bool = False    # Gewichte voruebergehend im RAM (vram_eviction_mode="offload")
+    target_device: str = ""    # Device, auf das ein ausgelagerter Slot zurueckkehrt
+
+
+def _cuda_memory_allocated(device: str) -> int:
+    """Vom torch-Allocator belegte Bytes auf *device* (0 ausserhalb von CUDA)."""
+    if not device.startswith("cuda"):
+        return 0
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return int(torch.cuda.memory_allocated(device))
+    except Exception:
+        pass
+    return 0
+
+
+def _move_model(model: Any, device: str) -> None:
+    model.to(device)
 
 
 class GpuModelManager:
     """Multi-slot persistent model manager.
 
     Multiple models can be loaded simultaneously and remain resident.
-    No automatic eviction on slot switch — models stay until explicitly
-    unloaded or the process shuts down.
+    Without a VRAM budget (``vram_budget_bytes=0``) there is no automatic
+    eviction — models stay until explicitly unloaded or the process shuts
+    down. With a budget, each slot's VRAM use is measured at load time
+    (*memory_probe* before/after the loader); when a load would exceed the
+    budget, least-recently-used slots that are neither pinned nor in use are
+    unloaded (or moved to CPU with ``eviction_mode="offload"``).
+
+    Slots with an idle timeout (``<slot>_idle_timeout_sec`` or *idle_timeouts*)
+    are unloaded by a background reaper once unused for that long; the next
+    ``ensure_loaded`` reloads them transparently.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        vram_budget_bytes: int = 0,
+        *,
+        eviction_mode: str = "unload",
+        pinned: Iterable[ModelSlot | str] = (),
+        memory_probe: Callable[[str], int] = _cuda_memory_allocated,
+        mover: Callable[[Any, str], None] = _move_model,
+        idle_timeouts: dict[ModelSlot | str, float] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
         self._slots: dict[ModelSlot, SlotState] = {}
         self._locks: dict[ModelSlot, threading.Lock] = {
             ModelSlot.YOLO: threading.Lock(),
@@ -45,6 +91,28 @@ class GpuModelManager:
             ModelSlot.SAM: threading.Lock(),
         }
         self._global_lock = threading.Lock()
+        self._unload_hooks: dict[ModelSlot, list[Callable[[], None]]] = {}
+        self._offload_hooks: dict[ModelSlot, list[Callable[[], None]]] = {}
+
+        self.vram_budget_bytes = max(0, int(vram_budget_bytes))
+        self.eviction_mode = eviction_mode
+        self._pinned: set[ModelSlot] = {ModelSlot(slot) for slot in pinned}
+        self._memory_probe = memory_probe
+        self._mover = mover
+        self._known_sizes: dict[ModelSlot, int] = {}
+        self._active: dict[ModelSlot, int] = {}
+        self._evictions: dict[str, int] = {}
+
+        self._idle_timeouts = (
+            None if idle_timeouts is None
+            else {ModelSlot(slot): float(timeout) for slot, timeout in idle_timeouts.items()}
+        )
+        self._clock = clock
+        self._loads: dict[str, int] = {}
+        self._idle_unloads: dict[str, int] = {}
+        self._reaper: threading.Thread | None = None
+        self._reaper_stop = threading.Event()
+        self._reaper_lock = threading.Lock()
 
     # ── Public API ──────────────────────────────────────────────────────
 
@@ -61,7 +129,8 @@ class GpuModelManager:
         """
         # Fast path: already loaded
         state = self._slots.get(slot)
-        if state is not None and state.model is not None:
+        if state is not None and state.model is not None and not state.offloaded:
+            state.last_used = self._clock()
             return state
 
         # Slow path: acquire per-slot lock and load
@@ -70,23 +139,107 @@ class GpuModelManager:
             # Double-check after acquiring lock
             state = self._slots.get(slot)
             if state is not None and state.model is not None:
+                if state.offloaded:
+                    self._restore(slot, state)
+                state.last_used = self._clock()
                 return state
 
+            self._make_room(slot, device, self._known_sizes.get(slot, 0))
+
+            before = self._memory_probe(device)
             t0 = time.perf_counter()
             model, processor = loader()
             elapsed = time.perf_counter() - t0
+            size_bytes = max(0, self._memory_probe(device) - before)
 
             state = SlotState(
                 model=model,
                 processor=processor,
                 device=device,
                 load_time_sec=elapsed,
+                size_bytes=size_bytes,
+                last_used=self._clock(),
+                target_device=device,
             )
             self._slots[slot] = state
+            self._known_sizes[slot] = size_bytes
+            self._loads[slot.value] = self._loads.get(slot.value, 0) + 1
             logger.info(
-                "Loaded %s in %.1fs on %s (persistent)", slot.value, elapsed, device
+                "Loaded %s in %.1fs on %s (persistent, %.2f GB)",
+                slot.value, elapsed, device, size_bytes / _GB,
             )
-            return state
+            # Gemessene Groesse kann hoeher sein als die Schaetzung -> nachtraeglich Platz schaffen
+            self._make_room(slot, device, 0)
+        if self._idle_timeout(slot) > 0:
+            self.start_reaper()
+        return state
+
+    @contextmanager
+    def in_use(self, slot: ModelSlot) -> Iterator[None]:
+        """Mark *slot* as busy for the duration of an inference call.
+
+        Busy slots are never chosen for eviction, so a request never loses
+        its model mid-forward-pass.
+        """
+        with self._global_lock:
+            self._active[slot] = self._active.get(slot, 0) + 1
+        try:
+            yield
+        finally:
+            with self._global_lock:
+                self._active[slot] -= 1
+            state = self._slots.get(slot)
+            if state is not None:
+                state.last_used = self._clock()  # Leerlauf zaehlt ab Ende der Inferenz
+
+    def pin(self, slot: ModelSlot) -> None:
+        """Exclude *slot* from budget eviction and idle unloading."""
+        self._pinned.add(slot)
+
+    def unpin(self, slot: ModelSlot) -> None:
+        self._pinned.discard(slot)
+
+    def reap_idle(self) -> list[ModelSlot]:
+        """Unload every slot idle for longer than its timeout; returns the unloaded slots."""
+        now = self._clock()
+        reaped = []
+        for slot, state in list(self._slots.items()):
+            timeout = self._idle_timeout(slot)
+            if timeout <= 0 or now - state.last_used < timeout:
+                continue
+            if self._drop_if_idle(slot, timeout):
+                reaped.append(slot)
+        if reaped:
+            self._try_empty_cache()
+            gc.collect()
+        return reaped
+
+    def start_reaper(self) -> None:
+        """Start the idle reaper thread (idempotent; started by the first load with a timeout)."""
+        with self._reaper_lock:
+            if self._reaper is not None:
+                return
+            self._reaper_stop.clear()
+            self._reaper = threading.Thread(target=self._reap_loop, name="gpu-idle-reaper", daemon=True)
+            self._reaper.start()
+
+    def stop_reaper(self, timeout: float = 2.0) -> None:
+        with self._reaper_lock:
+            thread, self._reaper = self._reaper, None
+        if thread is not None:
+            self._reaper_stop.set()
+            thread.join(timeout)
+
+    def add_unload_hook(self, slot: ModelSlot, hook: Callable[[], None], *, on_offload: bool = True) -> None:
+        """Register *hook* to run whenever *slot* is unloaded (e.g. drop derived caches).
+
+        With ``on_offload=True`` the hook also runs when the slot is offloaded
+        to CPU. State that must survive a restore (e.g. the weight precision)
+        registers with ``on_offload=False``.
+        """
+        self._unload_hooks.setdefault(slot, []).append(hook)
+        if on_offload:
+            self._offload_hooks.setdefault(slot, []).append(hook)
 
     def unload(self, slot: ModelSlot) -> None:
         """Explicitly unload a single slot."""
@@ -100,11 +253,13 @@ class GpuModelManager:
             logger.info("Unloading %s from %s ...", slot.value, state.device)
             del state.model
             del state.processor
+            self._run_unload_hooks(slot)
         self._try_empty_cache()
         gc.collect()
 
     def unload_all(self) -> None:
         """Unload all loaded models (shutdown cleanup)."""
+        self.stop_reaper()
         slots = list(self._slots.keys())
         for slot in slots:
             self.unload(slot)
@@ -116,22 +271,22 @@ class GpuModelManager:
         Keeps legacy keys (current_model, vram_allocated_gb, vram_total_gb)
         for backwards compatibility and adds loaded_models detail.
         """
-        vram_allocated = 0.0
-        vram_total = 0.0
-        try:
-            import torch
-            if torch.cuda.is_available():
-                vram_allocated = torch.cuda.memory_allocated(0) / (1024**3)
-                vram_total = torch.cuda.get_device_properties(0).total_mem / (1024**3)
-        except Exception:
-            pass
+        # VRAM aus dem Hintergrund-Sampler statt torch-Abfrage pro Aufruf
+        gpu = gpu_metrics.get_snapshot()
+        vram_allocated = gpu.vram_allocated_gb or 0.0
+        vram_total = gpu.vram_total_gb or 0.0
 
+        now = self._clock()
         loaded = {}
         for slot, state in self._slots.items():
             if state.model is not None:
                 loaded[slot.value] = {
                     "device": state.device,
                     "load_time_sec": round(state.load_time_sec, 2),
+                    "size_gb": round(state.size_bytes / _GB, 2),
+                    "offloaded": state.offloaded,
+                    "pinned": slot in self._pinned,
+                    "idle_sec": round(now - state.last_used, 1),
                 }
 
         # Legacy compat: report first loaded model or "none"
@@ -148,6 +303,22 @@ class GpuModelManager:
                 if st.model is not None
             },
             "loaded_models": loaded,
+            "vram_budget": {
+                "budget_gb": round(self.vram_budget_bytes / _GB, 2),
+                "accounted_gb": round(self._resident_bytes() / _GB, 2),
+                "eviction_mode": self.eviction_mode,
+                "pinned": sorted(slot.value for slot in self._pinned),
+                "evictions": dict(self._evictions),
+            },
+            "idle": {
+                "timeouts_sec": {
+                    slot.value: self._idle_timeout(slot)
+                    for slot in (ModelSlot.YOLO, ModelSlot.DINO, ModelSlot.SAM)
+                },
+                "reaper_running": self._reaper is not None,
+                "unloads": dict(self._idle_unloads),
+                "reloads": {name: count - 1 for name, count in self._loads.items() if count > 1},
+            },
         }
 
     def empty_cache(self) -> None:
@@ -157,6 +328,135 @@ class GpuModelManager:
 
     # ── Internal ────────────────────────────────────────────────────────
 
+    def _run_unload_hooks(self, slot: ModelSlot, *, offload: bool = False) -> None:
+        hooks = self._offload_hooks if offload else self._unload_hooks
+        for hook in hooks.get(slot, []):
+            try:
+                hook()
+            except Exception as exc:
+                logger.warning("Unload hook for %s failed: %s", slot.value, exc)
+
+    def _resident_bytes(self, exclude: ModelSlot | None = None) -> int:
+        """Summe der gemessenen Groessen aller Slots, die aktuell im VRAM liegen."""
+        return sum(
+            state.size_bytes
+            for slot, state in list(self._slots.items())
+            if slot != exclude and state.model is not None and not state.offloaded
+        )
+
+    def _make_room(self, slot: ModelSlot, device: str, needed_bytes: int) -> None:
+        """LRU-Slots verdraengen, bis *needed_bytes* fuer *slot* ins Budget passen."""
+        if self.vram_budget_bytes <= 0 or not device.startswith("cuda"):
+            return
+
+        with self._global_lock:
+            candidates = sorted(
+                (
+                    (state.last_used, other)
+                    for other, state in self._slots.items()
+                    if other != slot
+                    and other not in self._pinned
+                    and self._active.get(other, 0) == 0
+                    and state.model is not None
+                    and not state.offloaded
+                    and state.size_bytes > 0
+                ),
+                key=lambda item: item[0],
+            )
+
+        own = self._slots.get(slot)
+        own_bytes = own.size_bytes if own is not None and own.model is not None and not own.offloaded else 0
+        for _, victim in candidates:
+            if self._resident_bytes(exclude=slot) + own_bytes + needed_bytes <= self.vram_budget_bytes:
+                return
+            self._evict(victim)
+
+        total = self._resident_bytes(exclude=slot) + own_bytes + needed_bytes
+        if total > self.vram_budget_bytes:
+            logger.warning(
+                "VRAM budget exceeded for %s: %.2f GB > %.2f GB (remaining slots pinned or busy)",
+                slot.value, total / _GB, self.vram_budget_bytes / _GB,
+            )
+
+    def _evict(self, slot: ModelSlot) -> None:
+        lock = self._locks.get(slot)
+        # nicht blockieren: ein Slot, der gerade selbst laedt, wird uebersprungen (kein Deadlock)
+        if lock is None or not lock.acquire(blocking=False):
+            return
+        try:
+            state = self._slots.get(slot)
+            if state is None or state.model is None or state.offloaded:
+                return
+            if self._active.get(slot, 0) > 0:
+                return
+            if self.eviction_mode == "offload":
+                try:
+                    self._mover(state.model, "cpu")
+                    state.offloaded = True
+                    state.device = "cpu"
+                    self._run_unload_hooks(slot, offload=True)
+                    logger.info("VRAM budget: offloaded %s to CPU", slot.value)
+                except Exception as exc:
+                    logger.warning("Offloading %s failed (%s), unloading instead", slot.value, exc)
+                    self._drop(slot)
+            else:
+                self._drop(slot)
+                logger.info("VRAM budget: unloaded %s", slot.value)
+            self._evictions[slot.value] = self._evictions.get(slot.value, 0) + 1
+        finally:
+            lock.release()
+        self._try_empty_cache()
+
+    def _idle_timeout(self, slot: ModelSlot) -> float:
+        if slot in self._pinned:
+            return 0.0
+        if self._idle_timeouts is not None:
+            return self._idle_timeouts.get(slot, 0.0)
+        return float(getattr(settings, f"{slot.value}_idle_timeout_sec", 0.0))
+
+    def _drop_if_idle(self, slot: ModelSlot, timeout: float) -> bool:
+        lock = self._locks.get(slot)
+        # laedt der Slot gerade, ist er nicht im Leerlauf -> ueberspringen statt warten
+        if lock is None or not lock.acquire(blocking=False):
+            return False
+        try:
+            state = self._slots.get(slot)
+            if state is None or self._active.get(slot, 0) > 0:
+                return False
+            # Nachpruefung unter dem Lock: Request kann dazwischen gekommen sein
+            if self._clock() - state.last_used < timeout:
+                return False
+            logger.info("Unloading %s after %.0fs idle", slot.value, self._clock() - state.last_used)
+            self._drop(slot)
+            self._idle_unloads[slot.value] = self._idle_unloads.get(slot.value, 0) + 1
+            return True
+        finally:
+            lock.release()
+
+    def _reap_loop(self) -> None:
+        while not self._reaper_stop.wait(settings.idle_reaper_interval_sec):
+            try:
+                self.reap_idle()
+            except Exception as exc:
+                logger.warning("Idle reaper failed: %s", exc)
+
+    def _drop(self, slot: ModelSlot) -> None:
+        """Slot entfernen; Aufrufer haelt den Slot-Lock."""
+        state = self._slots.pop(slot, None)
+        if state is None:
+            return
+        del state.model
+        del state.processor
+        self._run_unload_hooks(slot)
+
+    def _restore(self, slot: ModelSlot, state: SlotState) -> None:
+        """Ausgelagerten Slot zurueck auf sein Device holen; Aufrufer haelt den Slot-Lock."""
+        self._make_room(slot, state.target_device, state.size_bytes)
+        self._mover(state.model, state.target_device)
+        state.device = state.target_device
+        state.offloaded = False
+        logger.info("VRAM budget: restored %s to %s", slot.value, state.device)
+
     def _get_or_create_lock(self, slot: ModelSlot) -> threading.Lock:
         with self._global_lock:
             if slot not in self._locks:
@@ -174,4 +474,8 @@ class GpuModelManager:
 
 
 # Singleton
-gpu_manager = GpuModelManager()
+gpu_manager = GpuModelManager(
+    int(settings.vram_budget_gb * _GB),
+    eviction_mode=settings.vram_eviction_mode,
+    pinned=[name.strip() for name in settings.vram_pinned_slots.split(",") if name.strip()],
+)
@@ -0,0 +1,224 @@
+"""Background sampler for GPU utilisation and VRAM.
+
+Requests read an immutable snapshot instead of spawning nvidia-smi or
+querying torch device properties on the hot path. The sampler thread
+polls a pluggable source (NVML, nvidia-smi fallback, or a fake in tests)
+every ``gpu_metrics_interval_sec`` seconds.
+"""
+
+from __future__ import annotations
+
+import logging
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+_GB = 1024 ** 3
+
+
+@dataclass(frozen=True)
+class GpuSnapshot:
+    """Letzte Messung; wird als Ganzes ersetzt, nie veraendert."""
+    gpu_utilization_percent: float | None = None
+    vram_allocated_gb: float | None = None  # torch-Allocator dieses Prozesses
+    vram_used_gb: float | None = None       # geraeteweit (NVML / nvidia-smi)
+    vram_total_gb: float | None = None
+    sampled_at: float = 0.0                 # time.monotonic()
+    source: str = "none"
+
+
+def _device_index() -> int | None:
+    """Index des konfigurierten CUDA-Geraets, None wenn keines genutzt wird."""
+    device = settings.gpu_device
+    if not device.startswith("cuda"):
+        return None
+    _, _, index = device.partition(":")
+    return int(index) if index.isdigit() else 0
+
+
+def _torch_allocated_gb(index: int) -> float | None:
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return round(torch.cuda.memory_allocated(index) / _GB, 2)
+    except Exception:
+        pass
+    return None
+
+
+class NullSource:
+    """Kein GPU-Geraet konfiguriert oder erreichbar."""
+    name = "none"
+
+    def sample(self) -> GpuSnapshot:
+        return GpuSnapshot(source=self.name)
+
+
+class NvmlSource:
+    """NVML (pynvml / nvidia-ml-py): ein Handle, keine Prozess-Starts."""
+    name = "nvml"
+
+    def __init__(self, index: int) -> None:
+        import pynvml
+
+        pynvml.nvmlInit()
+        self._nvml = pynvml
+        self._index = index
+        self._handle = pynvml.nvmlDeviceGetHandleByIndex(index)
+
+    def sample(self) -> GpuSnapshot:
+        utilization = self._nvml.nvmlDeviceGetUtilizationRates(self._handle)
+        memory = self._nvml.nvmlDeviceGetMemoryInfo(self._handle)
+        return GpuSnapshot(
+            gpu_utilization_percent=float(utilization.gpu),
+            vram_allocated_gb=_torch_allocated_gb(self._index),
+            vram_used_gb=round(memory.used / _GB, 2),
+            vram_total_gb=round(memory.total / _GB, 2),
+            source=self.name,
+        )
+
+
+class NvidiaSmiSource:
+    """Fallback ohne NVML-Bindings; laeuft nur im Sampler-Thread."""
+    name = "nvidia-smi"
+
+    def __init__(self, index: int) -> None:
+        self._index = index
+
+    def sample(self) -> GpuSnapshot:
+        result = subprocess.run(
+            [
+                "nvidia-smi",
+                f"--id={self._index}",
+                "--query-gpu=utilization.gpu,memory.used,memory.total",
+                "--format=csv,noheader,nounits",
+            ],
+            capture_output=True,
+            text=True,
+            timeout=2.0,
+            check=True,
+        )
+        utilization, used_mib, total_mib = (
+            float(part) for part in result.stdout.strip().splitlines()[0].split(",")
+        )
+        return GpuSnapshot(
+            gpu_utilization_percent=utilization,
+            vram_allocated_gb=_torch_allocated_gb(self._index),
+            vram_used_gb=round(used_mib / 1024, 2),
+            vram_total_gb=round(total_mib / 1024, 2),
+            source=self.name,
+        )
+
+
+def default_source() -> Any:
+    """NVML, sonst nvidia-smi, sonst NullSource (reine CPU-Konfiguration)."""
+    index = _device_index()
+    if index is None:
+        return NullSource()
+    try:
+        return NvmlSource(index)
+    except Exception as exc:
+        logger.info("NVML unavailable (%s), falling back to nvidia-smi", exc)
+    source = NvidiaSmiSource(index)
+    try:
+        source.sample()
+        return source
+    except Exception as exc:
+        logger.info("nvidia-smi unavailable (%s), GPU metrics disabled", exc)
+    return NullSource()
+
+
+class GpuMetricsSampler:
+    """Polls *source* in a daemon thread; ``snapshot()`` never blocks.
+
+    The thread starts on the first ``snapshot()`` call. Readers only
+    dereference ``self._snapshot`` (a frozen dataclass swapped atomically),
+    so no lock is taken on the request path.
+    """
+
+    def __init__(self, source: Any = None, interval_sec: float | None = None) -> None:
+        self._source = source
+        self._interval_sec = interval_sec
+        self._snapshot = GpuSnapshot()
+        self._errors = 0
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def interval_sec(self) -> float:
+        if self._interval_sec is not None:
+            return self._interval_sec
+        return settings.gpu_metrics_interval_sec
+
+    def snapshot(self) -> GpuSnapshot:
+        if self._thread is None and settings.gpu_metrics_enabled:
+            self.start()
+        return self._snapshot
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="gpu-metrics", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            thread.join(timeout)
+
+    def sample_now(self) -> GpuSnapshot:
+        """Eine Messung sofort (im aufrufenden Thread) und als Snapshot ablegen."""
+        if self._source is None:
+            self._source = default_source()
+        try:
+            snapshot = self._source.sample()
+        except Exception as exc:
+            self._errors += 1
+            if self._errors == 1:
+                logger.warning("GPU metrics sampling failed: %s", exc)
+            return self._snapshot
+        self._snapshot = GpuSnapshot(**{**asdict(snapshot), "sampled_at": time.monotonic()})
+        return self._snapshot
+
+    def status(self) -> dict:
+        data = asdict(self._snapshot)
+        sampled_at = data.pop("sampled_at")
+        age = time.monotonic() - sampled_at if sampled_at else None
+        return {
+            **data,
+            "age_sec": round(age, 2) if age is not None else None,
+            "interval_sec": self.interval_sec,
+            "running": self._thread is not None,
+            "errors": self._errors,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.sample_now()
+            self._stop.wait(self.interval_sec)
+
+
+sampler = GpuMetricsSampler()
+
+
+def get_snapshot() -> GpuSnapshot:
+    return sampler.snapshot()
+
+
+def get_status() -> dict:
+    return sampler.status()
+
+
+def shutdown() -> None:
+    sampler.stop()
@@ -7,9 +7,10 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
+from . import batching, executors, gpu_metrics, metrics, telemetry, timing, warmup
 from .config import settings
 from .gpu_manager import gpu_manager
-from .routes import health, yolo, dino, sam, training
+from .routes import health, images, metrics as metrics_route, quality, yolo, dino, sam, training
 
 logging.basicConfig(
     level=logging.INFO,
@@ -38,8 +39,14 @@ async def lifespan(app: FastAPI):
         settings.effective_dino_device,
         settings.effective_sam_device,
     )
+    warmup.start()
+    warmup.mark_started()
     yield
     logging.getLogger("sidecar").info("Sidecar shutting down — unloading all models ...")
+    batching.shutdown_all()
+    executors.shutdown_all()
+    gpu_metrics.shutdown()
+    telemetry.shutdown()
     gpu_manager.unload_all()
 
 
@@ -65,6 +72,7 @@ async def handle_unexpected(request: Request, exc: Exception):
     )
 
     if _looks_like_oom(exc):
+        metrics.oom_recoveries.inc()
         gpu_manager.empty_cache()
         return JSONResponse({"detail": "GPU out of memory"}, status_code=503)
 
@@ -74,6 +82,11 @@ async def handle_unexpected(request: Request, exc: Exception):
     return JSONResponse({"detail": "internal error"}, status_code=500)
 
 
+def _error_status(exc: Exception) -> int:
+    """Statuscode, den handle_unexpected fuer *exc* liefern wird."""
+    return 503 if _looks_like_oom(exc) or isinstance(exc, FileNotFoundError) else 500
+
+
 def _normalize_host(host_header: str | None) -> str:
     if not host_header:
         return ""
@@ -102,6 +115,39 @@ def _auth_token() -> str:
     return (settings.auth_token or "").strip()
 
 
+def _content_length(headers) -> int:
+    value = headers.get("content-length") or ""
+    return int(value) if value.isdigit() else 0
+
+
+def _finish_request(event, request_timing: timing.RequestTiming, status_code: int) -> None:
+    request_timing.finish()
+    metrics.observe_request(request_timing, status_code)
+    telemetry.write_request(event, request_timing, status_code=status_code)
+
+
+@app.middleware("http")
+async def record_request_telemetry(request: Request, call_next):
+    """Stufenzeiten und Payload-Groessen der Modell-Endpunkte fuer /metrics und Telemetrie.
+
+    Innerhalb der Sicherheits-Middleware registriert: abgewiesene Requests
+    erzeugen kein Event.
+    """
+    event = telemetry.event_for(request.url.path)
+    if event is None or not (settings.telemetry_enabled or settings.metrics_enabled):
+        return await call_next(request)
+
+    with timing.track(request.url.path, request_bytes=_content_length(request.headers)) as request_timing:
+        try:
+            response = await call_next(request)
+        except Exception as exc:
+            _finish_request(event, request_timing, _error_status(exc))
+            raise
+    request_timing.response_bytes = _content_length(response.headers)
+    _finish_request(event, request_timing, response.status_code)
+    return response
+
+
 @app.middleware("http")
 async def enforce_loopback_security(request: Request, call_next):
     trusted = _trusted_hosts()
@@ -123,6 +169,9 @@ async def enforce_loopback_security(request: Request, call_next):
 
 # Register routes
 app.include_router(health.router, tags=["health"])
+app.include_router(metrics_route.router, tags=["health"])
+app.include_router(images.router, tags=["images"])
+app.include_router(quality.router, tags=["quality"])
 app.include_router(yolo.router, tags=["yolo"])
 app.include_router(dino.router, tags=["dino"])
 app.include_router(sam.router, tags=["sam"])
@@ -0,0 +1,236 @@
+"""In-process latency histograms and counters, exposed at /metrics.
+
+Fixed-bucket histograms per endpoint and per stage (see timing.STAGES),
+in seconds as Prometheus expects for durations, plus counters for requests, rejected frames and OOM recoveries. Rendered
+in the Prometheus text exposition format (0.0.4) without a
+prometheus_client dependency; p50/p95/p99 come from
+``histogram_quantile()`` on the scraper side or ``Histogram.quantile``
+for /health.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from typing import Iterable
+
+from .config import settings
+from .timing import RequestTiming
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Bucket-Grenzen in ms: von Cache-Treffern (~1 ms) bis zu SAM auf der CPU (~1 min)
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+# dieselben Grenzen in Sekunden (Prometheus-Basiseinheit) fuer die /metrics-Histogramme
+LATENCY_BUCKETS_SECONDS = tuple(bound / 1000 for bound in LATENCY_BUCKETS_MS)
+
+# (Name, Typ, Hilfe, [(Labels, Wert)]) – fuer Werte, die erst beim Scrape gelesen werden
+Family = tuple[str, str, str, list[tuple[dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def bucket_quantile(buckets: tuple[float, ...], counts: list[int], q: float) -> float | None:
+    """Schaetzung wie histogram_quantile(): linear innerhalb des Ziel-Buckets.
+
+    *counts* sind die (nicht kumulierten) Zaehler je Bucket, +Inf zuletzt.
+    """
+    total = sum(counts)
+    if total == 0:
+        return None
+    rank = q * total
+    cumulative = 0
+    for index, bucket_count in enumerate(counts):
+        if cumulative + bucket_count >= rank and bucket_count:
+            if index == len(buckets):
+                return buckets[-1]  # +Inf-Bucket: obere Grenze unbekannt
+            lower = buckets[index - 1] if index else 0.0
+            upper = buckets[index]
+            return lower + (upper - lower) * (rank - cumulative) / bucket_count
+        cumulative += bucket_count
+    return buckets[-1]
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple[str, ...]) -> dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    """Monotonic counter per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in sorted(self._values.items())]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram per label set (counts per bucket, sum, count)."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Iterable[str] = (),
+        buckets: Iterable[float] = LATENCY_BUCKETS_SECONDS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        # je Label-Satz: [Zaehler je Bucket (+Inf zuletzt), Summe]
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def quantile(self, q: float, **labels: str) -> float | None:
+        series = self._series.get(self._key(labels))
+        if series is None:
+            return None
+        with self._lock:
+            counts = list(series[0])
+        return bucket_quantile(self.buckets, counts, q)
+
+    def label_sets(self) -> list[dict[str, str]]:
+        with self._lock:
+            return [self._labels(key) for key in sorted(self._series)]
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        samples = []
+        with self._lock:
+            series = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+        for key, counts, total in series:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+request_duration = Histogram(
+    "sidecar_request_duration_seconds", "End-to-end request latency in seconds", ("endpoint",),
+)
+stage_duration = Histogram(
+    "sidecar_stage_duration_seconds", "Request stage latency in seconds", ("endpoint", "stage"),
+)
+requests_total = Counter("sidecar_requests_total", "Requests by endpoint and status code", ("endpoint", "status"))
+rejected_frames = Counter(
+    "sidecar_rejected_frames_total", "YOLO frames answered as not relevant, by frame_class", ("frame_class",),
+)
+oom_recoveries = Counter("sidecar_oom_recoveries_total", "CUDA out-of-memory errors answered with 503")
+
+REGISTRY: list[_Metric] = [request_duration, stage_duration, requests_total, rejected_frames, oom_recoveries]
+
+
+def observe_request(request_timing: RequestTiming, status_code: int) -> None:
+    """Gesamtdauer und Stufenzeiten eines beendeten Requests einsortieren."""
+    if not settings.metrics_enabled:
+        return
+    endpoint = request_timing.endpoint
+    requests_total.inc(endpoint=endpoint, status=str(status_code))
+    request_duration.observe(request_timing.total_ms() / 1000, endpoint=endpoint)
+    for stage, elapsed_ms in request_timing.stages_ms.items():
+        stage_duration.observe(elapsed_ms / 1000, endpoint=endpoint, stage=stage)
+
+
+def render(extra: Iterable[Family] = ()) -> str:
+    """Alle Metriken (plus *extra*-Familien) im Prometheus-Textformat."""
+    lines: list[str] = []
+    families = [(metric.name, metric.kind, metric.help, metric.samples()) for metric in REGISTRY]
+    families += [
+        (name, kind, help_text, [(name, labels, value) for labels, value in values])
+        for name, kind, help_text, values in extra
+    ]
+    for name, kind, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for sample_name, labels, value in samples:
+            lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def get_status() -> dict:
+    """p50/p95/p99 je Endpunkt fuer /health (in ms umgerechnet, aus den Buckets geschaetzt)."""
+    return {
+        "enabled": settings.metrics_enabled,
+        "endpoints": {
+            labels["endpoint"]: {
+                "count": request_duration.count(**labels),
+                **{
+                    f"p{int(q * 100)}_ms": _milliseconds(request_duration.quantile(q, **labels))
+                    for q in (0.5, 0.95, 0.99)
+                },
+            }
+            for labels in request_duration.label_sets()
+        },
+    }
+
+
+def reset() -> None:
+    for metric in REGISTRY:
+        metric.reset()
+
+
+def _milliseconds(seconds: float | None) -> float | None:
+    return round(seconds * 1000, 1) if seconds is not None else None
@@ -26,3 +26,17 @@ def clamp_box(
     if cx2 <= cx1 or cy2 <= cy1:
         return None
     return (cx1, cy1, cx2, cy2)
+
+
+def box_iou(
+    a: Tuple[float, float, float, float],
+    b: Tuple[float, float, float, float],
+) -> float:
+    """Intersection over Union zweier (x1, y1, x2, y2)-Boxen; 0.0 ohne Ueberlappung."""
+    iw = min(a[2], b[2]) - max(a[0], b[0])
+    ih = min(a[3], b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
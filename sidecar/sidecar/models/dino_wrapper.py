@@ -2,16 +2,23 @@
 
 from __future__ import annotations
 
-import time
+import copy
+import hashlib
 import logging
+import time
 from pathlib import Path
 
 import numpy as np
+from fastapi import HTTPException, status
 
+from .. import batching, timing
+from ..batching import MicroBatcher
+from ..cache import ByteBudgetLRU
 from ..config import settings
 from ..gpu_manager import gpu_manager, ModelSlot
-from ..schemas.detection import DinoDetection, DinoResponse
-from .image_decode import decode_image_safe
+from ..schemas.detection import DinoBatchResponse, DinoDetection, DinoResponse
+from .image_decode import decode_image_bytes, decode_image_safe, original_size
+from . import precision
 
 logger = logging.getLogger(__name__)
 
@@ -54,9 +61,18 @@ def _load_dino_on(device: str):
 
     config_path, weights_path = _find_dino_files()
     model = load_model(config_path, weights_path, device=device)
+    precision.prepare_model("dino", model, device)
+    _install_text_cache(model)
+    _prewarm_text_cache(model)
     return model, None
 
 
+def preload() -> None:
+    """Load Grounding DINO ahead of the first request (text cache is prewarmed on load)."""
+    device = _resolve_device()
+    gpu_manager.ensure_loaded(ModelSlot.DINO, device, lambda: _load_dino_on(device))
+
+
 def _cuda_available() -> bool:
     try:
         import torch
@@ -65,6 +81,262 @@ def _cuda_available() -> bool:
         return False
 
 
+_token_cache = ByteBudgetLRU(settings.dino_text_cache_max_bytes, max_entries=settings.dino_text_cache_size)
+_text_feature_cache = ByteBudgetLRU(settings.dino_text_cache_max_bytes, max_entries=settings.dino_text_cache_size)
+
+
+def _clear_text_caches() -> None:
+    _token_cache.clear()
+    _text_feature_cache.clear()
+
+
+gpu_manager.add_unload_hook(ModelSlot.DINO, _clear_text_caches)
+gpu_manager.add_unload_hook(ModelSlot.DINO, lambda: precision.forget("dino"), on_offload=False)
+
+
+def _tensor_bytes(values) -> int:
+    return sum(
+        int(v.numel() * v.element_size())
+        for v in values
+        if hasattr(v, "numel") and hasattr(v, "element_size")
+    )
+
+
+def _expand_batch(values, batch_size: int):
+    """Flache Kopie von *values*, Tensoren mit Batch-Dimension 1 ohne Kopie auf *batch_size* aufgeweitet."""
+    expanded = copy.copy(values)
+    for name, value in list(expanded.items()):
+        if hasattr(value, "expand") and value.dim() > 0 and value.shape[0] == 1:
+            expanded[name] = value.expand(batch_size, *value.shape[1:])
+    return expanded
+
+
+def _shared_batch_size(kwargs: dict) -> int | None:
+    """B, wenn alle Tensor-Argumente B > 1 identische Zeilen haben (gleicher Prompt je Frame)."""
+    tensors = [value for value in kwargs.values() if hasattr(value, "detach")]
+    if not tensors or tensors[0].dim() == 0:
+        return None
+    batch_size = tensors[0].shape[0]
+    if batch_size <= 1:
+        return None
+    for value in tensors:
+        if value.dim() == 0 or value.shape[0] != batch_size or not bool((value == value[:1]).all()):
+            return None
+    return batch_size
+
+
+def _tensor_key(value):
+    """Hashbarer Schluessel fuer ein BERT-Argument (Tensor-Inhalt statt Identitaet)."""
+    if not hasattr(value, "detach"):
+        return value
+    digest = hashlib.blake2b(value.detach().cpu().numpy().tobytes(), digest_size=16)
+    return tuple(value.shape), str(value.dtype), digest.hexdigest()
+
+
+class _CachingTokenizer:
+    """Tokenizer-Proxy: gleiche Caption + Argumente -> gespeicherte Tokenisierung.
+
+    Grounding DINO tokenisiert pro Frame zweimal (Forward + Phrasen-Zuordnung);
+    alle anderen Attribute (decode, convert_tokens_to_ids, ...) gehen durch.
+    """
+
+    def __init__(self, tokenizer) -> None:
+        self._tokenizer = tokenizer
+
+    def __getattr__(self, name):
+        return getattr(self._tokenizer, name)
+
+    def __call__(self, text, **kwargs):
+        if not isinstance(text, str) and len(text) > 1 and all(t == text[0] for t in text):
+            # [caption] * B: einmal fuer B=1 tokenisieren, dann aufweiten
+            return _expand_batch(self(list(text[:1]), **kwargs), len(text))
+        key = (text if isinstance(text, str) else tuple(text), tuple(sorted(kwargs.items())))
+        encoded = _token_cache.get(key)
+        if encoded is None:
+            encoded = self._tokenizer(text, **kwargs)
+            _token_cache.put(key, encoded, _tensor_bytes(encoded.values()))
+        # flache Kopie: der DINO-Forward kuerzt input_ids & Co. per Zuweisung
+        return copy.copy(encoded)
+
+
+def _cache_text_encoder(bert) -> None:
+    """BERT-Forward des Modells durch eine LRU-gecachte Variante ersetzen.
+
+    Schluessel ist der Inhalt der Eingabetensoren (input_ids, Masken,
+    position_ids) -- identischer Prompt -> identische Textmerkmale. Ein
+    Batch aus B gleichen Zeilen wird als B=1 gerechnet bzw. nachgeschlagen
+    und aufgeweitet, damit jede Batch-Groesse denselben Eintrag nutzt.
+    """
+    forward = bert.forward
+
+    def cached_forward(*args, **kwargs):
+        if args:
+            return forward(*args, **kwargs)
+        batch_size = _shared_batch_size(kwargs)
+        if batch_size is not None:
+            single = {name: value[:1] if hasattr(value, "detach") else value for name, value in kwargs.items()}
+            return _expand_batch(cached_forward(**single), batch_size)
+        key = tuple((name, _tensor_key(value)) for name, value in sorted(kwargs.items()))
+        output = _text_feature_cache.get(key)
+        if output is None:
+            output = forward(**kwargs)
+            _text_feature_cache.put(key, output, _tensor_bytes(output.values()))
+        return output
+
+    bert.forward = cached_forward
+
+
+def _install_text_cache(model) -> None:
+    """Text-Caches in ein frisch geladenes Grounding-DINO-Modell einhaengen."""
+    if settings.dino_text_cache_size <= 0:
+        return
+    model.tokenizer = _CachingTokenizer(model.tokenizer)
+    _cache_text_encoder(model.bert)
+
+
+def _prewarm_text_cache(model) -> None:
+    """Standard-Labelsatz einmal durchrechnen, damit der erste Frame ihn schon im Cache findet."""
+    if settings.dino_text_cache_size <= 0:
+        return
+    dummy = np.zeros((64, 64, 3), dtype=np.uint8)
+    _predict_many(model, [dummy], settings.dino_labels, [(1.0, 1.0)])
+
+
+def get_text_cache_status() -> dict:
+    return {
+        "tokens": _token_cache.stats(),
+        "text_features": _text_feature_cache.stats(),
+    }
+
+
+_normalize = None
+
+
+def _normalize_transform():
+    """ToTensor + ImageNet-Normalisierung; einmal gebaut, danach wiederverwendet."""
+    global _normalize
+    if _normalize is None:
+        from torchvision import transforms
+
+        _normalize = transforms.Compose([
+            transforms.ToTensor(),
+            transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225]),
+        ])
+    return _normalize
+
+
+def _working_size(width: int, height: int) -> tuple[int, int]:
+    """(w, h) auf Arbeitsaufloesung: kurze Seite dino_input_size, lange max. dino_input_max_size.
+
+    Entspricht RandomResize([800], max_size=1333) aus groundingdino.util.inference.load_image.
+    """
+    size = settings.dino_input_size
+    short_side, long_side = min(width, height), max(width, height)
+    if long_side / short_side * size > settings.dino_input_max_size:
+        size = int(round(settings.dino_input_max_size * short_side / long_side))
+    if width < height:
+        return size, int(size * height / width)
+    return int(size * width / height), size
+
+
+def _prepare_image(img_array: np.ndarray):
+    """RGB-Frame -> normalisierter (3, h, w)-Tensor in Arbeitsaufloesung."""
+    from PIL import Image
+
+    img = Image.fromarray(img_array)
+    target = _working_size(img.width, img.height)
+    if target != img.size:
+        img = img.resize(target, Image.BILINEAR)
+    return _normalize_transform()(img)
+
+
+def _forward(model, arrays: list[np.ndarray], prompt: str) -> tuple[str, list[tuple]]:
+    """Ein Forward-Pass fuer alle *arrays* mit gemeinsamem Prompt.
+
+    Die Frames werden auf Arbeitsaufloesung gebracht und per
+    nested_tensor_from_tensor_list zu einem gepaddeten Batch (mit Maske)
+    zusammengefasst. Boxen bleiben normiert (cx, cy, w, h) relativ zum
+    jeweiligen Frame. Rueckgabe: (Caption, [(logits, boxes)] je Frame).
+    """
+    import torch
+    from groundingdino.util.inference import preprocess_caption
+    from groundingdino.util.misc import nested_tensor_from_tensor_list
+
+    with timing.stage("preprocess"):
+        caption = preprocess_caption(caption=prompt)
+        device = next(model.parameters()).device
+        tensors = [_prepare_image(img_array).to(device) for img_array in arrays]
+    with timing.stage("model"):
+        with torch.no_grad(), precision.inference_context("dino"):
+            outputs = model(nested_tensor_from_tensor_list(tensors), captions=[caption] * len(tensors))
+
+        # Halbpraezision -> float32 fuer Schwellen und numpy
+        logits = outputs["pred_logits"].float().sigmoid().cpu()
+        boxes = outputs["pred_boxes"].float().cpu()
+    return caption, [(logits[i], boxes[i]) for i in range(len(tensors))]
+
+
+def _select(model, caption: str, raw: tuple, box_threshold: float, text_threshold: float) -> tuple:
+    """Schwellen + Phrasen-Zuordnung wie groundingdino.util.inference.predict."""
+    from groundingdino.util.utils import get_phrases_from_posmap
+
+    logits, boxes = raw
+    keep = logits.max(dim=1)[0] > box_threshold
+    logits = logits[keep]
+    boxes = boxes[keep]
+
+    tokenized = model.tokenizer(caption)
+    phrases = [
+        get_phrases_from_posmap(logit > text_threshold, tokenized, model.tokenizer).replace(".", "")
+        for logit in logits
+    ]
+    return boxes, logits.max(dim=1)[0], phrases
+
+
+def _predict_many(
+    model,
+    arrays: list[np.ndarray],
+    prompt: str,
+    thresholds: list[tuple[float, float]],
+) -> list[tuple | None]:
+    """Gebuendelte Inferenz; je Frame (boxes, logits, phrases) oder None bei Fehler."""
+    try:
+        caption, raw = _forward(model, arrays, prompt)
+        with timing.stage("postprocess"):
+            return [
+                _select(model, caption, frame_raw, box_threshold, text_threshold)
+                for frame_raw, (box_threshold, text_threshold) in zip(raw, thresholds)
+            ]
+    except Exception as exc:
+        logger.error("DINO inference failed for %d frame(s): %s", len(arrays), exc)
+        return [None] * len(arrays)
+
+
+def _run_dino_batch(items: list[tuple]) -> list:
+    """Micro-Batch ausfuehren: pro Prompt ein gemeinsamer Forward-Pass."""
+    device = _resolve_device()
+    state = gpu_manager.ensure_loaded(ModelSlot.DINO, device, lambda: _load_dino_on(device))
+
+    groups: dict[str, list[int]] = {}
+    for index, (_, prompt, _, _) in enumerate(items):
+        groups.setdefault(prompt, []).append(index)
+
+    outputs: list = [None] * len(items)
+    for prompt, indices in groups.items():
+        predictions = _predict_many(
+            state.model,
+            [items[i][0] for i in indices],
+            prompt,
+            [(items[i][2], items[i][3]) for i in indices],
+        )
+        for index, prediction in zip(indices, predictions):
+            outputs[index] = prediction
+    return outputs
+
+
+_dino_batcher = batching.register(MicroBatcher(ModelSlot.DINO, _run_dino_batch))
+
+
 def detect(
     image_base64: str,
     text_prompt: str | None,
@@ -72,52 +344,156 @@ def detect(
     text_threshold: float,
 ) -> DinoResponse:
     """Run Grounding DINO detection on a base64-encoded image."""
-    device = _resolve_device()
-    state = gpu_manager.ensure_loaded(ModelSlot.DINO, device, lambda: _load_dino_on(device))
-    model = state.model
-
-    prompt = text_prompt or settings.dino_labels
-
     img = decode_image_safe(
         image_base64,
         max_bytes=settings.inference_max_image_bytes,
         max_pixels=settings.max_image_pixels,
+        min_size=_working_size,
+    )
+    return detect_array(
+        np.asarray(img), text_prompt, box_threshold, text_threshold, original_size=original_size(img),
     )
-    img_array = np.array(img)
 
-    t0 = time.perf_counter()
 
-    try:
-        from groundingdino.util.inference import predict
-        import torch
-        from torchvision import transforms
+def detect_bytes(
+    image_bytes: bytes,
+    text_prompt: str | None,
+    box_threshold: float,
+    text_threshold: float,
+) -> DinoResponse:
+    """Run Grounding DINO detection on raw image bytes (binary upload path)."""
+    img = decode_image_bytes(
+        image_bytes,
+        max_bytes=settings.inference_max_image_bytes,
+        max_pixels=settings.max_image_pixels,
+        min_size=_working_size,
+    )
+    return detect_array(
+        np.asarray(img), text_prompt, box_threshold, text_threshold, original_size=original_size(img),
+    )
 
-        transform = transforms.Compose([
-            transforms.ToTensor(),
-            transforms.Normalize([0.485, 0.456, 0.406], [0.229, 0.224, 0.225]),
-        ])
-        img_tensor = transform(img)
-
-        boxes, logits, phrases = predict(
-            model=model,
-            image=img_tensor,
-            caption=prompt,
-            box_threshold=box_threshold,
-            text_threshold=text_threshold,
-        )
-    except Exception as exc:
-        logger.error("DINO inference failed: %s", exc)
+
+def detect_array(
+    img_array: np.ndarray,
+    text_prompt: str | None,
+    box_threshold: float,
+    text_threshold: float,
+    *,
+    original_size: tuple[int, int] | None = None,
+) -> DinoResponse:
+    """Run Grounding DINO detection on a decoded RGB frame (H, W, 3 uint8).
+
+    Boxes are scaled to *original_size* (width, height) if the frame was
+    decoded reduced, else to the frame itself.
+    """
+    device = _resolve_device()
+    gpu_manager.ensure_loaded(ModelSlot.DINO, device, lambda: _load_dino_on(device))
+
+    prompt = text_prompt or settings.dino_labels
+    w, h = original_size or (img_array.shape[1], img_array.shape[0])
+
+    outcome = _dino_batcher.run((img_array, prompt, box_threshold, text_threshold))
+    with timing.stage("postprocess"):
         return DinoResponse(
-            detections=[],
-            inference_time_ms=round((time.perf_counter() - t0) * 1000, 1),
+            detections=_detections_from_prediction(outcome.value, w, h),
+            inference_time_ms=round(outcome.batch_time_ms, 1),
+            precision=precision.active("dino") or "fp32",
         )
 
-    elapsed_ms = (time.perf_counter() - t0) * 1000
-    h, w = img_array.shape[:2]
 
+def detect_batch(
+    images_base64: list[str],
+    text_prompt: str | None,
+    box_threshold: float,
+    text_threshold: float,
+) -> DinoBatchResponse:
+    """Like detect_batch_arrays, for base64-encoded frames."""
+    _check_batch_size(len(images_base64))
+    images = [
+        decode_image_safe(
+            image_base64,
+            max_bytes=settings.inference_max_image_bytes,
+            max_pixels=settings.max_image_pixels,
+            min_size=_working_size,
+        )
+        for image_base64 in images_base64
+    ]
+    return detect_batch_arrays(
+        [np.asarray(img) for img in images],
+        text_prompt,
+        box_threshold,
+        text_threshold,
+        original_sizes=[original_size(img) for img in images],
+    )
+
+
+def detect_batch_arrays(
+    img_arrays: list[np.ndarray],
+    text_prompt: str | None,
+    box_threshold: float,
+    text_threshold: float,
+    *,
+    original_sizes: list[tuple[int, int]] | None = None,
+) -> DinoBatchResponse:
+    """Run Grounding DINO on several frames in one forward pass with a shared prompt.
+
+    Frames may differ in size; boxes are mapped back to each frame's
+    original resolution (*original_sizes* for reduced decodes). Results
+    keep the input order.
+    """
+    _check_batch_size(len(img_arrays))
+    started = time.perf_counter()
+
+    device = _resolve_device()
+    prompt = text_prompt or settings.dino_labels
+    with gpu_manager.in_use(ModelSlot.DINO), batching.inference_lock(ModelSlot.DINO):
+        state = gpu_manager.ensure_loaded(ModelSlot.DINO, device, lambda: _load_dino_on(device))
+        t0 = time.perf_counter()
+        predictions = _predict_many(
+            state.model,
+            img_arrays,
+            prompt,
+            [(box_threshold, text_threshold)] * len(img_arrays),
+        )
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    # Batch-Zeit anteilig auf die Frames verteilen
+    per_frame_ms = round(elapsed_ms / len(img_arrays), 1)
+    active_precision = precision.active("dino") or "fp32"
+    results = []
+    with timing.stage("postprocess"):
+        sizes = original_sizes or [(img.shape[1], img.shape[0]) for img in img_arrays]
+        for (w, h), prediction in zip(sizes, predictions):
+            results.append(DinoResponse(
+                detections=_detections_from_prediction(prediction, w, h),
+                inference_time_ms=per_frame_ms,
+                precision=active_precision,
+            ))
+
+    return DinoBatchResponse(
+        results=results,
+        frame_count=len(img_arrays),
+        inference_time_ms=round(elapsed_ms, 1),
+        total_time_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
+
+
+def _check_batch_size(frame_count: int) -> None:
+    if frame_count > settings.dino_batch_max_frames:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"batch exceeds {settings.dino_batch_max_frames} frames",
+        )
+
+
+def _detections_from_prediction(prediction: tuple | None, w: int, h: int) -> list[DinoDetection]:
+    """(boxes, logits, phrases) mit normierten cx,cy,w,h -> absolute x1,y1,x2,y2 im Frame."""
+    if prediction is None:
+        return []
+
+    boxes, logits, phrases = prediction
     detections: list[DinoDetection] = []
     for box, logit, phrase in zip(boxes, logits, phrases):
-        # boxes are cx,cy,w,h normalized -> convert to x1,y1,x2,y2 absolute
         cx, cy, bw, bh = box.tolist()
         x1 = (cx - bw / 2) * w
         y1 = (cy - bh / 2) * h
@@ -132,8 +508,4 @@ def detect(
             confidence=round(float(logit), 4),
             phrase=phrase.strip(),
         ))
-
-    return DinoResponse(
-        detections=detections,
-        inference_time_ms=round(elapsed_ms, 1),
-    )
+    return detections
@@ -0,0 +1,93 @@
+"""Per-session near-duplicate filter for consecutive frames.
+
+A stationary camera (manhole, lateral) delivers many almost identical
+frames. For requests with a ``session_id`` each frame is reduced to a small
+luminance thumbnail; if it differs from the thumbnail of the last *analysed*
+frame of that session by less than ``dedup_max_mean_diff`` grey levels on
+average, the previous result is reused instead of running inference again.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Hashable
+
+import numpy as np
+
+from ..cache import ByteBudgetLRU
+from ..config import settings
+
+
+@dataclass
+class _SessionState:
+    fingerprint: np.ndarray
+    key: Hashable          # Parameter, unter denen das Ergebnis gilt (z.B. Konfidenz)
+    result: Any
+    reuse_count: int = 0
+
+
+_SAMPLES_PER_CELL = 8
+
+_sessions = ByteBudgetLRU(
+    max_bytes=settings.dedup_max_sessions * settings.dedup_thumbnail_size ** 2 * 2,
+    max_entries=settings.dedup_max_sessions,
+)
+_lock = threading.Lock()
+_stats = {"lookups": 0, "reused": 0}
+
+
+def fingerprint(img_array: np.ndarray) -> np.ndarray:
+    """Graustufen-Thumbnail (size x size, int16) per Blockmittel ueber ein Stichprobenraster."""
+    size = settings.dedup_thumbnail_size
+    h, w = img_array.shape[:2]
+    # je Thumbnail-Zelle ein 8x8-Raster -> rauschunempfindlich, ohne Vollbild-Kopie
+    grid = size * _SAMPLES_PER_CELL
+    rows = np.linspace(0, h - 1, grid).astype(np.intp)
+    cols = np.linspace(0, w - 1, grid).astype(np.intp)
+    sampled = img_array[rows[:, None], cols[None, :]]
+    if sampled.ndim == 3:
+        sampled = sampled.mean(axis=2)
+    cells = sampled.reshape(size, _SAMPLES_PER_CELL, size, _SAMPLES_PER_CELL).mean(axis=(1, 3))
+    return np.rint(cells).astype(np.int16)
+
+
+def _is_similar(a: np.ndarray, b: np.ndarray) -> bool:
+    return float(np.abs(a - b).mean()) <= settings.dedup_max_mean_diff
+
+
+def lookup(session_id: str, fp: np.ndarray, key: Hashable) -> Any:
+    """Cached result of the last analysed frame when *fp* is a near-duplicate, else None."""
+    with _lock:
+        _stats["lookups"] += 1
+        state: _SessionState | None = _sessions.get(session_id)
+        if state is None or state.key != key:
+            return None
+        if state.reuse_count >= settings.dedup_max_reuse:
+            return None  # regelmaessig neu analysieren, auch bei Standbild
+        if not _is_similar(state.fingerprint, fp):
+            return None
+        state.reuse_count += 1
+        _stats["reused"] += 1
+        return state.result
+
+
+def remember(session_id: str, fp: np.ndarray, key: Hashable, result: Any) -> None:
+    """Store *result* as the reference for following frames of *session_id*."""
+    with _lock:
+        _sessions.put(session_id, _SessionState(fp, key, result), fp.nbytes)
+
+
+def forget(session_id: str) -> bool:
+    with _lock:
+        return _sessions.pop(session_id) is not None
+
+
+def get_status() -> dict:
+    with _lock:
+        return {
+            "enabled": settings.dedup_enabled,
+            "sessions": len(_sessions),
+            "lookups": _stats["lookups"],
+            "reused": _stats["reused"],
+        }
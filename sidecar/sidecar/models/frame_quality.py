@@ -0,0 +1,138 @@
+"""Frame-Quality-Gate: schwarze, ueberbelichtete, uniforme und unscharfe Frames erkennen.
+
+Statt drei Float-Kopien in voller Aufloesung (Graubild, scipy-Laplace) wird
+auf einem Stichprobenraster gerechnet: jede ``step``-te Zeile/Spalte, mit
+Ganzzahl-Summen ueber die Farbkanaele. Der Laplace-Operator nutzt an jedem
+Rasterpunkt die echten Nachbarpixel (Abstand 1), Mittelwert, Streuung und
+Kantenvarianz sind damit Stichproben-Schaetzer der Vollbild-Werte und die
+Schwellen aus config.py gelten unveraendert.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+
+import numpy as np
+
+from ..config import settings
+
+
+@dataclass(frozen=True)
+class FrameQuality:
+    brightness: float
+    std: float
+    edge_var: float
+    usable: bool
+    reason: str
+
+
+def _sample_step(height: int, width: int) -> int:
+    side = settings.frame_quality_sample_side
+    if side <= 0:
+        return 1
+    step = max(1, math.ceil(max(height, width) / side))
+    # ungerade Schrittweite: kein Aliasing mit 2-Pixel-Mustern (Zeilensprung, Bayer)
+    return step | 1
+
+
+def _gray_sum(view: np.ndarray) -> np.ndarray:
+    """Summe der Farbkanaele als int16 (<= 4 * 255, Laplace <= 8 * 1020).
+
+    Kanalweise Addition ist auf gestrideten Views deutlich schneller als
+    ein sum(axis=-1)-Reduce.
+    """
+    total = view[..., 0].astype(np.int16)
+    for channel in range(1, view.shape[-1]):
+        total += view[..., channel]
+    return total
+
+
+def _moments(values: np.ndarray, axes: tuple[int, ...]) -> tuple[np.ndarray, np.ndarray]:
+    """Mittelwert und Varianz ueber *axes* aus exakten int64-Summen."""
+    n = math.prod(values.shape[axis] for axis in axes)
+    s1 = values.sum(axis=axes, dtype=np.int64)
+    s2 = np.square(values, dtype=np.int64).sum(axis=axes)
+    mean = s1 / n
+    return mean, np.maximum(s2 / n - mean * mean, 0.0)
+
+
+def _statistics(frames: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(brightness, std, edge_var) fuer einen (B, H, W, C)-Stapel in einem Durchgang."""
+    _, h, w, channels = frames.shape
+    axes = (1, 2)
+
+    if h < 3 or w < 3:
+        gray_sum = _gray_sum(frames)
+        mean, var = _moments(gray_sum, axes)
+        zeros = np.zeros(len(frames))
+        return mean / channels, np.sqrt(var) / channels, zeros
+
+    step = _sample_step(h, w)
+    # Rasterpunkte (1..h-2, 1..w-2) und ihre vier direkten Nachbarn, alles Views
+    center = frames[:, 1:h - 1:step, 1:w - 1:step]
+    up = frames[:, 0:h - 2:step, 1:w - 1:step]
+    down = frames[:, 2:h:step, 1:w - 1:step]
+    left = frames[:, 1:h - 1:step, 0:w - 2:step]
+    right = frames[:, 1:h - 1:step, 2:w:step]
+
+    # Kanal-Summe statt Mittelwert: bleibt ganzzahlig, Skalierung erst am Ende
+    gray_sum = _gray_sum(center)
+    laplace = _gray_sum(up)
+    laplace += _gray_sum(down)
+    laplace += _gray_sum(left)
+    laplace += _gray_sum(right)
+    laplace -= 4 * gray_sum
+
+    mean, var = _moments(gray_sum, axes)
+    _, edge_var = _moments(laplace, axes)
+    return mean / channels, np.sqrt(var) / channels, edge_var / (channels * channels)
+
+
+def _verdict(brightness: float, std: float, edge_var: float) -> tuple[bool, str]:
+    # Too dark (lens cap, black frame, no signal) -- Schwelle bewusst niedrig,
+    # damit dunkle, aber inhaltlich gueltige Kanal-Frames erhalten bleiben.
+    if brightness < settings.frame_min_brightness:
+        return False, "too_dark"
+    # Too bright (overexposed, white frame)
+    if brightness > settings.frame_max_brightness:
+        return False, "too_bright"
+    # Too uniform (solid color, no texture = likely no pipe content)
+    if std < settings.frame_min_std:
+        return False, "too_uniform"
+    # A very blurry frame has low edge (Laplacian) variance
+    if edge_var < settings.frame_min_edge_var:
+        return False, "too_blurry"
+    return True, "ok"
+
+
+def _as_batch(frames: np.ndarray) -> np.ndarray:
+    if frames.ndim == 3:  # (B, H, W) Graubilder
+        return frames[..., None]
+    if frames.ndim != 4:
+        raise ValueError(f"expected (B, H, W[, C]) frames, got shape {frames.shape}")
+    return frames
+
+
+def assess_frames(frames: np.ndarray | list[np.ndarray]) -> list[FrameQuality]:
+    """Quality gate for several frames.
+
+    A (B, H, W, C) array is evaluated in one vectorised pass; a list of
+    differently sized frames is evaluated frame by frame.
+    """
+    if isinstance(frames, np.ndarray):
+        brightness, std, edge_var = _statistics(_as_batch(frames))
+        results = []
+        for b, s, e in zip(brightness.tolist(), std.tolist(), edge_var.tolist()):
+            usable, reason = _verdict(b, s, e)
+            results.append(FrameQuality(b, s, e, usable, reason))
+        return results
+    return [assess_frame(frame) for frame in frames]
+
+
+def assess_frame(frame: np.ndarray) -> FrameQuality:
+    """Quality gate for one (H, W[, C]) uint8 frame."""
+    frame = np.asarray(frame)
+    if frame.ndim == 2:
+        frame = frame[..., None]
+    return assess_frames(frame[None])[0]
@@ -1,24 +1,68 @@
-"""Gemeinsames, sicheres Bild-Dekodieren fuer Sidecar-Endpunkte."""
+"""Gemeinsames, sicheres Bild-Dekodieren fuer Sidecar-Endpunkte.
+
+Wrapper, die das Bild ohnehin verkleinern (YOLO, YOLO-cls, DINO), geben
+``min_size`` mit: eine Funktion (Breite, Hoehe) des Originals -> kleinste
+Groesse, die ihr Modell-Input noch abdeckt. JPEGs werden dann per
+``Image.draft()`` direkt in der DCT um 1/2, 1/4 oder 1/8 verkleinert
+dekodiert (groesster Faktor, der ``min_size`` noch abdeckt). Die
+Originalgroesse steht danach in ``original_size(img)``, damit Boxen auf
+Originalkoordinaten zurueckgerechnet werden koennen. Andere Formate und
+SAM / Image-Store / Training dekodieren weiter in voller Aufloesung.
+"""
 
 from __future__ import annotations
 
 import base64
 import binascii
 import io
+import math
+from typing import Callable
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, status
 from PIL import Image
 
+from ..config import settings
+from ..timing import stage
+
+# Content-Types fuer rohe Bild-Uploads (binaere Endpunkte)
+_RAW_IMAGE_CONTENT_TYPES = ("application/octet-stream", "image/")
+
+# (Breite, Hoehe) des Originals -> kleinste (Breite, Hoehe), die der Konsument braucht
+DecodeSize = Callable[[int, int], tuple[int, int]]
+
+
+def long_side_size(width: int, height: int, side: int) -> tuple[int, int]:
+    """Groesse, bei der die lange Seite *side* abdeckt (Letterbox, z. B. YOLO imgsz)."""
+    scale = min(1.0, side / max(width, height))
+    return max(1, math.ceil(width * scale)), max(1, math.ceil(height * scale))
+
+
+def short_side_size(width: int, height: int, side: int) -> tuple[int, int]:
+    """Groesse, bei der die kurze Seite *side* abdeckt (Resize + Center-Crop, z. B. YOLO-cls)."""
+    scale = min(1.0, side / min(width, height))
+    return max(1, math.ceil(width * scale)), max(1, math.ceil(height * scale))
+
+
+def original_size(img: Image.Image) -> tuple[int, int]:
+    """(Breite, Hoehe) vor einem reduzierten Dekodieren, sonst ``img.size``."""
+    return img.info.get("original_size", img.size)
+
 
 def decode_image_safe(
     image_base64: str,
     *,
     max_bytes: int,
     max_pixels: int,
+    min_size: DecodeSize | None = None,
 ) -> Image.Image:
     """Dekodiert base64-Bilder mit Groessen-, Format- und Pixel-Limit."""
+    raw = decode_base64_bytes(image_base64, max_bytes=max_bytes)
+    return decode_image_bytes(raw, max_bytes=max_bytes, max_pixels=max_pixels, min_size=min_size)
+
+
+def decode_base64_bytes(image_base64: str, *, max_bytes: int) -> bytes:
+    """Prueft Laenge und Alphabet eines base64-Strings und liefert die Roh-Bytes."""
     max_bytes = max(1, int(max_bytes))
-    max_pixels = max(1, int(max_pixels))
 
     max_base64_chars = ((max_bytes + 2) // 3) * 4
     if len(image_base64) > max_base64_chars:
@@ -28,13 +72,29 @@ def decode_image_safe(
         )
 
     try:
-        raw = base64.b64decode(image_base64, validate=True)
+        with stage("decode"):
+            return base64.b64decode(image_base64, validate=True)
     except (binascii.Error, ValueError) as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="image is not valid base64",
         ) from exc
 
+
+def decode_image_bytes(
+    raw: bytes,
+    *,
+    max_bytes: int,
+    max_pixels: int,
+    min_size: DecodeSize | None = None,
+) -> Image.Image:
+    """Dekodiert rohe Bild-Bytes mit denselben Groessen- und Pixel-Limits.
+
+    Mit *min_size* werden JPEGs reduziert dekodiert (siehe Moduldoku).
+    """
+    max_bytes = max(1, int(max_bytes))
+    max_pixels = max(1, int(max_pixels))
+
     if len(raw) > max_bytes:
         raise HTTPException(
             status_code=status.HTTP_413_CONTENT_TOO_LARGE,
@@ -42,7 +102,7 @@ def decode_image_safe(
         )
 
     try:
-        with Image.open(io.BytesIO(raw)) as img:
+        with stage("decode"), Image.open(io.BytesIO(raw)) as img:
             width, height = img.size
             if width <= 0 or height <= 0 or width * height > max_pixels:
                 raise HTTPException(
@@ -50,7 +110,12 @@ def decode_image_safe(
                     detail="image exceeds pixel limit",
                 )
 
-            return img.convert("RGB")
+            if min_size is not None and settings.reduced_decode_enabled:
+                img.draft("RGB", min_size(width, height))
+            rgb = img.convert("RGB")
+            if rgb.size != (width, height):
+                rgb.info["original_size"] = (width, height)
+            return rgb
     except HTTPException:
         raise
     except Exception as exc:
@@ -58,3 +123,42 @@ def decode_image_safe(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="image is not a supported image",
         ) from exc
+
+
+async def read_image_body(request: Request, *, max_bytes: int) -> bytes:
+    """Liest einen rohen Bild-Body (octet-stream / image/*) mit hartem Groessenlimit.
+
+    Der Body wird gestreamt und beim Ueberschreiten von *max_bytes* sofort
+    abgebrochen, statt erst komplett in den Speicher geladen zu werden.
+    """
+    max_bytes = max(1, int(max_bytes))
+
+    content_type = (request.headers.get("content-type") or "").split(";", 1)[0].strip().lower()
+    if not content_type.startswith(_RAW_IMAGE_CONTENT_TYPES):
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="expected application/octet-stream or image/* body",
+        )
+
+    declared = request.headers.get("content-length")
+    if declared and declared.isdigit() and int(declared) > max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail="image exceeds size limit",
+        )
+
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                detail="image exceeds size limit",
+            )
+
+    if not body:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="image body is empty",
+        )
+    return bytes(body)
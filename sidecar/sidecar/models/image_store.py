@@ -0,0 +1,83 @@
+"""Server-side store of decoded frames, addressed by a content hash (image_id).
+
+A frame is uploaded and decoded once via /images; YOLO, DINO, SAM and
+classify then reference it by ``image_id`` instead of re-sending base64.
+"""
+
+from __future__ import annotations
+
+import hashlib
+
+import numpy as np
+from fastapi import HTTPException, status
+
+from ..cache import ByteBudgetLRU
+from ..config import settings
+from ..schemas.detection import ImageUploadResponse
+from .image_decode import decode_base64_bytes, decode_image_bytes
+
+
+_cache = ByteBudgetLRU(settings.image_cache_max_bytes)
+
+
+def image_id_for(raw: bytes) -> str:
+    """Content hash of the encoded image bytes."""
+    return hashlib.blake2b(raw, digest_size=16).hexdigest()
+
+
+def store_bytes(raw: bytes) -> ImageUploadResponse:
+    """Decode *raw* once and keep the RGB array; re-uploads of the same bytes are free."""
+    image_id = image_id_for(raw)
+    cached = _cache.get(image_id)
+    if cached is not None:
+        return _describe(image_id, cached, already_cached=True)
+
+    img = decode_image_bytes(
+        raw,
+        max_bytes=settings.inference_max_image_bytes,
+        max_pixels=settings.max_image_pixels,
+    )
+    img_array = np.asarray(img)
+    # Mehrere Modelle lesen dasselbe Array -> gegen versehentliches Ueberschreiben sperren
+    img_array.setflags(write=False)
+    if not _cache.put(image_id, img_array, img_array.nbytes):
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail="decoded image exceeds image cache budget",
+        )
+    return _describe(image_id, img_array, already_cached=False)
+
+
+def store_base64(image_base64: str) -> ImageUploadResponse:
+    """Like store_bytes, for base64 JSON uploads."""
+    return store_bytes(decode_base64_bytes(image_base64, max_bytes=settings.inference_max_image_bytes))
+
+
+def load(image_id: str) -> np.ndarray:
+    """Decoded RGB array for *image_id*; 404 when evicted or unknown (client re-uploads)."""
+    img_array = _cache.get(image_id)
+    if img_array is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="unknown image_id",
+        )
+    return img_array
+
+
+def discard(image_id: str) -> bool:
+    return _cache.pop(image_id) is not None
+
+
+def get_status() -> dict:
+    return _cache.stats()
+
+
+def _describe(image_id: str, img_array: np.ndarray, *, already_cached: bool) -> ImageUploadResponse:
+    height, width = img_array.shape[:2]
+    return ImageUploadResponse(
+        image_id=image_id,
+        width=int(width),
+        height=int(height),
+        size_bytes=int(img_array.nbytes),
+        already_cached=already_cached,
+    )
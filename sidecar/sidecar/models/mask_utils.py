@@ -0,0 +1,180 @@
+"""Vektorisierte Masken-Helfer (ohne ML-Abhaengigkeiten)."""
+
+from __future__ import annotations
+
+import base64
+from dataclasses import dataclass
+
+import numpy as np
+
+
+MASK_ENCODINGS = ("rle", "coco_rle", "bitpacked")
+
+
+@dataclass
+class MaskStatistics:
+    """Kennzahlen fuer einen Stapel binaerer Masken (je Eintrag ein Array der Laenge B)."""
+    area: np.ndarray
+    x_min: np.ndarray
+    x_max: np.ndarray
+    y_min: np.ndarray
+    y_max: np.ndarray
+    centroid_x: np.ndarray
+    centroid_y: np.ndarray
+
+    @property
+    def width(self) -> np.ndarray:
+        return self.x_max - self.x_min + 1
+
+    @property
+    def height(self) -> np.ndarray:
+        return self.y_max - self.y_min + 1
+
+
+def mask_statistics(masks: np.ndarray) -> MaskStatistics:
+    """Flaeche, Ausdehnung und Schwerpunkt fuer (B, H, W)-Masken in einem Durchgang.
+
+    Statt np.where je Maske werden Zeilen-/Spaltensummen gebildet; daraus
+    folgen Bounding-Box (erste/letzte belegte Zeile bzw. Spalte) und
+    Schwerpunkt (gewichtetes Mittel der Indizes). Leere Masken haben area 0.
+    """
+    if masks.ndim != 3:
+        raise ValueError(f"expected (B, H, W) masks, got shape {masks.shape}")
+
+    _, h, w = masks.shape
+    rows = masks.sum(axis=2, dtype=np.int64)  # (B, H) belegte Pixel je Zeile
+    cols = masks.sum(axis=1, dtype=np.int64)  # (B, W) belegte Pixel je Spalte
+    area = rows.sum(axis=1)
+
+    row_any = rows > 0
+    col_any = cols > 0
+    y_min = row_any.argmax(axis=1)
+    y_max = h - 1 - row_any[:, ::-1].argmax(axis=1)
+    x_min = col_any.argmax(axis=1)
+    x_max = w - 1 - col_any[:, ::-1].argmax(axis=1)
+
+    safe_area = np.maximum(area, 1)
+    centroid_y = rows @ np.arange(h, dtype=np.float64) / safe_area
+    centroid_x = cols @ np.arange(w, dtype=np.float64) / safe_area
+
+    return MaskStatistics(
+        area=area,
+        x_min=x_min,
+        x_max=x_max,
+        y_min=y_min,
+        y_max=y_max,
+        centroid_x=centroid_x,
+        centroid_y=centroid_y,
+    )
+
+
+def mask_iou(a: np.ndarray, b: np.ndarray) -> float:
+    """Intersection over Union zweier gleich grosser Bool-Masken (zwei leere Masken -> 1.0)."""
+    union = np.count_nonzero(a | b)
+    if union == 0:
+        return 1.0
+    return np.count_nonzero(a & b) / union
+
+
+def _runs(flat: np.ndarray) -> np.ndarray:
+    """Laengen der Abschnitte gleichen Werts in einem 1-D-Array."""
+    change = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    return np.diff(np.concatenate(([0], change, [flat.size])))
+
+
+def encode_rle(mask: np.ndarray) -> str:
+    """Bisheriges Format: "startwert,lauf1,lauf2,..." in Zeilenreihenfolge."""
+    flat = mask.ravel(order="C").astype(bool, copy=False)
+    if flat.size == 0:
+        return ""
+    return ",".join(map(str, [int(flat[0]), *_runs(flat).tolist()]))
+
+
+def encode_coco_rle(mask: np.ndarray) -> str:
+    """COCO-kompatibles komprimiertes RLE ("counts" von pycocotools.mask.encode).
+
+    Spaltenweise Laeufe, beginnend mit einem 0-Lauf; jede Zahl wird als
+    Differenz zum vorletzten Lauf (ab dem vierten) in 5-Bit-Gruppen (ASCII ab '0') abgelegt.
+    Die Gruppen werden fuer alle Laeufe gleichzeitig berechnet.
+    """
+    flat = mask.ravel(order="F").astype(bool, copy=False)
+    if flat.size == 0:
+        return ""
+    counts = _runs(flat)
+    if flat[0]:
+        counts = np.concatenate(([0], counts))
+
+    values = counts.astype(np.int64)
+    # wie pycocotools (rleToString): erst ab dem vierten Lauf Differenzen
+    values[3:] -= counts[1:-2]
+
+    # 5-Bit-Gruppen inkl. Vorzeichenbit fuer den groessten Betrag
+    max_chunks = int(np.abs(values).max()).bit_length() // 5 + 1
+    shifts = 5 * np.arange(max_chunks, dtype=np.int64)
+    chunks = (values[:, None] >> shifts) & 0x1F
+    rest = values[:, None] >> (shifts + 5)
+    # fertig, sobald der Rest nur noch aus dem Vorzeichen der letzten Gruppe besteht
+    done = np.where(chunks & 0x10, rest == -1, rest == 0)
+    n_chunks = done.argmax(axis=1) + 1
+
+    position = np.arange(max_chunks)
+    chars = chunks | np.where(position < (n_chunks - 1)[:, None], 0x20, 0)
+    chars = (chars + 48)[position < n_chunks[:, None]]
+    return chars.astype(np.uint8).tobytes().decode("ascii")
+
+
+def encode_bitpacked(mask: np.ndarray) -> str:
+    """Ein Bit je Pixel (Zeilenreihenfolge, MSB zuerst), base64-kodiert."""
+    return base64.b64encode(np.packbits(mask.astype(bool, copy=False), axis=None)).decode("ascii")
+
+
+def encode_mask(mask: np.ndarray, encoding: str) -> str:
+    """Eine (H, W)-Maske im gewuenschten Format kodieren (siehe MASK_ENCODINGS)."""
+    if encoding == "rle":
+        return encode_rle(mask)
+    if encoding == "coco_rle":
+        return encode_coco_rle(mask)
+    if encoding == "bitpacked":
+        return encode_bitpacked(mask)
+    raise ValueError(f"unknown mask encoding: {encoding!r}")
+
+
+def decode_mask(data: str, encoding: str, size: tuple[int, int]) -> np.ndarray:
+    """Gegenstueck zu encode_mask; liefert eine (H, W)-bool-Maske."""
+    h, w = size
+    if encoding == "rle":
+        if not data:
+            return np.zeros((h, w), dtype=bool)
+        start, *runs = (int(part) for part in data.split(","))
+        values = (np.arange(len(runs)) + start) % 2 == 1
+        return np.repeat(values, runs).reshape(h, w)
+    if encoding == "coco_rle":
+        counts = _coco_counts(data)
+        values = np.arange(len(counts)) % 2 == 1
+        return np.repeat(values, counts).reshape((h, w), order="F")
+    if encoding == "bitpacked":
+        bits = np.unpackbits(np.frombuffer(base64.b64decode(data), dtype=np.uint8), count=h * w)
+        return bits.astype(bool).reshape(h, w)
+    raise ValueError(f"unknown mask encoding: {encoding!r}")
+
+
+def _coco_counts(data: str) -> list[int]:
+    """Laeufe aus einem komprimierten COCO-RLE-String (rleFrString)."""
+    counts: list[int] = []
+    pos = 0
+    while pos < len(data):
+        value = 0
+        shift = 0
+        more = True
+        while more:
+            c = ord(data[pos]) - 48
+            value |= (c & 0x1F) << shift
+            more = bool(c & 0x20)
+            pos += 1
+            shift += 5
+            if not more and c & 0x10:
+                value |= -1 << shift
+        if len(counts) > 2:
+            value += counts[-2]
+        counts.append(value)
+    return counts
@@ -0,0 +1,300 @@
+"""ONNX-Runtime-Backend fuer YOLO auf CPU (Feldlaptops ohne CUDA).
+
+Statt das PyTorch-Modell per ``model.to("cpu")`` laufen zu lassen, wird ein
+Ultralytics-ONNX-Export (``yolo export format=onnx``) direkt mit ONNX Runtime
+ausgefuehrt: Letterbox, ein session.run je Batch, Decodierung und NMS in
+numpy. ``OnnxYoloModel.predict`` hat dieselbe Signatur wie
+``ultralytics.YOLO.predict``, damit yolo_wrapper beide Modelle gleich nutzt.
+
+Unterstuetzte Ausgaben:
+- ``(B, 4 + nc, N)``  klassischer Kopf (cx, cy, w, h, Klassen-Scores) -> NMS hier
+- ``(B, N, 6)``       NMS-freier End-to-End-Kopf (x1, y1, x2, y2, conf, cls)
+- ``(B, nc)``         Klassifikator (YOLO-cls, Softmax bereits im Export)
+"""
+
+from __future__ import annotations
+
+import ast
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+PAD_VALUE = 114
+MAX_WH = 7680        # Klassen-Offset fuer NMS je Klasse (wie Ultralytics)
+MAX_NMS = 30000      # max. Kandidaten in die NMS
+
+
+@dataclass
+class OnnxYoloResult:
+    """Detektionen eines Frames in Originalpixeln."""
+    xyxy: np.ndarray                      # (N, 4) float32
+    conf: np.ndarray                      # (N,) float32
+    cls: np.ndarray                       # (N,) int64
+    names: dict[int, str] = field(default_factory=dict)
+
+
+def _resize(img: np.ndarray, width: int, height: int) -> np.ndarray:
+    try:
+        import cv2
+        return cv2.resize(img, (width, height), interpolation=cv2.INTER_LINEAR)
+    except ImportError:
+        from PIL import Image
+        return np.asarray(Image.fromarray(img).resize((width, height), Image.BILINEAR))
+
+
+def letterbox(img: np.ndarray, new_shape: tuple[int, int]) -> tuple[np.ndarray, float, tuple[int, int]]:
+    """Seitenverhaeltnis-treu auf *new_shape* (h, w) skalieren und mittig mit 114 auffuellen.
+
+    Rueckgabe: (Bild, Skalierung, (links, oben)) – Rundung wie Ultralytics LetterBox.
+    """
+    h, w = img.shape[:2]
+    ratio = min(new_shape[0] / h, new_shape[1] / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    dw, dh = (new_shape[1] - new_w) / 2, (new_shape[0] - new_h) / 2
+    if (new_w, new_h) != (w, h):
+        img = _resize(img, new_w, new_h)
+    top, bottom = int(round(dh - 0.1)), int(round(dh + 0.1))
+    left, right = int(round(dw - 0.1)), int(round(dw + 0.1))
+    padded = np.pad(img, ((top, bottom), (left, right), (0, 0)), constant_values=PAD_VALUE)
+    return padded, ratio, (left, top)
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy-NMS auf (N, 4)-xyxy-Boxen; Indizes der behaltenen Boxen, nach Score absteigend."""
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+        iw = (np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest])).clip(0)
+        ih = (np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest])).clip(0)
+        inter = iw * ih
+        iou = inter / (areas[best] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def _decode(
+    prediction: np.ndarray,
+    conf_threshold: float,
+    iou_threshold: float,
+    max_det: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Rohausgabe eines Frames -> (xyxy, conf, cls) im Letterbox-Koordinatensystem."""
+    if prediction.shape[-1] == 6 and prediction.shape[0] > prediction.shape[1]:
+        # End-to-End-Kopf: bereits NMS-frei, nur Schwelle und max_det
+        keep = prediction[:, 4] > conf_threshold
+        rows = prediction[keep][:max_det]
+        return rows[:, :4], rows[:, 4], rows[:, 5].astype(np.int64)
+
+    rows = prediction.T  # (N, 4 + nc)
+    scores = rows[:, 4:]
+    cls = scores.argmax(axis=1)
+    conf = scores[np.arange(len(rows)), cls]
+    keep = conf > conf_threshold
+    rows, cls, conf = rows[keep], cls[keep], conf[keep]
+    if len(rows) > MAX_NMS:
+        top = conf.argsort()[::-1][:MAX_NMS]
+        rows, cls, conf = rows[top], cls[top], conf[top]
+
+    cx, cy, w, h = rows[:, 0], rows[:, 1], rows[:, 2], rows[:, 3]
+    xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    # NMS je Klasse in einem Aufruf: Boxen verschiedener Klassen ueberlappen nie
+    kept = nms(xyxy + (cls * MAX_WH)[:, None], conf, iou_threshold)[:max_det]
+    return xyxy[kept], conf[kept], cls[kept].astype(np.int64)
+
+
+def _to_original(
+    xyxy: np.ndarray,
+    ratio: float,
+    pad: tuple[int, int],
+    shape: tuple[int, int],
+) -> np.ndarray:
+    boxes = xyxy.astype(np.float32, copy=True)
+    boxes[:, [0, 2]] -= pad[0]
+    boxes[:, [1, 3]] -= pad[1]
+    boxes /= ratio
+    boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, shape[1])
+    boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, shape[0])
+    return boxes
+
+
+def _parse_names(raw: str | None) -> dict[int, str]:
+    if not raw:
+        return {}
+    try:
+        names = ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        return {}
+    if isinstance(names, list):
+        return dict(enumerate(str(name) for name in names))
+    return {int(key): str(value) for key, value in names.items()}
+
+
+def session_options() -> Any:
+    """SessionOptions aus den onnx_*-Settings (0 Threads = ONNX-Runtime-Default)."""
+    import onnxruntime as ort
+
+    levels = {
+        "disable": ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+        "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+        "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+        "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+    }
+    options = ort.SessionOptions()
+    level = settings.onnx_graph_optimization.strip().lower()
+    if level not in levels:
+        logger.warning("Unknown onnx_graph_optimization %r, using 'all'", level)
+        level = "all"
+    options.graph_optimization_level = levels[level]
+    if settings.onnx_intra_op_threads > 0:
+        options.intra_op_num_threads = settings.onnx_intra_op_threads
+    if settings.onnx_inter_op_threads > 0:
+        options.inter_op_num_threads = settings.onnx_inter_op_threads
+        # Inter-Op-Threads wirken nur bei paralleler Graph-Ausfuehrung
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL
+    return options
+
+
+def quantized_path(model_path: Path) -> Path:
+    """``<name>.int8.onnx`` neben *model_path*; beim ersten Mal per dynamischer Quantisierung erzeugt."""
+    if model_path.name.endswith(".int8.onnx"):
+        return model_path
+    target = model_path.with_name(model_path.stem + ".int8.onnx")
+    if not target.exists():
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info("Quantizing %s -> %s (INT8 weights)", model_path.name, target.name)
+        quantize_dynamic(str(model_path), str(target), weight_type=QuantType.QUInt8)
+    return target
+
+
+class _OnnxSession:
+    """Gemeinsame Session-Verwaltung fuer Detektor und Klassifikator."""
+
+    def __init__(self, model_path: str | Path, quantize_int8: bool) -> None:
+        import onnxruntime as ort
+
+        path = Path(model_path)
+        self.quantized = False
+        if quantize_int8:
+            try:
+                path = quantized_path(path)
+                self.quantized = True
+            except Exception as exc:
+                logger.warning("INT8 quantization of %s failed (%s), using FP32 weights", path.name, exc)
+
+        self.model_path = path
+        self.session = ort.InferenceSession(
+            str(path), sess_options=session_options(), providers=["CPUExecutionProvider"],
+        )
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        batch, _, height, width = model_input.shape
+        self.static_batch = batch if isinstance(batch, int) else None
+        self.static_shape = (height, width) if isinstance(height, int) and isinstance(width, int) else None
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.names = _parse_names(metadata.get("names"))
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        """Ein session.run je Batch; bei fester Batch-Groesse Frame fuer Frame."""
+        if self.static_batch is not None and self.static_batch != len(batch):
+            return np.concatenate([
+                self.session.run(None, {self.input_name: batch[i:i + 1]})[0]
+                for i in range(len(batch))
+            ])
+        return self.session.run(None, {self.input_name: batch})[0]
+
+    def status(self) -> dict:
+        options = self.session.get_session_options()
+        return {
+            "model_path": str(self.model_path),
+            "quantized_int8": self.quantized,
+            "input_shape": list(self.static_shape) if self.static_shape else None,
+            "intra_op_threads": options.intra_op_num_threads,
+            "inter_op_threads": options.inter_op_num_threads,
+            "graph_optimization": settings.onnx_graph_optimization,
+            "providers": self.session.get_providers(),
+        }
+
+
+def _to_input(frames: list[np.ndarray]) -> np.ndarray:
+    """HWC-uint8-Frames -> NCHW float32 in [0, 1].
+
+    Wie Ultralytics: numpy-Quellen gelten als BGR und werden nach RGB gedreht.
+    """
+    batch = np.stack(frames)[..., ::-1].transpose(0, 3, 1, 2)
+    return np.ascontiguousarray(batch, dtype=np.float32) / 255.0
+
+
+class OnnxYoloModel(_OnnxSession):
+    """YOLO-Detektor auf einer ONNX-Runtime-CPU-Session."""
+
+    def __init__(self, model_path: str | Path) -> None:
+        super().__init__(model_path, settings.onnx_quantize_int8)
+
+    def _input_shape(self, imgsz: int) -> tuple[int, int]:
+        return self.static_shape or (imgsz, imgsz)
+
+    def predict(
+        self,
+        source: list[np.ndarray],
+        conf: float = 0.25,
+        imgsz: int = 640,
+        verbose: bool = False,
+        iou: float = 0.7,
+        max_det: int = 300,
+    ) -> list[OnnxYoloResult]:
+        """Wie ultralytics.YOLO.predict fuer eine Liste von HWC-uint8-Frames."""
+        shape = self._input_shape(imgsz)
+        tensors, transforms = [], []
+        for img in source:
+            padded, ratio, pad = letterbox(img, shape)
+            tensors.append(padded)
+            transforms.append((ratio, pad, img.shape[:2]))
+
+        outputs = self._run(_to_input(tensors))
+        results = []
+        for prediction, (ratio, pad, original_shape) in zip(outputs, transforms):
+            xyxy, scores, cls = _decode(prediction, conf, iou, max_det)
+            results.append(OnnxYoloResult(
+                xyxy=_to_original(xyxy, ratio, pad, original_shape),
+                conf=scores.astype(np.float32),
+                cls=cls,
+                names=self.names,
+            ))
+        return results
+
+
+def center_crop(img: np.ndarray, size: int) -> np.ndarray:
+    """Kurze Seite auf *size* skalieren, dann mittig *size* x *size* ausschneiden (YOLO-cls)."""
+    from PIL import Image
+
+    h, w = img.shape[:2]
+    scale = size / min(h, w)
+    new_w, new_h = max(size, int(round(w * scale))), max(size, int(round(h * scale)))
+    resized = np.asarray(Image.fromarray(img).resize((new_w, new_h), Image.BILINEAR))
+    top, left = (new_h - size) // 2, (new_w - size) // 2
+    return resized[top:top + size, left:left + size]
+
+
+class OnnxYoloClassifier(_OnnxSession):
+    """YOLO-cls-Klassifikator auf einer ONNX-Runtime-CPU-Session."""
+
+    def __init__(self, model_path: str | Path, quantize_int8: bool = False) -> None:
+        super().__init__(model_path, quantize_int8)
+
+    def predict_probs(self, source: list[np.ndarray], imgsz: int = 224) -> np.ndarray:
+        """(B, nc)-Wahrscheinlichkeiten fuer eine Liste von HWC-uint8-Frames."""
+        size = self.static_shape[0] if self.static_shape else imgsz
+        return self._run(_to_input([center_crop(img, size) for img in source]))
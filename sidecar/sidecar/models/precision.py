@@ -0,0 +1,124 @@
+"""Rechengenauigkeit fuer DINO und SAM: fp32, fp16, bf16 oder autocast.
+
+- ``fp32``     unveraendert (Default)
+- ``fp16``     Gewichte in float16, Inferenz unter torch.autocast(float16)
+- ``bf16``     Gewichte in bfloat16, Inferenz unter torch.autocast(bfloat16)
+- ``autocast`` Gewichte bleiben float32, nur Inferenz unter torch.autocast
+               (float16 auf CUDA, bfloat16 auf CPU)
+
+Autocast umschliesst auch die reinen Halbpraezisions-Modi, damit float32-
+Eingaben (Bild-Tensor, Box-Prompts) nicht auf Gewichte anderen Typs treffen.
+Nicht unterstuetzte Kombinationen fallen mit Warnung auf den naechsten
+sinnvollen Modus zurueck (fp16 auf CPU -> bf16, bf16 ohne GPU-Support -> fp16).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import logging
+import threading
+from typing import Any, Iterator
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+PRECISIONS = ("fp32", "fp16", "bf16", "autocast")
+
+_lock = threading.Lock()
+_active: dict[str, tuple[str, str]] = {}  # slot -> (precision, device)
+
+
+def _device_type(device: str) -> str:
+    return "cuda" if device.startswith("cuda") else "cpu"
+
+
+def _cuda_bf16_supported() -> bool:
+    try:
+        import torch
+        return bool(torch.cuda.is_bf16_supported())
+    except Exception:
+        return False
+
+
+def configured(slot: str) -> str:
+    """Konfigurierter Modus fuer *slot* ("dino" / "sam") aus ``<slot>_precision``."""
+    return str(getattr(settings, f"{slot}_precision", "fp32")).strip().lower()
+
+
+def resolve(requested: str, device: str) -> str:
+    """Effektiver Modus fuer *requested* auf *device*."""
+    precision = requested.strip().lower()
+    if precision not in PRECISIONS:
+        logger.warning("Unknown precision %r, using fp32", requested)
+        return "fp32"
+    if precision == "fp16" and _device_type(device) == "cpu":
+        logger.warning("fp16 is not supported on CPU, using bf16")
+        return "bf16"
+    if precision == "bf16" and _device_type(device) == "cuda" and not _cuda_bf16_supported():
+        logger.warning("bf16 is not supported on %s, using fp16", device)
+        return "fp16"
+    return precision
+
+
+def autocast_dtype(precision: str, device: str) -> Any:
+    """torch-dtype fuer autocast, None bei fp32."""
+    import torch
+
+    if precision == "fp16":
+        return torch.float16
+    if precision == "bf16":
+        return torch.bfloat16
+    if precision == "autocast":
+        return torch.float16 if _device_type(device) == "cuda" else torch.bfloat16
+    return None
+
+
+def prepare_model(slot: str, model: Any, device: str) -> str:
+    """Modell fuer den konfigurierten Modus von *slot* vorbereiten; gibt den aktiven Modus zurueck.
+
+    Wird von den Ladefunktionen nach ``model.to(device)`` aufgerufen.
+    """
+    precision = resolve(configured(slot), device)
+    if precision in ("fp16", "bf16"):
+        model.to(autocast_dtype(precision, device))
+    with _lock:
+        _active[slot] = (precision, device)
+    if precision != "fp32":
+        logger.info("%s runs with precision %s on %s", slot, precision, device)
+    return precision
+
+
+def forget(slot: str) -> None:
+    """Beim Entladen: kein aktiver Modus mehr."""
+    with _lock:
+        _active.pop(slot, None)
+
+
+def active(slot: str) -> str | None:
+    with _lock:
+        entry = _active.get(slot)
+    return entry[0] if entry is not None else None
+
+
+@contextlib.contextmanager
+def inference_context(slot: str) -> Iterator[None]:
+    """torch.autocast passend zum aktiven Modus von *slot* (no-op fuer fp32)."""
+    with _lock:
+        entry = _active.get(slot)
+    if entry is None or entry[0] == "fp32":
+        yield
+        return
+
+    import torch
+
+    precision, device = entry
+    with torch.autocast(device_type=_device_type(device), dtype=autocast_dtype(precision, device)):
+        yield
+
+
+def get_status() -> dict:
+    return {
+        slot: {"configured": configured(slot), "active": active(slot)}
+        for slot in ("dino", "sam")
+    }
@@ -2,18 +2,27 @@
 
 from __future__ import annotations
 
-import time
+import hashlib
 import logging
+import time
+from dataclasses import dataclass, replace
 from pathlib import Path
+from typing import Any
 
 import numpy as np
 
+from .. import batching, timing
+from ..batching import MicroBatcher
+from ..cache import ByteBudgetLRU
 from ..config import settings
 from ..gpu_manager import gpu_manager, ModelSlot
 from ..schemas.detection import BoundingBox
 from ..schemas.segmentation import MaskResult, SamResponse
-from .image_decode import decode_image_safe
+from .image_decode import decode_base64_bytes, decode_image_bytes
+from .image_store import image_id_for
+from . import precision
 from .box_utils import clamp_box
+from .mask_utils import encode_mask, mask_statistics
 
 logger = logging.getLogger(__name__)
 
@@ -51,10 +60,17 @@ def _load_sam_on(device: str):
     weights_path = _find_sam_weights()
     sam = sam_model_registry[settings.sam_model_type](checkpoint=weights_path)
     sam.to(device)
+    precision.prepare_model("sam", sam, device)
     predictor = SamPredictor(sam)
     return sam, predictor
 
 
+def preload() -> None:
+    """Load SAM ahead of the first request (startup warm-up)."""
+    device = _resolve_device()
+    gpu_manager.ensure_loaded(ModelSlot.SAM, device, lambda: _load_sam_on(device))
+
+
 def _cuda_available() -> bool:
     try:
         import torch
@@ -63,97 +79,321 @@ def _cuda_available() -> bool:
         return False
 
 
-def _rle_encode(mask: np.ndarray) -> str:
-    """Simple run-length encoding of a binary mask."""
-    flat = mask.flatten(order="C")
-    if len(flat) == 0:
-        return ""
-    diffs = np.diff(flat.astype(np.int8))
-    change_indices = np.where(diffs != 0)[0] + 1
-    runs = np.diff(np.concatenate([[0], change_indices, [len(flat)]]))
-    start_val = int(flat[0])
-    # Format: start_value,run1,run2,...
-    parts = [str(start_val)] + [str(int(r)) for r in runs]
-    return ",".join(parts)
+_embedding_cache = ByteBudgetLRU(settings.sam_embedding_cache_max_bytes)
+gpu_manager.add_unload_hook(ModelSlot.SAM, _embedding_cache.clear)
+gpu_manager.add_unload_hook(ModelSlot.SAM, lambda: precision.forget("sam"), on_offload=False)
+
+
+@dataclass
+class _ImageEmbedding:
+    """Ausgabe des SAM-Bild-Encoders fuer einen Frame."""
+    features: Any
+    original_size: tuple[int, int]
+    input_size: tuple[int, int]
+
+
+def _embed_images(predictor, images: list[np.ndarray]) -> list[_ImageEmbedding]:
+    """Bild-Encoder (ViT) fuer mehrere Frames in einem Forward-Pass.
+
+    Entspricht SamPredictor.set_image, aber gestapelt: alle Frames werden
+    transformiert, auf 1024x1024 gepaddet und gemeinsam kodiert.
+    """
+    import torch
+
+    with torch.no_grad(), precision.inference_context("sam"):
+        inputs = []
+        sizes: list[tuple[tuple[int, int], tuple[int, int]]] = []
+        with timing.stage("preprocess"):
+            for img_array in images:
+                transformed = predictor.transform.apply_image(img_array)
+                tensor = torch.as_tensor(transformed, device=predictor.device)
+                tensor = tensor.permute(2, 0, 1).contiguous()[None, :, :, :]
+                sizes.append((tuple(img_array.shape[:2]), tuple(tensor.shape[-2:])))
+                inputs.append(predictor.model.preprocess(tensor))
+        with timing.stage("model"):
+            features = predictor.model.image_encoder(torch.cat(inputs, dim=0))
+
+    return [
+        _ImageEmbedding(features[i:i + 1], original_size, input_size)
+        for i, (original_size, input_size) in enumerate(sizes)
+    ]
+
+
+def _use_embedding(predictor, embedding: _ImageEmbedding) -> None:
+    """Predictor auf eine bereits berechnete Bild-Einbettung setzen."""
+    predictor.reset_image()
+    predictor.features = embedding.features
+    predictor.original_size = embedding.original_size
+    predictor.input_size = embedding.input_size
+    predictor.is_image_set = True
+
+
+def _decode_boxes(predictor, boxes: list[tuple[float, float, float, float]]) -> tuple[np.ndarray, np.ndarray]:
+    """Ein predict_torch-Aufruf fuer *boxes* als (B, 4)-Prompt-Tensor; Fehler gehen an den Aufrufer."""
+    import torch
+
+    with timing.stage("model"), torch.no_grad(), precision.inference_context("sam"):
+        boxes_tensor = torch.as_tensor(boxes, dtype=torch.float32, device=predictor.device)
+        boxes_tensor = predictor.transform.apply_boxes_torch(boxes_tensor, predictor.original_size)
+        masks, scores, _ = predictor.predict_torch(
+            point_coords=None,
+            point_labels=None,
+            boxes=boxes_tensor,
+            multimask_output=False,
+        )
+    # (B, 1, H, W) bool / (B, 1) -> beste (einzige) Maske je Box
+    return masks[:, 0].cpu().numpy(), scores[:, 0].float().cpu().numpy()
+
+
+def _decode_boxes_singly(
+    predictor,
+    boxes: list[tuple[float, float, float, float]],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Fallback: jede Box einzeln; eine fehlgeschlagene Box bekommt eine leere Maske (Score 0)."""
+    masks = np.zeros((len(boxes), *predictor.original_size), dtype=bool)
+    scores = np.zeros(len(boxes), dtype=np.float32)
+    for index, box in enumerate(boxes):
+        try:
+            box_masks, box_scores = _decode_boxes(predictor, [box])
+        except Exception as exc:
+            logger.warning("SAM prediction failed for box %s: %s", box, exc)
+            continue
+        masks[index], scores[index] = box_masks[0], box_scores[0]
+    return masks, scores
+
+
+def _predict_boxes(
+    predictor,
+    boxes: list[tuple[float, float, float, float]],
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """Maskendecoder fuer alle Boxen des aktuell gesetzten Bildes.
+
+    Die Boxen gehen in Bloecken von hoechstens sam_max_boxes_per_call als
+    (B, 4)-Prompt-Tensor an predict_torch; Rueckgabe sind (B, H, W)-Masken
+    und (B,)-Scores als numpy. Scheitert ein Block (z.B. CUDA-OOM), werden
+    seine Boxen einzeln wiederholt und nur die fehlgeschlagenen fallen weg
+    (leere Maske).
+    """
+    if not boxes:
+        return None
+
+    chunk_size = max(1, settings.sam_max_boxes_per_call)
+    mask_parts: list[np.ndarray] = []
+    score_parts: list[np.ndarray] = []
+    for start in range(0, len(boxes), chunk_size):
+        chunk = boxes[start:start + chunk_size]
+        try:
+            masks, scores = _decode_boxes(predictor, chunk)
+        except Exception as exc:
+            logger.warning("SAM prediction failed for %d boxes, retrying one by one: %s", len(chunk), exc)
+            masks, scores = _decode_boxes_singly(predictor, chunk)
+        mask_parts.append(masks)
+        score_parts.append(scores)
+
+    if len(mask_parts) == 1:
+        return mask_parts[0], score_parts[0]
+    return np.concatenate(mask_parts), np.concatenate(score_parts)
+
+
+def _embedding_size_bytes(embedding: _ImageEmbedding) -> int:
+    features = embedding.features
+    return int(features.numel() * features.element_size())
+
+
+def _cache_embedding(key: str, embedding: _ImageEmbedding) -> None:
+    """Einbettung im LRU ablegen; optional im RAM statt im VRAM."""
+    if settings.sam_embedding_cache_max_bytes <= 0:
+        return
+    # eigene Kopie statt Slice-View: die View haelt sonst den ganzen (B, 256, 64, 64)-Batch
+    # des Bild-Encoders im Speicher, abgerechnet wuerde aber nur ein Frame
+    if settings.sam_embedding_cache_device:
+        features = embedding.features.to(settings.sam_embedding_cache_device, copy=True)
+    else:
+        features = embedding.features.clone()
+    embedding = replace(embedding, features=features)
+    _embedding_cache.put(key, embedding, _embedding_size_bytes(embedding))
+
+
+def _cached_embedding(key: str, device: str) -> _ImageEmbedding | None:
+    embedding = _embedding_cache.get(key)
+    if embedding is None:
+        return None
+    if settings.sam_embedding_cache_device:
+        embedding = replace(embedding, features=embedding.features.to(device))
+    return embedding
+
+
+def _run_sam_batch(items: list[tuple[np.ndarray, list, str]]) -> list:
+    """Micro-Batch ausfuehren: ein Encoder-Pass fuer alle nicht gecachten Frames,
+    dann Maskendecoder je Frame.
+
+    Einbettungen werden pro Frame-Hash im LRU gehalten; Folge-Requests fuer
+    denselben Frame (z.B. korrigierte Boxen aus der UI) laufen nur noch durch
+    den leichtgewichtigen Maskendecoder.
+    """
+    device = _resolve_device()
+    state = gpu_manager.ensure_loaded(ModelSlot.SAM, device, lambda: _load_sam_on(device))
+    predictor = state.processor  # SamPredictor
+
+    embeddings: dict[str, _ImageEmbedding] = {}
+    hits: set[str] = set()
+    to_encode: dict[str, np.ndarray] = {}
+    for img_array, _, frame_key in items:
+        if frame_key in embeddings or frame_key in to_encode:
+            continue
+        cached = _cached_embedding(frame_key, predictor.device)
+        if cached is not None:
+            embeddings[frame_key] = cached
+            hits.add(frame_key)
+        else:
+            to_encode[frame_key] = img_array
+
+    if to_encode:
+        encoded = _embed_images(predictor, list(to_encode.values()))
+        for frame_key, embedding in zip(to_encode, encoded):
+            embeddings[frame_key] = embedding
+            _cache_embedding(frame_key, embedding)
+
+    outputs = []
+    for _, boxes, frame_key in items:
+        _use_embedding(predictor, embeddings[frame_key])
+        outputs.append((_predict_boxes(predictor, boxes), frame_key in hits))
+    return outputs
+
+
+def frame_key_for_array(img_array: np.ndarray) -> str:
+    """Inhalts-Hash eines dekodierten Frames (Fallback, wenn kein image_id bekannt ist)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(img_array.shape).encode())
+    digest.update(np.ascontiguousarray(img_array).data)
+    return "a:" + digest.hexdigest()
+
+
+def get_embedding_cache_status() -> dict:
+    return _embedding_cache.stats()
+
+
+_sam_batcher = batching.register(MicroBatcher(ModelSlot.SAM, _run_sam_batch))
 
 
 def segment(
     image_base64: str,
     bounding_boxes: list[BoundingBox],
     pipe_diameter_mm: int | None = None,
+    *,
+    mask_encoding: str = "rle",
+    crop_masks: bool = False,
 ) -> SamResponse:
     """Run SAM segmentation for each bounding box."""
-    device = _resolve_device()
-    state = gpu_manager.ensure_loaded(ModelSlot.SAM, device, lambda: _load_sam_on(device))
-    predictor = state.processor  # SamPredictor
+    image_bytes = decode_base64_bytes(image_base64, max_bytes=settings.inference_max_image_bytes)
+    return segment_bytes(
+        image_bytes,
+        bounding_boxes,
+        pipe_diameter_mm,
+        mask_encoding=mask_encoding,
+        crop_masks=crop_masks,
+    )
 
-    img = decode_image_safe(
-        image_base64,
+
+def segment_bytes(
+    image_bytes: bytes,
+    bounding_boxes: list[BoundingBox],
+    pipe_diameter_mm: int | None = None,
+    *,
+    mask_encoding: str = "rle",
+    crop_masks: bool = False,
+) -> SamResponse:
+    """Run SAM segmentation on raw image bytes (binary upload path)."""
+    img = decode_image_bytes(
+        image_bytes,
         max_bytes=settings.inference_max_image_bytes,
         max_pixels=settings.max_image_pixels,
     )
-    img_array = np.array(img)
-    h, w = img_array.shape[:2]
+    return segment_array(
+        np.asarray(img),
+        bounding_boxes,
+        pipe_diameter_mm,
+        frame_key=image_id_for(image_bytes),
+        mask_encoding=mask_encoding,
+        crop_masks=crop_masks,
+    )
 
-    t0 = time.perf_counter()
 
-    # Set image once for all boxes
-    predictor.set_image(img_array)
+def segment_array(
+    img_array: np.ndarray,
+    bounding_boxes: list[BoundingBox],
+    pipe_diameter_mm: int | None = None,
+    *,
+    frame_key: str | None = None,
+    mask_encoding: str = "rle",
+    crop_masks: bool = False,
+) -> SamResponse:
+    """Run SAM segmentation on a decoded RGB frame (H, W, 3 uint8).
 
-    masks_out: list[MaskResult] = []
+    *frame_key* identifies the frame for the embedding cache; the image_id of
+    the encoded bytes when known, otherwise a hash of the decoded array.
+    *mask_encoding* selects the mask format (see mask_utils.MASK_ENCODINGS);
+    with *crop_masks* only the mask's own bounding box is encoded.
+    """
+    device = _resolve_device()
+    gpu_manager.ensure_loaded(ModelSlot.SAM, device, lambda: _load_sam_on(device))
 
+    h, w = img_array.shape[:2]
+    if frame_key is None:
+        frame_key = frame_key_for_array(img_array)
+
+    # aus dem Bild ragende oder Null-Flaechen-Boxen -> ueberspringen
+    prompts: list[tuple[BoundingBox, tuple[float, float, float, float]]] = []
     for bbox in bounding_boxes:
         clamped = clamp_box(bbox.x1, bbox.y1, bbox.x2, bbox.y2, w, h)
-        if clamped is None:
-            continue  # aus dem Bild ragende oder Null-Flaechen-Box -> ueberspringen
-        bx1, by1, bx2, by2 = clamped
-        try:
-            box_np = np.array([bx1, by1, bx2, by2])
-
-            pred_masks, scores, _ = predictor.predict(
-                point_coords=None,
-                point_labels=None,
-                box=box_np[None, :],  # (1, 4)
-                multimask_output=False,
-            )
-        except Exception as exc:
-            logger.warning("SAM prediction failed for box %s: %s", bbox, exc)
-            continue
+        if clamped is not None:
+            prompts.append((bbox, clamped))
 
-        # Take best mask
-        mask = pred_masks[0]  # (H, W) bool
-        score = float(scores[0])
+    outcome = _sam_batcher.run((img_array, [clamped for _, clamped in prompts], frame_key))
+    predictions, embedding_cached = outcome.value
 
-        # Compute mask statistics
-        mask_area = int(mask.sum())
-        ys, xs = np.where(mask)
+    post_started = time.perf_counter()
+    masks_out: list[MaskResult] = []
 
-        if len(xs) == 0:
-            continue
+    if predictions is not None:
+        masks, scores = predictions
+        stats = mask_statistics(masks)
+
+        for index, (bbox, clamped) in enumerate(prompts):
+            if stats.area[index] == 0:
+                continue
+            bx1, by1, bx2, by2 = clamped
+
+            mask = masks[index]
+            offset = [0, 0]
+            if crop_masks:
+                x0, y0 = int(stats.x_min[index]), int(stats.y_min[index])
+                mask = mask[y0:int(stats.y_max[index]) + 1, x0:int(stats.x_max[index]) + 1]
+                offset = [x0, y0]
+
+            masks_out.append(MaskResult(
+                label=bbox.label,
+                confidence=round(float(scores[index]), 4),
+                bbox=[bx1, by1, bx2, by2],
+                mask_rle=encode_mask(mask, mask_encoding),
+                mask_encoding=mask_encoding,
+                mask_size=[int(mask.shape[0]), int(mask.shape[1])],
+                mask_offset=offset,
+                mask_area_pixels=int(stats.area[index]),
+                image_area_pixels=h * w,
+                height_pixels=int(stats.height[index]),
+                width_pixels=int(stats.width[index]),
+                centroid_x=round(float(stats.centroid_x[index]), 1),
+                centroid_y=round(float(stats.centroid_y[index]), 1),
+            ))
 
-        mask_h = int(ys.max() - ys.min() + 1)
-        mask_w = int(xs.max() - xs.min() + 1)
-        centroid_x = float(xs.mean())
-        centroid_y = float(ys.mean())
-
-        masks_out.append(MaskResult(
-            label=bbox.label,
-            confidence=round(score, 4),
-            bbox=[bx1, by1, bx2, by2],
-            mask_rle=_rle_encode(mask.astype(np.uint8)),
-            mask_area_pixels=mask_area,
-            image_area_pixels=h * w,
-            height_pixels=mask_h,
-            width_pixels=mask_w,
-            centroid_x=round(centroid_x, 1),
-            centroid_y=round(centroid_y, 1),
-        ))
-
-    elapsed_ms = (time.perf_counter() - t0) * 1000
-
-    return SamResponse(
+    response = SamResponse(
         masks=masks_out,
         image_width=w,
         image_height=h,
-        inference_time_ms=round(elapsed_ms, 1),
+        inference_time_ms=round(outcome.batch_time_ms, 1),
+        embedding_cached=embedding_cached,
+        precision=precision.active("sam") or "fp32",
     )
+    timing.add("postprocess", (time.perf_counter() - post_started) * 1000)
+    return response
@@ -6,16 +6,33 @@ import json
 import time
 import logging
 import threading
-import subprocess
 from pathlib import Path
 
 import numpy as np
+from fastapi import HTTPException, status
 from PIL import Image
 
+from .. import batching, gpu_metrics, metrics, timing
+from ..batching import MicroBatcher
 from ..config import settings
 from ..gpu_manager import gpu_manager, ModelSlot
-from ..schemas.detection import YoloDetection, YoloResponse
-from .image_decode import decode_image_safe
+from ..schemas.detection import (
+    YoloBatchResponse,
+    YoloClassifyBatchResponse,
+    YoloClassifyPrediction,
+    YoloClassifyResponse,
+    YoloDetection,
+    YoloResponse,
+)
+from . import frame_dedup, frame_quality, onnx_yolo
+from .image_decode import (
+    DecodeSize,
+    decode_image_bytes,
+    decode_image_safe,
+    long_side_size,
+    original_size,
+    short_side_size,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -52,6 +69,33 @@ def _resolve_yolo_model_path() -> tuple[str, bool]:
     return "yolo11m.pt", False
 
 
+def _resolve_onnx_model_path() -> Path | None:
+    """ONNX-Export fuer den CPU-Pfad: models/yolo26m/<name>.onnx oder models/<name>.onnx."""
+    name = settings.yolo_onnx_model_name or Path(settings.yolo_model_name).with_suffix(".onnx").name
+    for candidate in (Path(settings.models_dir) / "yolo26m" / name, Path(settings.models_dir) / name):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def _onnxruntime_available() -> bool:
+    try:
+        import onnxruntime  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _cpu_backend() -> str:
+    """Effektives CPU-Backend: "onnxruntime" oder "pytorch"."""
+    configured = settings.yolo_cpu_backend.strip().lower()
+    if configured == "onnxruntime":
+        return "onnxruntime"
+    if configured == "auto" and _resolve_onnx_model_path() is not None and _onnxruntime_available():
+        return "onnxruntime"
+    return "pytorch"
+
+
 def get_runtime_status() -> dict:
     """Return current YOLO runtime/configuration information for diagnostics."""
     yolo_dir = Path(settings.models_dir) / "yolo26m"
@@ -68,8 +112,30 @@ def get_runtime_status() -> dict:
         "resolved_model_path": _resolved_model_path,
         "fallback_model_name": None if _using_custom_weights or settings.require_custom_yolo else "yolo11m.pt",
         "device": _resolve_device(),
+        "cpu_backend": settings.yolo_cpu_backend,
     }
 
+    if isinstance(_cpu_model, onnx_yolo.OnnxYoloModel):
+        status["onnxruntime"] = _cpu_model.status()
+    else:
+        status["onnxruntime"] = {
+            "intra_op_threads": settings.onnx_intra_op_threads,
+            "inter_op_threads": settings.onnx_inter_op_threads,
+            "graph_optimization": settings.onnx_graph_optimization,
+            "quantize_int8": settings.onnx_quantize_int8,
+        }
+
+    status["classifier"] = {
+        "backend": "onnxruntime" if isinstance(_cls_model, onnx_yolo.OnnxYoloClassifier) else (
+            "pytorch" if _cls_model is not None else None
+        ),
+        "configured_backend": settings.yolo_cls_backend,
+        "quantize_int8": settings.yolo_cls_quantize_int8,
+        "batch_max_frames": settings.yolo_cls_batch_max_frames,
+    }
+    if isinstance(_cls_model, onnx_yolo.OnnxYoloClassifier):
+        status["classifier"]["onnxruntime"] = _cls_model.status()
+
     if candidate_nested.exists():
         status["custom_model_path"] = str(candidate_nested)
     elif candidate_flat.exists():
@@ -106,6 +172,9 @@ def _configured_backend() -> str:
 def _load_yolo_on(device: str):
     """Load YOLO model onto *device*. Returns (model, None)."""
     global _using_custom_weights, _resolved_model_path, _tensorrt_class_names
+    if device == "cpu" and _cpu_backend() == "onnxruntime":
+        return _load_onnx_on_cpu(), None
+
     from ultralytics import YOLO
 
     model_path, using_custom = _resolve_yolo_model_path()
@@ -128,6 +197,23 @@ def _load_yolo_on(device: str):
     return model, None
 
 
+def _load_onnx_on_cpu() -> onnx_yolo.OnnxYoloModel:
+    """ONNX-Runtime-Session statt PyTorch auf der CPU."""
+    global _using_custom_weights, _resolved_model_path, _tensorrt_class_names
+    onnx_path = _resolve_onnx_model_path()
+    if onnx_path is None:
+        raise FileNotFoundError(
+            "yolo_cpu_backend=onnxruntime but no ONNX export found. "
+            f"Export with 'yolo export model={settings.yolo_model_name} format=onnx' into '{settings.models_dir}'."
+        )
+    model = onnx_yolo.OnnxYoloModel(onnx_path)
+    _using_custom_weights = True
+    _resolved_model_path = str(model.model_path)
+    _tensorrt_class_names = {}
+    logger.info("Loaded YOLO ONNX export %s with ONNX Runtime (CPU)", model.model_path)
+    return model
+
+
 def _load_tensorrt_class_names(model_path: str | Path) -> dict[int, str]:
     """Load YOLO class names for a TensorRT engine sidecar file."""
     path = Path(model_path)
@@ -250,6 +336,18 @@ def _get_yolo_model():
         return state.model
 
 
+def preload() -> None:
+    """Load YOLO and run one blank frame through it (startup warm-up).
+
+    The dummy predict builds the Ultralytics predictor and, on CUDA, the
+    TensorRT context / cuDNN kernels, so the first real frame pays neither.
+    """
+    blank = np.zeros((settings.yolo_imgsz, settings.yolo_imgsz, 3), dtype=np.uint8)
+    # Unter dem Inferenz-Lock: fruehe Requests warten, bis der Predictor steht
+    with gpu_manager.in_use(ModelSlot.YOLO), batching.inference_lock(ModelSlot.YOLO):
+        _predict_many(_get_yolo_model(), [blank], 0.99)
+
+
 def _cuda_available() -> bool:
     try:
         import torch
@@ -259,16 +357,20 @@ def _cuda_available() -> bool:
 
 
 def _response_telemetry(queue_wait_ms: float = 0.0) -> dict:
-    status = gpu_manager.get_status()
+    gpu = gpu_metrics.get_snapshot()
+    device = _resolve_device()
     model_name = Path(_resolved_model_path).name if _resolved_model_path else settings.yolo_model_name
+    backend = _model_backend(model_name)
+    if device == "cpu" and isinstance(_cpu_model, onnx_yolo.OnnxYoloModel):
+        backend = "onnxruntime"
     return {
         "model_name": model_name,
-        "model_backend": _model_backend(model_name),
-        "device": _resolve_device(),
+        "model_backend": backend,
+        "device": device,
         "queue_wait_ms": round(queue_wait_ms, 1),
-        "vram_allocated_gb": status.get("vram_allocated_gb"),
-        "vram_total_gb": status.get("vram_total_gb"),
-        "gpu_utilization_percent": _gpu_utilization_percent(),
+        "vram_allocated_gb": gpu.vram_allocated_gb,
+        "vram_total_gb": gpu.vram_total_gb,
+        "gpu_utilization_percent": gpu.gpu_utilization_percent if device.startswith("cuda") else None,
     }
 
 
@@ -283,100 +385,127 @@ def _model_backend(model_name: str) -> str:
     return suffix.lstrip(".") or "unknown"
 
 
-def _gpu_utilization_percent() -> float | None:
-    if not _resolve_device().startswith("cuda"):
-        return None
-
-    try:
-        result = subprocess.run(
-            [
-                "nvidia-smi",
-                "--query-gpu=utilization.gpu",
-                "--format=csv,noheader,nounits",
-            ],
-            capture_output=True,
-            text=True,
-            timeout=0.5,
-            check=False,
-        )
-        if result.returncode != 0:
-            return None
-
-        first_line = result.stdout.strip().splitlines()[0]
-        return float(first_line.strip())
-    except Exception:
-        return None
-
-
-def decode_image(image_base64: str) -> Image.Image:
-    """Decode a base64-encoded image to PIL Image."""
+def decode_image(image_base64: str, min_size: DecodeSize | None = None) -> Image.Image:
+    """Decode a base64-encoded image to PIL Image (JPEG reduced to *min_size*, see image_decode)."""
     return decode_image_safe(
         image_base64,
         max_bytes=settings.inference_max_image_bytes,
         max_pixels=settings.max_image_pixels,
+        min_size=min_size,
     )
 
 
-def _is_frame_usable(img: Image.Image) -> tuple[bool, str]:
+def decode_bytes(image_bytes: bytes, min_size: DecodeSize | None = None) -> Image.Image:
+    """Decode raw image bytes to PIL Image (same limits as the base64 path)."""
+    return decode_image_bytes(
+        image_bytes,
+        max_bytes=settings.inference_max_image_bytes,
+        max_pixels=settings.max_image_pixels,
+        min_size=min_size,
+    )
+
+
+def detect_decode_size(width: int, height: int) -> tuple[int, int]:
+    """Kleinste Dekodier-Groesse fuer die Detektion: Letterbox auf yolo_imgsz (lange Seite).
+
+    Das Quality-Gate laeuft auf demselben Frame; bei yolo_imgsz=1280 werden
+    erst Frames ab 2560 px langer Seite reduziert dekodiert.
+    """
+    side = settings.yolo_imgsz
+    if isinstance(_cpu_model, onnx_yolo.OnnxYoloModel) and _cpu_model.static_shape:
+        side = max(side, *_cpu_model.static_shape)  # statischer ONNX-Export letterboxt auf seine Form
+    return long_side_size(width, height, side)
+
+
+def _box_scale(img_array: np.ndarray, size: tuple[int, int] | None) -> tuple[float, float]:
+    """(sx, sy) vom dekodierten Frame auf die Originalgroesse *size* (Breite, Hoehe)."""
+    if size is None:
+        return 1.0, 1.0
+    height, width = img_array.shape[:2]
+    return size[0] / width, size[1] / height
+
+
+def _is_frame_usable(img: Image.Image | np.ndarray) -> tuple[bool, str]:
     """Check if a frame is usable for analysis using image quality heuristics.
 
     Filters out:
     - Completely black/dark frames (lens cap, no signal)
     - Completely white/overexposed frames
     - Very low variance frames (solid color, no texture)
+    - Blurry frames (low Laplacian variance)
 
-    Returns (is_usable, reason).
+    See models/frame_quality.py. Returns (is_usable, reason).
     """
-    arr = np.array(img, dtype=np.float32)
-
-    # Convert to grayscale for analysis
-    gray = arr.mean(axis=2)
-    mean_brightness = gray.mean()
-    std_brightness = gray.std()
+    with timing.stage("quality"):
+        quality = frame_quality.assess_frame(np.asarray(img))
+    return quality.usable, quality.reason
 
-    # Too dark (lens cap, black frame, no signal) -- Schwelle bewusst niedrig,
-    # damit dunkle, aber inhaltlich gueltige Kanal-Frames erhalten bleiben.
-    if mean_brightness < settings.frame_min_brightness:
-        return False, "too_dark"
 
-    # Too bright (overexposed, white frame)
-    if mean_brightness > settings.frame_max_brightness:
-        return False, "too_bright"
-
-    # Too uniform (solid color, no texture = likely no pipe content)
-    if std_brightness < settings.frame_min_std:
-        return False, "too_uniform"
-
-    # Check edge density using Laplacian-like filter for blur detection
-    # A very blurry frame has low edge variance
-    from scipy.ndimage import laplace
-    edges = laplace(gray)
-    edge_var = edges.var()
+def detect(image_base64: str, confidence_threshold: float, *, session_id: str | None = None) -> YoloResponse:
+    """Run YOLO detection on a base64-encoded image."""
+    img = decode_image(image_base64, detect_decode_size)
+    return detect_array(
+        np.asarray(img), confidence_threshold, session_id=session_id, original_size=original_size(img),
+    )
 
-    if edge_var < settings.frame_min_edge_var:
-        return False, "too_blurry"
 
-    return True, "ok"
+def detect_bytes(image_bytes: bytes, confidence_threshold: float, *, session_id: str | None = None) -> YoloResponse:
+    """Run YOLO detection on raw image bytes (binary upload path)."""
+    img = decode_bytes(image_bytes, detect_decode_size)
+    return detect_array(
+        np.asarray(img), confidence_threshold, session_id=session_id, original_size=original_size(img),
+    )
 
 
-def detect(image_base64: str, confidence_threshold: float) -> YoloResponse:
-    """Run YOLO detection on a base64-encoded image.
+def detect_array(
+    img_array: np.ndarray,
+    confidence_threshold: float,
+    *,
+    session_id: str | None = None,
+    original_size: tuple[int, int] | None = None,
+) -> YoloResponse:
+    """Run YOLO detection on a decoded RGB frame (H, W, 3 uint8).
 
     Behavior depends on model type:
     - Custom sewer weights: True defect detection via YOLO.
     - COCO fallback (yolo11m): Image-quality pre-screening that filters out
       dark/blank/blurry frames. YOLO detections are still returned for info,
       but is_relevant is based on image quality, not COCO class detections.
-    """
-    model = _get_yolo_model()
 
-    img = decode_image(image_base64)
-
-    # Image-quality pre-screening (always run, fast)
-    usable, quality_reason = _is_frame_usable(img)
+    With a *session_id*, a near-duplicate of the session's last analysed
+    frame returns that frame's result (``reused=True``) without inference.
+    *original_size* (width, height) maps boxes of a reduced decode back to
+    the uploaded frame.
+    """
+    fingerprint = None
+    if session_id and settings.dedup_enabled:
+        fingerprint = frame_dedup.fingerprint(img_array)
+        previous = frame_dedup.lookup(session_id, fingerprint, confidence_threshold)
+        if previous is not None:
+            return previous.model_copy(update={
+                "reused": True,
+                "inference_time_ms": 0.0,
+                "queue_wait_ms": 0.0,
+            })
+
+    response = _detect_uncached(img_array, confidence_threshold, _box_scale(img_array, original_size))
+    if fingerprint is not None:
+        frame_dedup.remember(session_id, fingerprint, confidence_threshold, response)
+    return response
+
+
+def _detect_uncached(
+    img_array: np.ndarray,
+    confidence_threshold: float,
+    box_scale: tuple[float, float] = (1.0, 1.0),
+) -> YoloResponse:
+    # Image-quality pre-screening zuerst: verworfene Frames laden kein Modell
+    # und warten nie auf den YOLO-Slot.
+    usable, quality_reason = _is_frame_usable(img_array)
 
     if not usable:
         # Frame is not usable at all – skip without running YOLO inference
+        metrics.rejected_frames.inc(frame_class=quality_reason)
         return YoloResponse(
             is_relevant=False,
             detections=[],
@@ -385,55 +514,175 @@ def detect(image_base64: str, confidence_threshold: float) -> YoloResponse:
             **_response_telemetry(),
         )
 
-    t0 = time.perf_counter()
-    results = model.predict(
-        source=np.array(img),
-        conf=confidence_threshold,
-        imgsz=settings.yolo_imgsz,
-        verbose=False,
-    )
-    elapsed_ms = (time.perf_counter() - t0) * 1000
-
-    detections: list[YoloDetection] = []
-    frame_class = "empty"
-
-    if results and len(results) > 0:
-        result = results[0]
-        boxes = result.boxes
-        if boxes is not None and len(boxes) > 0:
-            frame_class = "relevant"
-            for box in boxes:
-                xyxy = box.xyxy[0].cpu().numpy()
-                cls_id = int(box.cls[0].cpu().item())
-                conf = float(box.conf[0].cpu().item())
-                cls_name = _class_name_for_id(cls_id, result.names)
-                detections.append(YoloDetection(
-                    x1=float(xyxy[0]),
-                    y1=float(xyxy[1]),
-                    x2=float(xyxy[2]),
-                    y2=float(xyxy[3]),
-                    class_name=cls_name,
-                    confidence=conf,
-                ))
-
-    if _using_custom_weights:
-        # Custom weights: relevance = has defect detections
-        is_relevant = len(detections) > 0
-    else:
-        # COCO fallback: frame passed quality check → relevant for DINO analysis.
-        # COCO detections are informational only.
-        is_relevant = True
-        frame_class = "pipe_content" if frame_class == "empty" else frame_class
+    outcome = _yolo_batcher.run((img_array, confidence_threshold))
+    with timing.stage("postprocess"):
+        detections = _detections_from_result(outcome.value, box_scale)
+        is_relevant, frame_class = _classify_frame(detections)
+    if not is_relevant:
+        metrics.rejected_frames.inc(frame_class=frame_class)
 
     return YoloResponse(
         is_relevant=is_relevant,
         detections=detections,
         frame_class=frame_class,
+        inference_time_ms=round(outcome.batch_time_ms, 1),
+        **_response_telemetry(queue_wait_ms=outcome.queue_wait_ms),
+    )
+
+
+def detect_batch(images_base64: list[str], confidence_threshold: float) -> YoloBatchResponse:
+    """Run YOLO detection on several frames with a single batched predict call.
+
+    Every frame passes the quality gate individually; only usable frames are
+    handed to Ultralytics as one list source. Results keep the input order.
+    The model is only loaded when at least one frame survives the gate.
+    """
+    if len(images_base64) > settings.yolo_batch_max_frames:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"batch exceeds {settings.yolo_batch_max_frames} frames",
+        )
+
+    started = time.perf_counter()
+    telemetry = _response_telemetry()
+
+    responses: list[YoloResponse | None] = [None] * len(images_base64)
+    usable_indices: list[int] = []
+    usable_arrays: list[np.ndarray] = []
+    box_scales: list[tuple[float, float]] = []
+
+    for index, image_base64 in enumerate(images_base64):
+        img = decode_image(image_base64, detect_decode_size)
+        img_array = np.asarray(img)
+        usable, quality_reason = _is_frame_usable(img_array)
+        if not usable:
+            metrics.rejected_frames.inc(frame_class=quality_reason)
+            responses[index] = YoloResponse(
+                is_relevant=False,
+                detections=[],
+                frame_class=quality_reason,
+                inference_time_ms=0.0,
+                **telemetry,
+            )
+            continue
+        usable_indices.append(index)
+        usable_arrays.append(img_array)
+        box_scales.append(_box_scale(img_array, original_size(img)))
+
+    elapsed_ms = 0.0
+    if usable_arrays:
+        with gpu_manager.in_use(ModelSlot.YOLO), batching.inference_lock(ModelSlot.YOLO):
+            t0 = time.perf_counter()
+            results = _predict_many(_get_yolo_model(), usable_arrays, confidence_threshold)
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        # Batch-Zeit anteilig auf die inferierten Frames verteilen
+        per_frame_ms = round(elapsed_ms / len(usable_arrays), 1)
+        for position, index in enumerate(usable_indices):
+            with timing.stage("postprocess"):
+                detections = _detections_from_result(results[position], box_scales[position])
+                is_relevant, frame_class = _classify_frame(detections)
+            if not is_relevant:
+                metrics.rejected_frames.inc(frame_class=frame_class)
+            responses[index] = YoloResponse(
+                is_relevant=is_relevant,
+                detections=detections,
+                frame_class=frame_class,
+                inference_time_ms=per_frame_ms,
+                **telemetry,
+            )
+
+    return YoloBatchResponse(
+        results=[response for response in responses if response is not None],
+        frame_count=len(images_base64),
+        inferred_count=len(usable_arrays),
         inference_time_ms=round(elapsed_ms, 1),
-        **_response_telemetry(),
+        total_time_ms=round((time.perf_counter() - started) * 1000, 1),
     )
 
 
+def _predict_many(model, arrays: list[np.ndarray], confidence_threshold: float) -> list:
+    """One Ultralytics predict call over *arrays*; returns one result (or None) per array."""
+    with timing.stage("model"):
+        results = list(model.predict(
+            source=arrays,
+            conf=confidence_threshold,
+            imgsz=settings.yolo_imgsz,
+            verbose=False,
+        ) or [])
+    return [results[i] if i < len(results) else None for i in range(len(arrays))]
+
+
+def _run_yolo_batch(items: list[tuple[np.ndarray, float]]) -> list:
+    """Micro-Batch ausfuehren: pro Konfidenz-Schwelle ein gemeinsamer predict-Aufruf."""
+    model = _get_yolo_model()
+    groups: dict[float, list[int]] = {}
+    for index, (_, confidence_threshold) in enumerate(items):
+        groups.setdefault(confidence_threshold, []).append(index)
+
+    outputs: list = [None] * len(items)
+    for confidence_threshold, indices in groups.items():
+        results = _predict_many(model, [items[i][0] for i in indices], confidence_threshold)
+        for index, result in zip(indices, results):
+            outputs[index] = result
+    return outputs
+
+
+_yolo_batcher = batching.register(MicroBatcher(ModelSlot.YOLO, _run_yolo_batch))
+
+
+def _detections_from_result(result, box_scale: tuple[float, float] = (1.0, 1.0)) -> list[YoloDetection]:
+    """Convert one Ultralytics result into YoloDetection DTOs (boxes scaled by *box_scale*)."""
+    sx, sy = box_scale
+    detections: list[YoloDetection] = []
+    if result is None:
+        return detections
+
+    if isinstance(result, onnx_yolo.OnnxYoloResult):
+        for xyxy, cls_id, conf in zip(result.xyxy.tolist(), result.cls.tolist(), result.conf.tolist()):
+            detections.append(YoloDetection(
+                x1=xyxy[0] * sx,
+                y1=xyxy[1] * sy,
+                x2=xyxy[2] * sx,
+                y2=xyxy[3] * sy,
+                class_name=_class_name_for_id(cls_id, result.names),
+                confidence=conf,
+            ))
+        return detections
+
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return detections
+
+    for box in boxes:
+        xyxy = box.xyxy[0].cpu().numpy()
+        cls_id = int(box.cls[0].cpu().item())
+        conf = float(box.conf[0].cpu().item())
+        cls_name = _class_name_for_id(cls_id, result.names)
+        detections.append(YoloDetection(
+            x1=float(xyxy[0]) * sx,
+            y1=float(xyxy[1]) * sy,
+            x2=float(xyxy[2]) * sx,
+            y2=float(xyxy[3]) * sy,
+            class_name=cls_name,
+            confidence=conf,
+        ))
+    return detections
+
+
+def _classify_frame(detections: list[YoloDetection]) -> tuple[bool, str]:
+    """Derive (is_relevant, frame_class) for a frame that passed the quality gate."""
+    frame_class = "relevant" if detections else "empty"
+
+    if _using_custom_weights:
+        # Custom weights: relevance = has defect detections
+        return len(detections) > 0, frame_class
+
+    # COCO fallback: frame passed quality check → relevant for DINO analysis.
+    # COCO detections are informational only.
+    return True, "pipe_content" if frame_class == "empty" else frame_class
+
+
 # ── YOLO Classify (Whole-Frame-Klassifikator) ──────────────────────────
 
 _cls_model = None
@@ -459,6 +708,39 @@ def _resolve_cls_model_path() -> str | None:
     return None
 
 
+def _resolve_cls_onnx_path(model_path: str) -> Path | None:
+    """ONNX-Export des Klassifikators: die Datei selbst oder <name>.onnx daneben."""
+    path = Path(model_path)
+    if path.suffix.lower() == ".onnx":
+        return path
+    candidate = path.with_suffix(".onnx")
+    if candidate.exists():
+        return candidate
+    if settings.yolo_cls_backend.strip().lower() == "onnxruntime":
+        # einmalig exportieren (~3 MB Modell, wenige Sekunden)
+        from ultralytics import YOLO
+
+        logger.info("Exporting YOLO-cls %s to ONNX", path.name)
+        return Path(YOLO(str(path)).export(format="onnx"))
+    return None
+
+
+def _load_cls_model(path: str):
+    backend = settings.yolo_cls_backend.strip().lower()
+    if backend != "pytorch" and _onnxruntime_available():
+        onnx_path = _resolve_cls_onnx_path(path)
+        if onnx_path is not None:
+            model = onnx_yolo.OnnxYoloClassifier(onnx_path, quantize_int8=settings.yolo_cls_quantize_int8)
+            logger.info("YOLO-cls Modell geladen: %s (ONNX Runtime, int8=%s)", model.model_path, model.quantized)
+            return model
+
+    from ultralytics import YOLO
+    model = YOLO(path)
+    model.to("cpu")  # Leichtgewicht, CPU reicht
+    logger.info("YOLO-cls Modell geladen: %s", path)
+    return model
+
+
 def _get_cls_model():
     """Lazy-load des Classify-Modells (CPU, ~3 MB)."""
     global _cls_model
@@ -470,39 +752,140 @@ def _get_cls_model():
         path = _resolve_cls_model_path()
         if path is None:
             return None
-        from ultralytics import YOLO
-        _cls_model = YOLO(path)
-        _cls_model.to("cpu")  # Leichtgewicht, CPU reicht
-        logger.info("YOLO-cls Modell geladen: %s", path)
+        _cls_model = _load_cls_model(path)
         return _cls_model
 
 
-def classify(image_base64: str, top_k: int = 5) -> list[tuple[str, float]]:
-    """Whole-Frame-Klassifikation: Gibt Top-K Klassen mit Konfidenz zurueck."""
+def _cls_names(model) -> dict[int, str]:
+    return model.names or {}
+
+
+def _cls_probabilities(model, arrays: list[np.ndarray]) -> np.ndarray:
+    """(B, nc)-Wahrscheinlichkeiten; ein predict-Aufruf und ein Device-Transfer fuer alle Frames."""
+    if isinstance(model, onnx_yolo.OnnxYoloClassifier):
+        return model.predict_probs(arrays)
+
+    import torch
+
+    # Ultralytics-Predictor ist nicht thread-safe (ONNX-Runtime-Sessions schon)
+    with batching.inference_lock("classify"):
+        results = model.predict(source=arrays, verbose=False) or []
+    if len(results) != len(arrays) or any(result.probs is None for result in results):
+        return np.zeros((len(arrays), 0), dtype=np.float32)
+    return torch.stack([result.probs.data for result in results]).float().cpu().numpy()
+
+
+def _top_k(probs: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Vektorisiertes Top-K je Zeile: (Indizes, Werte), jeweils (B, k) absteigend sortiert."""
+    k = min(k, probs.shape[1])
+    if k == 0:
+        empty = np.zeros((probs.shape[0], 0))
+        return empty.astype(np.int64), empty
+    candidates = np.argpartition(-probs, k - 1, axis=1)[:, :k]
+    values = np.take_along_axis(probs, candidates, axis=1)
+    order = np.argsort(-values, axis=1, kind="stable")
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(values, order, axis=1)
+
+
+def classify_arrays(img_arrays: list[np.ndarray], top_k: int = 5) -> tuple[list[list[tuple[str, float, float]]], float]:
+    """Whole-Frame-Klassifikation fuer mehrere Frames in einem Aufruf.
+
+    Rueckgabe: (je Frame [(Klasse, Konfidenz, ms)], Inferenzzeit ms gesamt).
+    """
     model = _get_cls_model()
     if model is None:
-        return []
-
-    img = decode_image(image_base64)
+        return [[] for _ in img_arrays], 0.0
 
     t0 = time.perf_counter()
-    results = model.predict(source=np.array(img), verbose=False)
+    with timing.stage("model"):
+        probs = _cls_probabilities(model, img_arrays)
     elapsed_ms = (time.perf_counter() - t0) * 1000
 
-    if not results or len(results) == 0:
+    post_started = time.perf_counter()
+    names = _cls_names(model)
+    indices, values = _top_k(probs, top_k)
+    per_frame_ms = elapsed_ms / max(len(img_arrays), 1)
+    predictions = [
+        [
+            (names.get(index, str(index)), conf, per_frame_ms)
+            for index, conf in zip(row_indices, row_values)
+            if conf > 0.01  # Nur relevante Klassen
+        ]
+        for row_indices, row_values in zip(indices.tolist(), values.tolist())
+    ]
+    timing.add("postprocess", (time.perf_counter() - post_started) * 1000)
+    return predictions, elapsed_ms
+
+
+def _cls_input_size(model) -> int:
+    """Eingangsgroesse des Klassifikators (ONNX: statische Form, Ultralytics: Trainings-imgsz)."""
+    if isinstance(model, onnx_yolo.OnnxYoloClassifier):
+        return model.static_shape[0] if model.static_shape else 224
+    imgsz = (getattr(model, "overrides", None) or {}).get("imgsz") or 224
+    return max(imgsz) if isinstance(imgsz, (list, tuple)) else int(imgsz)
+
+
+def _cls_decode_size(width: int, height: int) -> tuple[int, int]:
+    """Kleinste Dekodier-Groesse fuer die Klassifikation: kurze Seite = Eingangsgroesse (Center-Crop)."""
+    model = _get_cls_model()
+    side = _cls_input_size(model) if model is not None else max(width, height)
+    return short_side_size(width, height, side)
+
+
+def classify(image_base64: str, top_k: int = 5) -> list[tuple[str, float, float]]:
+    """Whole-Frame-Klassifikation: Top-K als (Klasse, Konfidenz, Inferenz-ms je Frame)."""
+    if _get_cls_model() is None:
         return []
+    return classify_array(np.asarray(decode_image(image_base64, _cls_decode_size)), top_k=top_k)
 
-    probs = results[0].probs
-    if probs is None:
+
+def classify_bytes(image_bytes: bytes, top_k: int = 5) -> list[tuple[str, float, float]]:
+    """Whole-Frame-Klassifikation fuer rohe Bild-Bytes."""
+    if _get_cls_model() is None:
         return []
+    return classify_array(np.asarray(decode_bytes(image_bytes, _cls_decode_size)), top_k=top_k)
+
+
+def classify_array(img_array: np.ndarray, top_k: int = 5) -> list[tuple[str, float, float]]:
+    """Whole-Frame-Klassifikation fuer ein dekodiertes RGB-Array."""
+    predictions, _ = classify_arrays([img_array], top_k)
+    return predictions[0]
+
 
-    # Top-K Indizes nach Konfidenz sortiert
-    top_indices = probs.data.topk(min(top_k, len(probs.data))).indices.cpu().tolist()
-    predictions = []
-    for idx in top_indices:
-        name = model.names.get(idx, str(idx))
-        conf = float(probs.data[idx].cpu().item())
-        if conf > 0.01:  # Nur relevante Klassen
-            predictions.append((name, conf, elapsed_ms))
+def classify_batch(images_base64: list[str], top_k: int = 5) -> YoloClassifyBatchResponse:
+    """Like classify_batch_arrays, for base64-encoded frames."""
+    _check_cls_batch_size(len(images_base64))
+    return classify_batch_arrays(
+        [np.asarray(decode_image(image, _cls_decode_size)) for image in images_base64], top_k,
+    )
+
+
+def classify_batch_arrays(img_arrays: list[np.ndarray], top_k: int = 5) -> YoloClassifyBatchResponse:
+    """Classify several frames with one predict call; results keep the input order."""
+    _check_cls_batch_size(len(img_arrays))
+    started = time.perf_counter()
+    predictions, elapsed_ms = classify_arrays(img_arrays, top_k)
+    per_frame_ms = round(elapsed_ms / len(img_arrays), 1) if img_arrays else 0.0
+    return YoloClassifyBatchResponse(
+        results=[
+            YoloClassifyResponse(
+                predictions=[
+                    YoloClassifyPrediction(class_name=name, confidence=conf)
+                    for name, conf, _ in frame_predictions
+                ],
+                inference_time_ms=per_frame_ms,
+            )
+            for frame_predictions in predictions
+        ],
+        frame_count=len(img_arrays),
+        inference_time_ms=round(elapsed_ms, 1),
+        total_time_ms=round((time.perf_counter() - started) * 1000, 1),
+    )
 
-    return predictions
+
+def _check_cls_batch_size(frame_count: int) -> None:
+    if frame_count > settings.yolo_cls_batch_max_frames:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"batch exceeds {settings.yolo_cls_batch_max_frames} frames",
+        )
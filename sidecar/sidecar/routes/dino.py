@@ -1,17 +1,82 @@
 """Grounding DINO detection endpoint."""
 
-from fastapi import APIRouter
-from ..schemas.detection import DinoRequest, DinoResponse
-from ..models import dino_wrapper
+from fastapi import APIRouter, Query, Request
+from ..config import settings
+from ..schemas.detection import DinoBatchRequest, DinoBatchResponse, DinoRequest, DinoResponse
+from ..executors import run_in_slot
+from ..gpu_manager import ModelSlot
+from ..models import dino_wrapper, image_store
+from ..models.image_decode import read_image_body
+from ..telemetry import record_dino
 
 router = APIRouter()
 
 
 @router.post("/detect/dino", response_model=DinoResponse)
 async def detect_dino(req: DinoRequest) -> DinoResponse:
-    return dino_wrapper.detect(
-        image_base64=req.image_base64,
-        text_prompt=req.text_prompt,
-        box_threshold=req.box_threshold,
-        text_threshold=req.text_threshold,
+    if req.image_id is not None:
+        response = await run_in_slot(
+            ModelSlot.DINO,
+            dino_wrapper.detect_array,
+            image_store.load(req.image_id),
+            text_prompt=req.text_prompt,
+            box_threshold=req.box_threshold,
+            text_threshold=req.text_threshold,
+        )
+    else:
+        response = await run_in_slot(
+            ModelSlot.DINO,
+            dino_wrapper.detect,
+            image_base64=req.image_base64,
+            text_prompt=req.text_prompt,
+            box_threshold=req.box_threshold,
+            text_threshold=req.text_threshold,
+        )
+    record_dino(response, box_threshold=req.box_threshold, text_threshold=req.text_threshold)
+    return response
+
+
+@router.post("/detect/dino/binary", response_model=DinoResponse)
+async def detect_dino_binary(
+    request: Request,
+    text_prompt: str | None = None,
+    box_threshold: float = Query(default=0.30, ge=0.0, le=1.0),
+    text_threshold: float = Query(default=0.25, ge=0.0, le=1.0),
+) -> DinoResponse:
+    """Wie /detect/dino, aber mit rohem Bild-Body (application/octet-stream, image/*)."""
+    image_bytes = await read_image_body(request, max_bytes=settings.inference_max_image_bytes)
+    response = await run_in_slot(
+        ModelSlot.DINO,
+        dino_wrapper.detect_bytes,
+        image_bytes=image_bytes,
+        text_prompt=text_prompt,
+        box_threshold=box_threshold,
+        text_threshold=text_threshold,
     )
+    record_dino(response, box_threshold=box_threshold, text_threshold=text_threshold)
+    return response
+
+
+@router.post("/detect/dino/batch", response_model=DinoBatchResponse)
+async def detect_dino_batch(req: DinoBatchRequest) -> DinoBatchResponse:
+    """Mehrere Frames mit gemeinsamem Prompt in einem Forward-Pass."""
+    if req.image_ids:
+        response = await run_in_slot(
+            ModelSlot.DINO,
+            dino_wrapper.detect_batch_arrays,
+            [image_store.load(image_id) for image_id in req.image_ids],
+            text_prompt=req.text_prompt,
+            box_threshold=req.box_threshold,
+            text_threshold=req.text_threshold,
+        )
+    else:
+        response = await run_in_slot(
+            ModelSlot.DINO,
+            dino_wrapper.detect_batch,
+            images_base64=req.images_base64,
+            text_prompt=req.text_prompt,
+            box_threshold=req.box_threshold,
+            text_threshold=req.text_threshold,
+        )
+    record_dino(response, box_threshold=req.box_threshold, text_threshold=req.text_threshold)
+    return response
@@ -1,9 +1,10 @@
 """Health check endpoint."""
 
 from fastapi import APIRouter
+from .. import batching, executors, gpu_metrics, metrics, telemetry, warmup
 from ..config import settings
 from ..gpu_manager import gpu_manager
-from ..models import yolo_wrapper
+from ..models import dino_wrapper, frame_dedup, image_store, precision, sam_wrapper, yolo_wrapper
 
 router = APIRouter()
 
@@ -15,8 +16,19 @@ async def health():
     return {
         "status": "ok",
         "version": VERSION,
+        "warmup": warmup.get_status(),
         "gpu": gpu_manager.get_status(),
+        "gpu_metrics": gpu_metrics.get_status(),
         "yolo": yolo_wrapper.get_runtime_status(),
+        "batching": batching.get_status(),
+        "executors": executors.get_status(),
+        "image_cache": image_store.get_status(),
+        "sam_embedding_cache": sam_wrapper.get_embedding_cache_status(),
+        "dino_text_cache": dino_wrapper.get_text_cache_status(),
+        "frame_dedup": frame_dedup.get_status(),
+        "precision": precision.get_status(),
+        "telemetry": telemetry.get_status(),
+        "latency": metrics.get_status(),
         "device_config": {
             "gpu_device": settings.gpu_device,
             "yolo_device": settings.effective_yolo_device,
@@ -0,0 +1,29 @@
+"""Image upload endpoints – decode once, reference by image_id afterwards."""
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+
+from ..config import settings
+from ..executors import run_in_slot
+from ..models import image_store
+from ..models.image_decode import read_image_body
+from ..schemas.detection import ImageUploadRequest, ImageUploadResponse
+
+router = APIRouter()
+
+
+@router.post("/images", response_model=ImageUploadResponse)
+async def upload_image(req: ImageUploadRequest) -> ImageUploadResponse:
+    return await run_in_slot("images", image_store.store_base64, req.image_base64)
+
+
+@router.post("/images/binary", response_model=ImageUploadResponse)
+async def upload_image_binary(request: Request) -> ImageUploadResponse:
+    image_bytes = await read_image_body(request, max_bytes=settings.inference_max_image_bytes)
+    return await run_in_slot("images", image_store.store_bytes, image_bytes)
+
+
+@router.delete("/images/{image_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_image(image_id: str) -> Response:
+    if not image_store.discard(image_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="unknown image_id")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,48 @@
+"""Prometheus scrape endpoint."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from .. import batching, executors, metrics
+from ..models import dino_wrapper, frame_dedup, image_store, sam_wrapper
+
+router = APIRouter()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(extra=_scrape_time_families()), media_type=metrics.CONTENT_TYPE)
+
+
+def _scrape_time_families() -> list[metrics.Family]:
+    """Zaehler, die die Module ohnehin fuehren, erst beim Scrape auslesen."""
+    caches = {
+        "image_store": image_store.get_status(),
+        "sam_embedding": sam_wrapper.get_embedding_cache_status(),
+        **{f"dino_{name}": stats for name, stats in dino_wrapper.get_text_cache_status().items()},
+    }
+    dedup = frame_dedup.get_status()
+    hits = [({"cache": name}, stats["hits"]) for name, stats in caches.items()]
+    hits.append(({"cache": "frame_dedup"}, dedup["reused"]))
+    misses = [({"cache": name}, stats["misses"]) for name, stats in caches.items()]
+    misses.append(({"cache": "frame_dedup"}, dedup["lookups"] - dedup["reused"]))
+    return [
+        ("sidecar_cache_hits_total", "counter", "Cache hits by cache", hits),
+        ("sidecar_cache_misses_total", "counter", "Cache misses by cache", misses),
+        (
+            "sidecar_cache_evictions_total", "counter", "Cache evictions by cache",
+            [({"cache": name}, stats["evictions"]) for name, stats in caches.items()],
+        ),
+        (
+            "sidecar_batches_total", "counter", "Micro-batches executed by slot",
+            [({"slot": slot}, stats["batches"]) for slot, stats in batching.get_status().items()],
+        ),
+        (
+            "sidecar_slot_rejected_total", "counter", "Calls rejected with 503 because the slot was full",
+            [({"slot": slot}, stats["rejected"]) for slot, stats in executors.get_status().items()],
+        ),
+        (
+            "sidecar_slot_in_flight", "gauge", "Running plus queued calls by slot",
+            [({"slot": slot}, stats["in_flight"]) for slot, stats in executors.get_status().items()],
+        ),
+    ]
@@ -0,0 +1,99 @@
+"""Frame quality screening – never loads a model or touches the GPU manager."""
+
+import time
+
+import numpy as np
+from fastapi import APIRouter, HTTPException, Request, status
+
+from ..config import settings
+from ..executors import run_in_slot
+from ..models import frame_quality, image_store, yolo_wrapper
+from ..models.image_decode import decode_image_bytes, decode_image_safe, read_image_body
+from ..schemas.quality import (
+    QualityBatchRequest,
+    QualityBatchResponse,
+    QualityCheckRequest,
+    QualityCheckResponse,
+)
+
+router = APIRouter()
+
+
+def _response(quality: frame_quality.FrameQuality, started: float) -> QualityCheckResponse:
+    return QualityCheckResponse(
+        usable=quality.usable,
+        reason=quality.reason,
+        brightness=round(quality.brightness, 2),
+        std=round(quality.std, 2),
+        edge_var=round(quality.edge_var, 2),
+        check_time_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+def _check_array(img_array: np.ndarray) -> QualityCheckResponse:
+    started = time.perf_counter()
+    return _response(frame_quality.assess_frame(img_array), started)
+
+
+def _check_base64(image_base64: str) -> QualityCheckResponse:
+    started = time.perf_counter()
+    img = decode_image_safe(
+        image_base64,
+        max_bytes=settings.inference_max_image_bytes,
+        max_pixels=settings.max_image_pixels,
+        # wie /detect/yolo dekodieren: gleiches Urteil wie das Gate dort
+        min_size=yolo_wrapper.detect_decode_size,
+    )
+    return _response(frame_quality.assess_frame(np.asarray(img)), started)
+
+
+def _check_bytes(image_bytes: bytes) -> QualityCheckResponse:
+    started = time.perf_counter()
+    img = decode_image_bytes(
+        image_bytes,
+        max_bytes=settings.inference_max_image_bytes,
+        max_pixels=settings.max_image_pixels,
+        # wie /detect/yolo dekodieren: gleiches Urteil wie das Gate dort
+        min_size=yolo_wrapper.detect_decode_size,
+    )
+    return _response(frame_quality.assess_frame(np.asarray(img)), started)
+
+
+def _check_batch(images_base64: list[str], image_ids: list[str]) -> QualityBatchResponse:
+    started = time.perf_counter()
+    if image_ids:
+        results = [_check_array(image_store.load(image_id)) for image_id in image_ids]
+    else:
+        results = [_check_base64(image_base64) for image_base64 in images_base64]
+    return QualityBatchResponse(
+        results=results,
+        frame_count=len(results),
+        usable_count=sum(result.usable for result in results),
+        total_time_ms=round((time.perf_counter() - started) * 1000, 2),
+    )
+
+
+@router.post("/quality/check", response_model=QualityCheckResponse)
+async def quality_check(req: QualityCheckRequest) -> QualityCheckResponse:
+    """Nur das Frame-Quality-Gate (dunkel/ueberbelichtet/uniform/unscharf), ohne Modell."""
+    if req.image_id is not None:
+        return await run_in_slot("quality", _check_array, image_store.load(req.image_id))
+    return await run_in_slot("quality", _check_base64, req.image_base64)
+
+
+@router.post("/quality/check/binary", response_model=QualityCheckResponse)
+async def quality_check_binary(request: Request) -> QualityCheckResponse:
+    """Wie /quality/check, aber mit rohem Bild-Body (application/octet-stream, image/*)."""
+    image_bytes = await read_image_body(request, max_bytes=settings.inference_max_image_bytes)
+    return await run_in_slot("quality", _check_bytes, image_bytes)
+
+
+@router.post("/quality/check/batch", response_model=QualityBatchResponse)
+async def quality_check_batch(req: QualityBatchRequest) -> QualityBatchResponse:
+    frame_count = len(req.image_ids) or len(req.images_base64)
+    if frame_count > settings.quality_batch_max_frames:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=f"batch exceeds {settings.quality_batch_max_frames} frames",
+        )
+    return await run_in_slot("quality", _check_batch, req.images_base64, req.image_ids)
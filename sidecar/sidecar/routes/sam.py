@@ -1,16 +1,74 @@
 """SAM segmentation endpoint."""
 
-from fastapi import APIRouter
-from ..schemas.segmentation import SamRequest, SamResponse
-from ..models import sam_wrapper
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from pydantic import TypeAdapter, ValidationError
+from ..config import settings
+from ..schemas.detection import BoundingBox
+from ..schemas.segmentation import MaskEncoding, SamRequest, SamResponse
+from ..executors import run_in_slot
+from ..gpu_manager import ModelSlot
+from ..models import image_store, sam_wrapper
+from ..models.image_decode import read_image_body
+from ..telemetry import record_sam
 
 router = APIRouter()
 
+_BOXES_ADAPTER = TypeAdapter(list[BoundingBox])
+
 
 @router.post("/segment/sam", response_model=SamResponse)
 async def segment_sam(req: SamRequest) -> SamResponse:
-    return sam_wrapper.segment(
-        image_base64=req.image_base64,
-        bounding_boxes=req.bounding_boxes,
-        pipe_diameter_mm=req.pipe_diameter_mm,
+    if req.image_id is not None:
+        response = await run_in_slot(
+            ModelSlot.SAM,
+            sam_wrapper.segment_array,
+            image_store.load(req.image_id),
+            bounding_boxes=req.bounding_boxes,
+            pipe_diameter_mm=req.pipe_diameter_mm,
+            frame_key=req.image_id,
+            mask_encoding=req.mask_encoding,
+            crop_masks=req.crop_masks,
+        )
+    else:
+        response = await run_in_slot(
+            ModelSlot.SAM,
+            sam_wrapper.segment,
+            image_base64=req.image_base64,
+            bounding_boxes=req.bounding_boxes,
+            pipe_diameter_mm=req.pipe_diameter_mm,
+            mask_encoding=req.mask_encoding,
+            crop_masks=req.crop_masks,
+        )
+    record_sam(response, box_count=len(req.bounding_boxes), mask_encoding=req.mask_encoding)
+    return response
+
+
+@router.post("/segment/sam/binary", response_model=SamResponse)
+async def segment_sam_binary(
+    request: Request,
+    bounding_boxes: str = Query(default="[]", description="JSON-Liste von BoundingBox-Objekten"),
+    pipe_diameter_mm: int | None = None,
+    mask_encoding: MaskEncoding = "rle",
+    crop_masks: bool = False,
+) -> SamResponse:
+    """Wie /segment/sam, aber mit rohem Bild-Body; Boxen als JSON im Query-Parameter."""
+    try:
+        boxes = _BOXES_ADAPTER.validate_json(bounding_boxes)
+    except ValidationError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="bounding_boxes is not a valid JSON list of boxes",
+        ) from exc
+
+    image_bytes = await read_image_body(request, max_bytes=settings.inference_max_image_bytes)
+    response = await run_in_slot(
+        ModelSlot.SAM,
+        sam_wrapper.segment_bytes,
+        image_bytes=image_bytes,
+        bounding_boxes=boxes,
+        pipe_diameter_mm=pipe_diameter_mm,
+        mask_encoding=mask_encoding,
+        crop_masks=crop_masks,
     )
+    record_sam(response, box_count=len(boxes), mask_encoding=mask_encoding)
+    return response
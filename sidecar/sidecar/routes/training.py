@@ -4,14 +4,18 @@ from __future__ import annotations
 
 import random
 import logging
+import time
 from pathlib import Path
 
 from PIL import Image
 from fastapi import APIRouter, HTTPException, status
 
+from .. import timing
 from ..config import settings
+from ..executors import run_in_slot
 from ..models.image_decode import decode_image_safe
 from ..schemas.segmentation import TrainingExportRequest, TrainingExportResponse
+from ..telemetry import record_training_export
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -20,8 +24,15 @@ logger = logging.getLogger(__name__)
 @router.post("/training/export-yolo", response_model=TrainingExportResponse)
 async def export_yolo(req: TrainingExportRequest) -> TrainingExportResponse:
     """Export training samples to YOLO format (images + labels + data.yaml)."""
+    response = await run_in_slot("training", _export_samples, req)
+    record_training_export(response)
+    return response
+
+
+def _export_samples(req: TrainingExportRequest) -> TrainingExportResponse:
     out = _resolve_output_dir(req.output_dir)
     decoded_images = [_decode_training_image(sample.image_base64) for sample in req.samples]
+    write_started = time.perf_counter()
 
     img_train = out / "images" / "train"
     img_val = out / "images" / "val"
@@ -86,6 +97,8 @@ async def export_yolo(req: TrainingExportRequest) -> TrainingExportResponse:
         f"names: {class_list}",
     ]
     data_yaml.write_text("\n".join(yaml_lines), encoding="utf-8")
+    # Bilder/Labels schreiben ist hier die Nachbearbeitung (kein Modell)
+    timing.add("postprocess", (time.perf_counter() - write_started) * 1000)
 
     return TrainingExportResponse(
         total_samples=len(req.samples),
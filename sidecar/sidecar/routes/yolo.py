@@ -2,13 +2,19 @@
 
 import time
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Query, Request
+from ..config import settings
 from ..schemas.detection import (
     YoloRequest, YoloResponse,
+    YoloBatchRequest, YoloBatchResponse,
     YoloClassifyRequest, YoloClassifyResponse, YoloClassifyPrediction,
+    YoloClassifyBatchRequest, YoloClassifyBatchResponse,
 )
-from ..models import yolo_wrapper
-from ..telemetry import write_yolo_detection
+from ..executors import run_in_slot
+from ..gpu_manager import ModelSlot
+from ..models import image_store, yolo_wrapper
+from ..models.image_decode import read_image_body
+from ..telemetry import record_classify, record_yolo_batch, record_yolo_detection
 
 router = APIRouter()
 
@@ -16,12 +22,68 @@ router = APIRouter()
 @router.post("/detect/yolo", response_model=YoloResponse)
 async def detect_yolo(req: YoloRequest) -> YoloResponse:
     started = time.perf_counter()
-    response = yolo_wrapper.detect(
-        image_base64=req.image_base64,
+    if req.image_id is not None:
+        response = await run_in_slot(
+            ModelSlot.YOLO,
+            yolo_wrapper.detect_array,
+            image_store.load(req.image_id),
+            confidence_threshold=req.confidence_threshold,
+            session_id=req.session_id,
+        )
+    else:
+        response = await run_in_slot(
+            ModelSlot.YOLO,
+            yolo_wrapper.detect,
+            image_base64=req.image_base64,
+            confidence_threshold=req.confidence_threshold,
+            session_id=req.session_id,
+        )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    record_yolo_detection(
+        response,
         confidence_threshold=req.confidence_threshold,
+        roundtrip_ms=elapsed_ms,
+    )
+    return response
+
+
+@router.post("/detect/yolo/binary", response_model=YoloResponse)
+async def detect_yolo_binary(
+    request: Request,
+    confidence_threshold: float = Query(default=0.25, ge=0.0, le=1.0),
+    session_id: str | None = None,
+) -> YoloResponse:
+    """Wie /detect/yolo, aber mit rohem Bild-Body (application/octet-stream, image/*)."""
+    started = time.perf_counter()
+    image_bytes = await read_image_body(request, max_bytes=settings.inference_max_image_bytes)
+    response = await run_in_slot(
+        ModelSlot.YOLO,
+        yolo_wrapper.detect_bytes,
+        image_bytes=image_bytes,
+        confidence_threshold=confidence_threshold,
+        session_id=session_id,
     )
     elapsed_ms = (time.perf_counter() - started) * 1000
-    write_yolo_detection(
+    record_yolo_detection(
+        response,
+        confidence_threshold=confidence_threshold,
+        roundtrip_ms=elapsed_ms,
+    )
+    return response
+
+
+@router.post("/detect/yolo/batch", response_model=YoloBatchResponse)
+async def detect_yolo_batch(req: YoloBatchRequest) -> YoloBatchResponse:
+    """Mehrere Frames in einem Request; ein gebuendelter predict-Aufruf."""
+    started = time.perf_counter()
+    response = await run_in_slot(
+        ModelSlot.YOLO,
+        yolo_wrapper.detect_batch,
+        images_base64=req.images_base64,
+        confidence_threshold=req.confidence_threshold,
+    )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    record_yolo_batch(
         response,
         confidence_threshold=req.confidence_threshold,
         roundtrip_ms=elapsed_ms,
@@ -32,11 +94,49 @@ async def detect_yolo(req: YoloRequest) -> YoloResponse:
 @router.post("/classify/yolo", response_model=YoloClassifyResponse)
 async def classify_yolo(req: YoloClassifyRequest) -> YoloClassifyResponse:
     """Whole-Frame-Klassifikation: BCD/BCE/BCA/BCC/BAB/... erkennen."""
-    import time
     t0 = time.perf_counter()
-    preds = yolo_wrapper.classify(req.image_base64, top_k=req.top_k)
-    elapsed_ms = (time.perf_counter() - t0) * 1000
+    if req.image_id is not None:
+        preds = await run_in_slot(
+            "classify", yolo_wrapper.classify_array, image_store.load(req.image_id), top_k=req.top_k,
+        )
+    else:
+        preds = await run_in_slot("classify", yolo_wrapper.classify, req.image_base64, top_k=req.top_k)
+    response = _classify_response(preds, (time.perf_counter() - t0) * 1000)
+    record_classify(response, top_k=req.top_k)
+    return response
+
+
+@router.post("/classify/yolo/binary", response_model=YoloClassifyResponse)
+async def classify_yolo_binary(
+    request: Request,
+    top_k: int = Query(default=5, ge=1, le=20),
+) -> YoloClassifyResponse:
+    """Whole-Frame-Klassifikation mit rohem Bild-Body."""
+    t0 = time.perf_counter()
+    image_bytes = await read_image_body(request, max_bytes=settings.inference_max_image_bytes)
+    preds = await run_in_slot("classify", yolo_wrapper.classify_bytes, image_bytes, top_k=top_k)
+    response = _classify_response(preds, (time.perf_counter() - t0) * 1000)
+    record_classify(response, top_k=top_k)
+    return response
+
+
+@router.post("/classify/yolo/batch", response_model=YoloClassifyBatchResponse)
+async def classify_yolo_batch(req: YoloClassifyBatchRequest) -> YoloClassifyBatchResponse:
+    """Whole-Frame-Klassifikation mehrerer Frames in einem predict-Aufruf."""
+    if req.image_ids:
+        response = await run_in_slot(
+            "classify",
+            yolo_wrapper.classify_batch_arrays,
+            [image_store.load(image_id) for image_id in req.image_ids],
+            top_k=req.top_k,
+        )
+    else:
+        response = await run_in_slot("classify", yolo_wrapper.classify_batch, req.images_base64, top_k=req.top_k)
+    record_classify(response, top_k=req.top_k)
+    return response
+
 
+def _classify_response(preds: list, elapsed_ms: float) -> YoloClassifyResponse:
     predictions = [
         YoloClassifyPrediction(class_name=name, confidence=conf)
         for name, conf, _ in preds
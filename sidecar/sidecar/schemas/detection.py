@@ -2,14 +2,42 @@
 
 from __future__ import annotations
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
-# ── YOLO ────────────────────────────────────────────────────────────────────
+# ── Bildquelle (base64 oder image_id aus /images) ──────────────────────────
+
+class ImageInput(BaseModel):
+    image_base64: str | None = None
+    image_id: str | None = Field(default=None, description="Handle from POST /images")
+
+    @model_validator(mode="after")
+    def _exactly_one_image_source(self):
+        if (self.image_base64 is None) == (self.image_id is None):
+            raise ValueError("exactly one of image_base64 or image_id is required")
+        return self
+
 
-class YoloRequest(BaseModel):
+class ImageUploadRequest(BaseModel):
     image_base64: str
+
+
+class ImageUploadResponse(BaseModel):
+    image_id: str
+    width: int
+    height: int
+    size_bytes: int = Field(description="Size of the decoded RGB array in the cache")
+    already_cached: bool = False
+
+
+# ── YOLO ────────────────────────────────────────────────────────────────────
+
+class YoloRequest(ImageInput):
     confidence_threshold: float = Field(default=0.25, ge=0.0, le=1.0)
+    session_id: str | None = Field(
+        default=None,
+        description="Enables the near-duplicate filter for consecutive frames of one recording",
+    )
 
 
 class YoloDetection(BaseModel):
@@ -33,12 +61,28 @@ class YoloResponse(BaseModel):
     vram_allocated_gb: float | None = None
     vram_total_gb: float | None = None
     gpu_utilization_percent: float | None = None
+    reused: bool = Field(default=False, description="Near-duplicate of the session's last analysed frame")
+
+
+class YoloBatchRequest(BaseModel):
+    images_base64: list[str] = Field(min_length=1)
+    confidence_threshold: float = Field(default=0.25, ge=0.0, le=1.0)
+
+
+class YoloBatchResponse(BaseModel):
+    results: list[YoloResponse] = Field(
+        default_factory=list,
+        description="One YoloResponse per input frame, in input order",
+    )
+    frame_count: int = 0
+    inferred_count: int = 0
+    inference_time_ms: float = Field(default=0.0, description="Duration of the batched predict call")
+    total_time_ms: float = 0.0
 
 
 # ── Grounding DINO ──────────────────────────────────────────────────────────
 
-class DinoRequest(BaseModel):
-    image_base64: str
+class DinoRequest(ImageInput):
     text_prompt: str | None = None
     box_threshold: float = Field(default=0.30, ge=0.0, le=1.0)
     text_threshold: float = Field(default=0.25, ge=0.0, le=1.0)
@@ -57,6 +101,32 @@ class DinoDetection(BaseModel):
 class DinoResponse(BaseModel):
     detections: list[DinoDetection] = []
     inference_time_ms: float = 0.0
+    precision: str = Field(default="fp32", description="fp32, fp16, bf16 or autocast")
+
+
+class DinoBatchRequest(BaseModel):
+    """Several frames with one shared prompt; either base64 images or image_id handles."""
+    images_base64: list[str] = []
+    image_ids: list[str] = []
+    text_prompt: str | None = None
+    box_threshold: float = Field(default=0.30, ge=0.0, le=1.0)
+    text_threshold: float = Field(default=0.25, ge=0.0, le=1.0)
+
+    @model_validator(mode="after")
+    def _exactly_one_image_source(self):
+        if bool(self.images_base64) == bool(self.image_ids):
+            raise ValueError("exactly one of images_base64 or image_ids is required")
+        return self
+
+
+class DinoBatchResponse(BaseModel):
+    results: list[DinoResponse] = Field(
+        default_factory=list,
+        description="One DinoResponse per input frame, in input order",
+    )
+    frame_count: int = 0
+    inference_time_ms: float = Field(default=0.0, description="Duration of the batched forward pass")
+    total_time_ms: float = 0.0
 
 
 # ── Bounding Box (shared input for SAM) ────────────────────────────────────
@@ -72,8 +142,7 @@ class BoundingBox(BaseModel):
 
 # ── YOLO Classify ─────────────────────────────────────────────────────────
 
-class YoloClassifyRequest(BaseModel):
-    image_base64: str
+class YoloClassifyRequest(ImageInput):
     top_k: int = Field(default=5, ge=1, le=20)
 
 
@@ -85,3 +154,26 @@ class YoloClassifyPrediction(BaseModel):
 class YoloClassifyResponse(BaseModel):
     predictions: list[YoloClassifyPrediction] = []
     inference_time_ms: float = 0.0
+
+
+class YoloClassifyBatchRequest(BaseModel):
+    """Several frames classified in one call; either base64 images or image_id handles."""
+    images_base64: list[str] = []
+    image_ids: list[str] = []
+    top_k: int = Field(default=5, ge=1, le=20)
+
+    @model_validator(mode="after")
+    def _exactly_one_image_source(self):
+        if bool(self.images_base64) == bool(self.image_ids):
+            raise ValueError("exactly one of images_base64 or image_ids is required")
+        return self
+
+
+class YoloClassifyBatchResponse(BaseModel):
+    results: list[YoloClassifyResponse] = Field(
+        default_factory=list,
+        description="One YoloClassifyResponse per input frame, in input order",
+    )
+    frame_count: int = 0
+    inference_time_ms: float = Field(default=0.0, description="Duration of the batched forward pass")
+    total_time_ms: float = 0.0
@@ -0,0 +1,41 @@
+"""Pydantic DTOs for the stand-alone frame quality check."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field, model_validator
+
+from .detection import ImageInput
+
+
+class QualityCheckRequest(ImageInput):
+    pass
+
+
+class QualityCheckResponse(BaseModel):
+    usable: bool
+    reason: str = Field(description="ok, too_dark, too_bright, too_uniform or too_blurry")
+    brightness: float = 0.0
+    std: float = 0.0
+    edge_var: float = 0.0
+    check_time_ms: float = Field(default=0.0, description="Decode + quality gate")
+
+
+class QualityBatchRequest(BaseModel):
+    images_base64: list[str] = []
+    image_ids: list[str] = []
+
+    @model_validator(mode="after")
+    def _exactly_one_image_source(self):
+        if bool(self.images_base64) == bool(self.image_ids):
+            raise ValueError("exactly one of images_base64 or image_ids is required")
+        return self
+
+
+class QualityBatchResponse(BaseModel):
+    results: list[QualityCheckResponse] = Field(
+        default_factory=list,
+        description="One QualityCheckResponse per input frame, in input order",
+    )
+    frame_count: int = 0
+    usable_count: int = 0
+    total_time_ms: float = 0.0
@@ -2,21 +2,32 @@
 
 from __future__ import annotations
 
+from typing import Literal
+
 from pydantic import BaseModel, Field
-from .detection import BoundingBox
+from .detection import BoundingBox, ImageInput
 
+MaskEncoding = Literal["rle", "coco_rle", "bitpacked"]
 
-class SamRequest(BaseModel):
-    image_base64: str
+
+class SamRequest(ImageInput):
     bounding_boxes: list[BoundingBox] = []
     pipe_diameter_mm: int | None = None
+    mask_encoding: MaskEncoding = Field(
+        default="rle",
+        description="rle (legacy), coco_rle (COCO compressed counts) or bitpacked (np.packbits, base64)",
+    )
+    crop_masks: bool = Field(default=False, description="Encode only the mask's bounding box")
 
 
 class MaskResult(BaseModel):
     label: str = ""
     confidence: float = 0.0
     bbox: list[float] = Field(default_factory=list, description="[x1,y1,x2,y2]")
-    mask_rle: str = Field(default="", description="Run-length-encoded mask")
+    mask_rle: str = Field(default="", description="Encoded mask, format given by mask_encoding")
+    mask_encoding: str = "rle"
+    mask_size: list[int] = Field(default_factory=list, description="[height,width] of the encoded mask")
+    mask_offset: list[int] = Field(default_factory=lambda: [0, 0], description="[x,y] of the encoded mask in the image")
     mask_area_pixels: int = 0
     image_area_pixels: int = 0
     height_pixels: int = 0
@@ -30,6 +41,8 @@ class SamResponse(BaseModel):
     image_width: int = 0
     image_height: int = 0
     inference_time_ms: float = 0.0
+    embedding_cached: bool = Field(default=False, description="Image encoder skipped (embedding cache hit)")
+    precision: str = Field(default="fp32", description="fp32, fp16, bf16 or autocast")
 
 
 # ── Training Export ─────────────────────────────────────────────────────────
@@ -0,0 +1,71 @@
+"""Pydantic schemas for telemetry events (one JSON line per request in sidecar.jsonl)."""
+
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class RequestEvent(BaseModel):
+    """Fields shared by every endpoint event; all durations in ms."""
+    timestamp_utc: str
+    event: str
+    endpoint: str
+    status_code: int = 200
+    total_ms: float = Field(default=0.0, description="Middleware in -> response ready")
+    queue_ms: float = Field(default=0.0, description="Waiting for the slot executor and micro-batcher")
+    decode_ms: float = Field(default=0.0, description="base64 and image decoding")
+    quality_ms: float = Field(default=0.0, description="YOLO frame quality gate")
+    preprocess_ms: float = Field(default=0.0, description="Resizing, normalisation")
+    model_ms: float = Field(default=0.0, description="Forward pass incl. device transfer")
+    postprocess_ms: float = Field(default=0.0, description="Thresholds, mask encoding, DTO construction")
+    serialize_ms: float = Field(default=0.0, description="Handler done -> JSON response ready")
+    request_bytes: int = 0
+    response_bytes: int = 0
+    frame_count: int = 1
+
+
+class YoloDetectEvent(RequestEvent):
+    model_name: str | None = None
+    backend: str | None = None
+    device: str | None = None
+    roundtrip_ms: float = 0.0
+    inference_time_ms: float = 0.0
+    queue_wait_ms: float = 0.0
+    gpu_utilization_percent: float | None = None
+    vram_allocated_gb: float | None = None
+    vram_total_gb: float | None = None
+    detection_count: int = 0
+    confidence_threshold: float | None = None
+    frame_class: str | None = None
+    is_relevant: bool | None = None
+    reused: bool = False
+
+
+class DinoDetectEvent(RequestEvent):
+    detection_count: int = 0
+    box_threshold: float | None = None
+    text_threshold: float | None = None
+    inference_time_ms: float = 0.0
+    precision: str | None = None
+
+
+class SamSegmentEvent(RequestEvent):
+    box_count: int = 0
+    mask_count: int = 0
+    mask_encoding: str | None = None
+    embedding_cached: bool | None = None
+    inference_time_ms: float = 0.0
+    precision: str | None = None
+
+
+class YoloClassifyEvent(RequestEvent):
+    top_k: int | None = None
+    prediction_count: int = 0
+    top_class: str | None = None
+    inference_time_ms: float = 0.0
+
+
+class TrainingExportEvent(RequestEvent):
+    train_count: int = 0
+    val_count: int = 0
+    class_count: int = 0
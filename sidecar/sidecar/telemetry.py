@@ -1,19 +1,54 @@
-"""Append-only JSONL telemetry for sidecar requests."""
+"""Append-only JSONL telemetry for sidecar requests.
+
+The middleware in main.py opens a timing context (see timing.py) for every
+endpoint in ``ROUTE_EVENTS``; routes add endpoint fields via the
+``record_*`` helpers and one typed event (schemas/telemetry.py) is
+enqueued per request. Requests only build the event and enqueue it. A background writer
+drains the bounded queue, serialises events and appends them in batches
+(every ``telemetry_flush_interval_sec`` or ``telemetry_flush_batch``
+events). ``sidecar.jsonl`` is rotated by size and/or UTC day; rotated
+files are optionally gzip-compressed. When the queue is full, events are
+dropped and counted instead of blocking the request.
+"""
 
 from __future__ import annotations
 
+import gzip
 import json
 import logging
 import os
+import queue
+import shutil
 import threading
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+from pydantic import BaseModel, ValidationError
+
+from . import timing
 from .config import settings
-from .schemas.detection import YoloResponse
+from .schemas.detection import (
+    DinoBatchResponse,
+    DinoResponse,
+    YoloBatchResponse,
+    YoloClassifyBatchResponse,
+    YoloClassifyResponse,
+    YoloResponse,
+)
+from .schemas.segmentation import SamResponse, TrainingExportResponse
+from .schemas.telemetry import (
+    DinoDetectEvent,
+    RequestEvent,
+    SamSegmentEvent,
+    TrainingExportEvent,
+    YoloClassifyEvent,
+    YoloDetectEvent,
+)
 
 logger = logging.getLogger(__name__)
-_write_lock = threading.Lock()
+
+_MB = 1024 ** 2
 
 
 def telemetry_path() -> Path:
@@ -30,44 +65,377 @@ def telemetry_path() -> Path:
     return telemetry_dir / "sidecar.jsonl"
 
 
-def write_yolo_detection(
-    response: YoloResponse,
+def rotated_files(path: Path) -> list[Path]:
+    """Rotierte Dateien zu *path*, aelteste zuerst (Zeitstempel im Namen)."""
+    if not path.parent.exists():
+        return []
+    return sorted(path.parent.glob(f"{path.stem}-*.jsonl*"))
+
+
+class TelemetryWriter:
+    """Bounded queue plus one daemon thread that owns the telemetry file.
+
+    The thread starts on the first ``enqueue()``. ``flush()`` blocks until
+    everything enqueued before it is on disk (tests, shutdown).
+    """
+
+    def __init__(
+        self,
+        *,
+        queue_size: int | None = None,
+        flush_interval_sec: float | None = None,
+        flush_batch: int | None = None,
+        autostart: bool = True,
+    ) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size or settings.telemetry_queue_size)
+        self._flush_interval_sec = flush_interval_sec
+        self._flush_batch = flush_batch
+        self._autostart = autostart
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._written = 0
+        self._dropped = 0
+        self._batches = 0
+        self._rotations = 0
+        self._write_errors = 0
+
+    @property
+    def flush_interval_sec(self) -> float:
+        if self._flush_interval_sec is not None:
+            return self._flush_interval_sec
+        return settings.telemetry_flush_interval_sec
+
+    @property
+    def flush_batch(self) -> int:
+        return max(1, self._flush_batch or settings.telemetry_flush_batch)
+
+    def enqueue(self, event: dict | BaseModel) -> bool:
+        """Event uebernehmen, ohne zu blockieren; False wenn verworfen."""
+        if self._thread is None and self._autostart:
+            self.start()
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except queue.Full:
+            self._dropped += 1
+            if self._dropped == 1:
+                logger.warning("Telemetry queue full, dropping events")
+            return False
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="telemetry-writer", daemon=True)
+            self._thread.start()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Warten, bis alle bisher eingereihten Events geschrieben sind."""
+        if self._thread is None:
+            self._drain()
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        if self._thread is None:
+            self._drain()
+            return
+        self.flush(timeout)
+        with self._start_lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stop.set()
+            try:
+                self._queue.put_nowait(threading.Event())  # wartendes get() aufwecken
+            except queue.Full:
+                pass
+            thread.join(timeout)
+        self._drain()
+
+    def status(self) -> dict:
+        return {
+            "enabled": settings.telemetry_enabled,
+            "path": str(telemetry_path()),
+            "running": self._thread is not None,
+            "queued": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "written": self._written,
+            "dropped": self._dropped,
+            "batches": self._batches,
+            "rotations": self._rotations,
+            "write_errors": self._write_errors,
+        }
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            events, waiters = self._collect()
+            self._write(events)
+            for waiter in waiters:
+                waiter.set()
+
+    def _collect(self) -> tuple[list[dict | BaseModel], list[threading.Event]]:
+        """Bis flush_batch Events oder flush_interval_sec nach dem ersten Event sammeln."""
+        events: list[dict | BaseModel] = []
+        waiters: list[threading.Event] = []
+        try:
+            item = self._queue.get(timeout=self.flush_interval_sec)
+        except queue.Empty:
+            return events, waiters
+        deadline = time.monotonic() + self.flush_interval_sec
+        while True:
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+                return events, waiters  # flush(): sofort schreiben
+            events.append(item)
+            if len(events) >= self.flush_batch:
+                return events, waiters
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return events, waiters
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return events, waiters
+
+    def _drain(self) -> None:
+        """Rest der Queue im aufrufenden Thread schreiben (ohne laufenden Writer)."""
+        events, waiters = [], []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            (waiters if isinstance(item, threading.Event) else events).append(item)
+        self._write(events)
+        for waiter in waiters:
+            waiter.set()
+
+    def _write(self, events: list[dict | BaseModel]) -> None:
+        if not events:
+            return
+        try:
+            lines = "".join(_serialize(event) + "\n" for event in events)
+            path = telemetry_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._rotate_if_needed(path)
+            with path.open("a", encoding="utf-8") as handle:
+                handle.write(lines)
+            self._written += len(events)
+            self._batches += 1
+        except Exception as exc:
+            self._write_errors += 1
+            logger.warning("Could not write sidecar telemetry: %s", exc)
+
+    def _rotate_if_needed(self, path: Path) -> None:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return
+        if stat.st_size == 0:
+            return
+        modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+        too_large = settings.telemetry_rotate_mb > 0 and stat.st_size >= settings.telemetry_rotate_mb * _MB
+        new_day = settings.telemetry_rotate_daily and modified.date() != datetime.now(timezone.utc).date()
+        if not (too_large or new_day):
+            return
+
+        stamp = modified.strftime("%Y%m%dT%H%M%S%f")
+        target = path.with_name(f"{path.stem}-{stamp}.jsonl")
+        counter = 1
+        while target.exists() or target.with_suffix(".jsonl.gz").exists():
+            target = path.with_name(f"{path.stem}-{stamp}-{counter}.jsonl")
+            counter += 1
+        path.rename(target)
+        self._rotations += 1
+
+        if settings.telemetry_compress_rotated:
+            with target.open("rb") as source, gzip.open(target.with_suffix(".jsonl.gz"), "wb") as sink:
+                shutil.copyfileobj(source, sink)
+            target.unlink()
+        self._prune(path)
+
+    def _prune(self, path: Path) -> None:
+        keep = settings.telemetry_keep_rotated
+        if keep <= 0:
+            return
+        for old in rotated_files(path)[:-keep]:
+            old.unlink(missing_ok=True)
+
+
+def _serialize(event: dict | BaseModel) -> str:
+    if isinstance(event, BaseModel):
+        return event.model_dump_json()
+    return json.dumps(event, ensure_ascii=False, separators=(",", ":"))
+
+
+writer = TelemetryWriter()
+
+
+def flush(timeout: float = 5.0) -> bool:
+    return writer.flush(timeout)
+
+
+def get_status() -> dict:
+    return writer.status()
+
+
+def shutdown() -> None:
+    writer.stop()
+
+
+# Pfad -> (Event-Name, Schema); nur diese Endpunkte werden von der Middleware gemessen
+ROUTE_EVENTS: dict[str, tuple[str, type[RequestEvent]]] = {
+    "/detect/yolo": ("yolo_detect", YoloDetectEvent),
+    "/detect/yolo/binary": ("yolo_detect", YoloDetectEvent),
+    "/detect/yolo/batch": ("yolo_detect_batch", YoloDetectEvent),
+    "/detect/dino": ("dino_detect", DinoDetectEvent),
+    "/detect/dino/binary": ("dino_detect", DinoDetectEvent),
+    "/detect/dino/batch": ("dino_detect_batch", DinoDetectEvent),
+    "/segment/sam": ("sam_segment", SamSegmentEvent),
+    "/segment/sam/binary": ("sam_segment", SamSegmentEvent),
+    "/classify/yolo": ("yolo_classify", YoloClassifyEvent),
+    "/classify/yolo/binary": ("yolo_classify", YoloClassifyEvent),
+    "/classify/yolo/batch": ("yolo_classify_batch", YoloClassifyEvent),
+    "/training/export-yolo": ("training_export", TrainingExportEvent),
+}
+
+
+def event_for(path: str) -> tuple[str, type[RequestEvent]] | None:
+    return ROUTE_EVENTS.get(path)
+
+
+def write_request(
+    event: tuple[str, type[RequestEvent]],
+    request_timing: timing.RequestTiming,
     *,
-    confidence_threshold: float,
-    roundtrip_ms: float,
+    status_code: int,
 ) -> None:
+    """Typed event from a finished request's timing context; serialised by the writer thread."""
     if not settings.telemetry_enabled:
         return
-
+    name, schema = event
+    stages = request_timing.stages_ms
     try:
-        event = {
+        payload = schema(**{
             "timestamp_utc": datetime.now(timezone.utc).isoformat(),
-            "event": "yolo_detect",
-            "model_name": response.model_name,
-            "backend": _backend(response),
-            "device": response.device,
-            "roundtrip_ms": round(roundtrip_ms, 1),
-            "inference_time_ms": response.inference_time_ms,
-            "queue_wait_ms": response.queue_wait_ms,
-            "gpu_utilization_percent": response.gpu_utilization_percent,
-            "vram_allocated_gb": response.vram_allocated_gb,
-            "vram_total_gb": response.vram_total_gb,
-            "detection_count": len(response.detections or []),
-            "confidence_threshold": confidence_threshold,
-            "frame_class": response.frame_class,
-            "is_relevant": response.is_relevant,
-        }
+            "event": name,
+            "endpoint": request_timing.endpoint,
+            "status_code": status_code,
+            "total_ms": round(request_timing.total_ms(), 2),
+            **{f"{stage}_ms": round(stages.get(stage, 0.0), 2) for stage in timing.STAGES},
+            "request_bytes": request_timing.request_bytes,
+            "response_bytes": request_timing.response_bytes,
+            **request_timing.fields,
+        })
+    except ValidationError as exc:
+        logger.warning("Invalid %s telemetry event: %s", name, exc)
+        return
+    writer.enqueue(payload)
 
-        path = telemetry_path()
-        line = json.dumps(event, ensure_ascii=False, separators=(",", ":"))
 
-        with _write_lock:
-            path.parent.mkdir(parents=True, exist_ok=True)
-            with path.open("a", encoding="utf-8") as handle:
-                handle.write(line)
-                handle.write("\n")
-    except Exception as exc:
-        logger.warning("Could not write sidecar telemetry: %s", exc)
+def record_yolo_detection(
+    response: YoloResponse,
+    *,
+    confidence_threshold: float,
+    roundtrip_ms: float,
+) -> None:
+    timing.annotate(
+        **_yolo_fields(response),
+        confidence_threshold=confidence_threshold,
+        roundtrip_ms=round(roundtrip_ms, 1),
+    )
+
+
+def record_yolo_batch(
+    response: YoloBatchResponse,
+    *,
+    confidence_threshold: float,
+    roundtrip_ms: float,
+) -> None:
+    fields = _yolo_fields(response.results[0]) if response.results else {}
+    timing.annotate(**{
+        **fields,
+        "frame_count": response.frame_count,
+        "detection_count": sum(len(result.detections or []) for result in response.results),
+        "inference_time_ms": response.inference_time_ms,
+        "frame_class": None,
+        "is_relevant": any(result.is_relevant for result in response.results),
+        "confidence_threshold": confidence_threshold,
+        "roundtrip_ms": round(roundtrip_ms, 1),
+    })
+
+
+def record_dino(
+    response: DinoResponse | DinoBatchResponse,
+    *,
+    box_threshold: float,
+    text_threshold: float,
+) -> None:
+    frames = response.results if isinstance(response, DinoBatchResponse) else [response]
+    timing.annotate(
+        frame_count=len(frames),
+        detection_count=sum(len(frame.detections) for frame in frames),
+        box_threshold=box_threshold,
+        text_threshold=text_threshold,
+        inference_time_ms=response.inference_time_ms,
+        precision=frames[0].precision if frames else None,
+    )
+
+
+def record_sam(response: SamResponse, *, box_count: int, mask_encoding: str) -> None:
+    timing.annotate(
+        box_count=box_count,
+        mask_count=len(response.masks),
+        mask_encoding=mask_encoding,
+        embedding_cached=response.embedding_cached,
+        inference_time_ms=response.inference_time_ms,
+        precision=response.precision,
+    )
+
+
+def record_classify(response: YoloClassifyResponse | YoloClassifyBatchResponse, *, top_k: int) -> None:
+    frames = response.results if isinstance(response, YoloClassifyBatchResponse) else [response]
+    first = frames[0].predictions if frames else []
+    timing.annotate(
+        frame_count=len(frames),
+        top_k=top_k,
+        prediction_count=sum(len(frame.predictions) for frame in frames),
+        top_class=first[0].class_name if first else None,
+        inference_time_ms=response.inference_time_ms,
+    )
+
+
+def record_training_export(response: TrainingExportResponse) -> None:
+    timing.annotate(
+        frame_count=response.total_samples,
+        train_count=response.train_count,
+        val_count=response.val_count,
+        class_count=len(response.classes_used),
+    )
+
+
+def _yolo_fields(response: YoloResponse) -> dict:
+    return {
+        "model_name": response.model_name,
+        "backend": _backend(response),
+        "device": response.device,
+        "inference_time_ms": response.inference_time_ms,
+        "queue_wait_ms": response.queue_wait_ms,
+        "gpu_utilization_percent": response.gpu_utilization_percent,
+        "vram_allocated_gb": response.vram_allocated_gb,
+        "vram_total_gb": response.vram_total_gb,
+        "detection_count": len(response.detections or []),
+        "frame_class": response.frame_class,
+        "is_relevant": response.is_relevant,
+        "reused": response.reused,
+    }
 
 
 def _backend(response: YoloResponse) -> str | None:
@@ -0,0 +1,336 @@
+"""Streaming report over sidecar telemetry (sidecar.jsonl and rotated files).
+
+Aufruf aus dem sidecar-Verzeichnis:
+
+    python -m sidecar.telemetry_report [PFAD ...] [--format json|markdown] [--output DATEI]
+
+PFAD ist eine Telemetrie-Datei (``.jsonl`` oder ``.jsonl.gz``) oder ein
+Verzeichnis; ein Verzeichnis liefert die rotierten Dateien (aelteste
+zuerst) und zuletzt ``sidecar.jsonl``. Ohne PFAD wird das konfigurierte
+Telemetrie-Verzeichnis gelesen, mehrere Verzeichnisse (z. B. von
+verschiedenen Laptops) werden zusammengefasst.
+
+Alle Dateien werden in einem Durchgang Zeile fuer Zeile gelesen. Latenzen
+landen in Histogrammen mit festen, logarithmischen Buckets, der Speicher
+haengt also nur von der Zahl der Gruppen und Stunden ab, nicht von der
+Dateigroesse. Perzentile sind deshalb Schaetzungen (Bucket-Breite ~5 %).
+Berichtet werden Durchsatz je Stunde, Latenz-Perzentile je
+Event/Backend/Device/Modell mit mittleren Stufenzeiten, Queue-Wartezeit je
+Event, die Relevanzquote der YOLO-Frames und VRAM-Hochwasserstaende je Device.
+Zeilen aus aelteren Versionen (nur ``roundtrip_ms``/``queue_wait_ms``)
+werden mitgezaehlt.
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import gzip
+import json
+import math
+import sys
+from collections import Counter as Tally
+from collections import defaultdict
+from pathlib import Path
+from typing import BinaryIO, Iterable
+
+from .metrics import bucket_quantile
+from .timing import STAGES
+
+# 0.05 ms .. ~10 min in Schritten von 5 %
+REPORT_BUCKETS_MS = tuple(0.05 * 1.05 ** i for i in range(int(math.log(12_000_000) / math.log(1.05)) + 2))
+QUANTILES = (0.5, 0.95, 0.99)
+
+_READ_BUFFER = 1024 * 1024
+
+
+def telemetry_files(path: Path) -> list[Path]:
+    """*path* selbst oder – fuer ein Verzeichnis – rotierte Dateien plus sidecar.jsonl."""
+    from .telemetry import rotated_files
+
+    if not path.is_dir():
+        return [path]
+    current = path / "sidecar.jsonl"
+    files = rotated_files(current)
+    if current.exists():
+        files.append(current)
+    return files
+
+
+def _open(path: Path) -> BinaryIO:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    return path.open("rb", buffering=_READ_BUFFER)
+
+
+class _Latency:
+    """Fixed-bucket counts plus exact count and maximum (single-threaded, no labels)."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(REPORT_BUCKETS_MS) + 1)
+        self.count = 0
+        self.maximum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(REPORT_BUCKETS_MS, value)] += 1
+        self.count += 1
+        if value > self.maximum:
+            self.maximum = value
+
+    def summary(self) -> dict:
+        result: dict = {}
+        for q in QUANTILES:
+            estimate = bucket_quantile(REPORT_BUCKETS_MS, self.counts, q)
+            result[f"p{int(q * 100)}_ms"] = round(min(estimate, self.maximum), 1) if estimate is not None else None
+        result["max_ms"] = round(self.maximum, 1)
+        return result
+
+
+class _Group:
+    def __init__(self) -> None:
+        self.latency = _Latency()
+        self.requests = 0
+        self.errors = 0
+        self.frames = 0
+        self.stage_sums = dict.fromkeys(STAGES, 0.0)
+
+
+class TelemetryReport:
+    """Aggregates telemetry events one at a time; memory independent of the log size."""
+
+    def __init__(self) -> None:
+        self.files: list[str] = []
+        self.events = 0
+        self.malformed_lines = 0
+        self.first_timestamp: str | None = None
+        self.last_timestamp: str | None = None
+        self._hours: dict[str, Tally] = defaultdict(Tally)
+        self._groups: dict[tuple[str, str, str, str], _Group] = defaultdict(_Group)
+        self._queue: dict[str, _Latency] = defaultdict(_Latency)
+        self._relevance = Tally()
+        self._frame_classes = Tally()
+        self._vram: dict[str, dict] = {}
+
+    # -- Einlesen ---------------------------------------------------------
+
+    def read(self, paths: Iterable[Path]) -> "TelemetryReport":
+        for path in paths:
+            for file in telemetry_files(path):
+                self.read_file(file)
+        return self
+
+    def read_file(self, path: Path) -> None:
+        self.files.append(str(path))
+        with _open(path) as handle:
+            for line in handle:
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    self.malformed_lines += 1
+                    continue
+                if not isinstance(event, dict):
+                    self.malformed_lines += 1
+                    continue
+                self.add(event)
+
+    def add(self, event: dict) -> None:
+        name = event.get("event") or "unknown"
+        timestamp = event.get("timestamp_utc") or ""
+        frames = event.get("frame_count") or 1
+        failed = (event.get("status_code") or 200) >= 400
+        self.events += 1
+
+        if timestamp:
+            if self.first_timestamp is None or timestamp < self.first_timestamp:
+                self.first_timestamp = timestamp
+            if self.last_timestamp is None or timestamp > self.last_timestamp:
+                self.last_timestamp = timestamp
+            hour = self._hours[timestamp[:13]]
+            hour["requests"] += 1
+            hour["frames"] += frames
+            hour["errors"] += failed
+
+        total_ms = event.get("total_ms") or event.get("roundtrip_ms")
+        group = self._groups[(
+            name,
+            event.get("backend") or "-",
+            event.get("device") or "-",
+            event.get("model_name") or event.get("precision") or "-",
+        )]
+        group.requests += 1
+        group.frames += frames
+        group.errors += failed
+        if total_ms is not None:
+            group.latency.observe(float(total_ms))
+        for stage in STAGES:
+            group.stage_sums[stage] += event.get(f"{stage}_ms") or 0.0
+
+        queue_ms = event.get("queue_ms") or event.get("queue_wait_ms")
+        if queue_ms is not None:
+            self._queue[name].observe(float(queue_ms))
+
+        relevant = event.get("is_relevant")
+        if relevant is not None:
+            self._relevance["relevant" if relevant else "not_relevant"] += 1
+            if not relevant:
+                self._frame_classes[event.get("frame_class") or "unknown"] += 1
+
+        allocated = event.get("vram_allocated_gb")
+        if allocated is not None:
+            mark = self._vram.setdefault(event.get("device") or "-", {
+                "max_allocated_gb": -1.0,
+                "total_gb": None,
+                "at": None,
+                "model_name": None,
+                "max_gpu_utilization_percent": None,
+            })
+            if allocated > mark["max_allocated_gb"]:
+                mark.update(
+                    max_allocated_gb=allocated,
+                    total_gb=event.get("vram_total_gb"),
+                    at=timestamp or None,
+                    model_name=event.get("model_name"),
+                )
+            utilization = event.get("gpu_utilization_percent")
+            if utilization is not None:
+                mark["max_gpu_utilization_percent"] = max(mark["max_gpu_utilization_percent"] or 0.0, utilization)
+
+    # -- Ausgabe ----------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        judged = sum(self._relevance.values())
+        return {
+            "files": self.files,
+            "events": self.events,
+            "malformed_lines": self.malformed_lines,
+            "first_timestamp_utc": self.first_timestamp,
+            "last_timestamp_utc": self.last_timestamp,
+            "throughput_per_hour": [
+                {"hour_utc": f"{hour}:00Z", **{key: counts[key] for key in ("requests", "frames", "errors")}}
+                for hour, counts in sorted(self._hours.items())
+            ],
+            "latency": [
+                {
+                    "event": name,
+                    "backend": backend,
+                    "device": device,
+                    "model": model,
+                    "requests": group.requests,
+                    "frames": group.frames,
+                    "errors": group.errors,
+                    **group.latency.summary(),
+                    "mean_stage_ms": {
+                        stage: round(total / group.requests, 2)
+                        for stage, total in group.stage_sums.items()
+                    },
+                }
+                for (name, backend, device, model), group in sorted(self._groups.items())
+            ],
+            "queue_wait": [
+                {"event": name, "requests": latency.count, **latency.summary()}
+                for name, latency in sorted(self._queue.items())
+            ],
+            "relevance": {
+                "judged_frames": judged,
+                "relevant": self._relevance["relevant"],
+                "rate": round(self._relevance["relevant"] / judged, 4) if judged else None,
+                "rejected_by_frame_class": dict(self._frame_classes.most_common()),
+            },
+            "vram_high_water": [{"device": device, **mark} for device, mark in sorted(self._vram.items())],
+        }
+
+    def to_markdown(self) -> str:
+        data = self.to_dict()
+        lines = [
+            "# Sidecar telemetry report",
+            "",
+            f"- Files: {len(data['files'])}",
+            f"- Events: {data['events']} ({data['malformed_lines']} malformed lines skipped)",
+            f"- Period (UTC): {data['first_timestamp_utc'] or '-'} .. {data['last_timestamp_utc'] or '-'}",
+            "",
+            "## Throughput per hour",
+            "",
+        ]
+        lines += _table(
+            ["Hour (UTC)", "Requests", "Frames", "Errors"],
+            [[row["hour_utc"], row["requests"], row["frames"], row["errors"]] for row in data["throughput_per_hour"]],
+        )
+        lines += ["", "## Latency (total_ms)", ""]
+        lines += _table(
+            ["Event", "Backend", "Device", "Model", "Requests", "p50", "p95", "p99", "max", *STAGES],
+            [
+                [
+                    row["event"], row["backend"], row["device"], row["model"], row["requests"],
+                    row["p50_ms"], row["p95_ms"], row["p99_ms"], row["max_ms"],
+                    *(row["mean_stage_ms"][stage] for stage in STAGES),
+                ]
+                for row in data["latency"]
+            ],
+        )
+        lines += ["", "Stage columns are means in ms.", "", "## Queue wait", ""]
+        lines += _table(
+            ["Event", "Requests", "p50", "p95", "p99", "max"],
+            [[row["event"], row["requests"], row["p50_ms"], row["p95_ms"], row["p99_ms"], row["max_ms"]]
+             for row in data["queue_wait"]],
+        )
+        relevance = data["relevance"]
+        rate = f"{relevance['rate']:.1%}" if relevance["rate"] is not None else "-"
+        lines += [
+            "",
+            "## Relevance",
+            "",
+            f"{relevance['relevant']} of {relevance['judged_frames']} judged YOLO requests relevant ({rate}).",
+            "",
+        ]
+        lines += _table(
+            ["Rejected frame class", "Count"],
+            [[frame_class, count] for frame_class, count in relevance["rejected_by_frame_class"].items()],
+        )
+        lines += ["", "## VRAM high-water", ""]
+        lines += _table(
+            ["Device", "Max allocated GB", "Total GB", "Max GPU %", "At (UTC)", "Model"],
+            [
+                [row["device"], row["max_allocated_gb"], row["total_gb"], row["max_gpu_utilization_percent"],
+                 row["at"], row["model_name"]]
+                for row in data["vram_high_water"]
+            ],
+        )
+        return "\n".join(lines) + "\n"
+
+
+def _table(header: list[str], rows: list[list]) -> list[str]:
+    if not rows:
+        return ["_no data_"]
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    lines += ["| " + " | ".join("-" if cell is None else str(cell) for cell in row) + " |" for row in rows]
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .telemetry import telemetry_path
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path, help="Dateien oder Verzeichnisse (Standard: Telemetrie-Verzeichnis)")
+    parser.add_argument("--format", choices=("json", "markdown"), default="markdown")
+    parser.add_argument("--output", type=Path, help="Bericht in diese Datei statt auf stdout")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or [telemetry_path().parent]
+    missing = [str(path) for path in paths if not path.exists()]
+    if missing:
+        print(f"not found: {', '.join(missing)}", file=sys.stderr)
+        return 2
+
+    report = TelemetryReport().read(paths)
+    text = json.dumps(report.to_dict(), indent=2) + "\n" if args.format == "json" else report.to_markdown()
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
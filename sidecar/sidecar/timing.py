@@ -0,0 +1,105 @@
+"""Per-request stage timings carried in a context variable.
+
+The telemetry middleware opens a ``RequestTiming`` for each instrumented
+request. Code on the request path records stages with ``stage("decode")``
+etc.; the executors copy the context into their worker threads, and the
+micro-batchers hand the stages measured for a batch back to every caller.
+Without an open timing (telemetry off, tests calling wrappers directly)
+``stage()`` only costs two ``perf_counter`` calls.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+# Reihenfolge der Stufen in Events und Reports
+STAGES = ("queue", "decode", "quality", "preprocess", "model", "postprocess", "serialize")
+
+
+@dataclass
+class RequestTiming:
+    """Gesammelte Stufenzeiten (ms), Endpunkt-Felder und Payload-Groessen eines Requests."""
+    endpoint: str
+    started: float = field(default_factory=time.perf_counter)
+    stages_ms: dict[str, float] = field(default_factory=dict)
+    fields: dict[str, Any] = field(default_factory=dict)
+    request_bytes: int = 0
+    response_bytes: int = 0
+    handler_done: float | None = None
+    finished: float | None = None
+
+    def add(self, stage: str, elapsed_ms: float) -> None:
+        self.stages_ms[stage] = self.stages_ms.get(stage, 0.0) + elapsed_ms
+
+    def merge(self, stages_ms: dict[str, float]) -> None:
+        for stage, elapsed_ms in stages_ms.items():
+            self.add(stage, elapsed_ms)
+
+    def finish(self) -> None:
+        """Response fertig: Serialisierungszeit seit dem Handler-Ende verbuchen."""
+        self.finished = time.perf_counter()
+        if self.handler_done is not None:
+            self.add("serialize", (self.finished - self.handler_done) * 1000)
+
+    def total_ms(self) -> float:
+        return ((self.finished or time.perf_counter()) - self.started) * 1000
+
+
+_current: ContextVar[RequestTiming | None] = ContextVar("request_timing", default=None)
+
+
+def current() -> RequestTiming | None:
+    return _current.get()
+
+
+@contextmanager
+def track(endpoint: str, *, request_bytes: int = 0) -> Iterator[RequestTiming]:
+    """Neue Zeitmessung fuer den aktuellen Kontext oeffnen (Middleware, Batch-Worker)."""
+    timing = RequestTiming(endpoint=endpoint, request_bytes=request_bytes)
+    token = _current.set(timing)
+    try:
+        yield timing
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Dauer des Blocks der Stufe *name* des laufenden Requests zurechnen."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing = _current.get()
+        if timing is not None:
+            timing.add(name, (time.perf_counter() - started) * 1000)
+
+
+def add(name: str, elapsed_ms: float) -> None:
+    timing = _current.get()
+    if timing is not None:
+        timing.add(name, elapsed_ms)
+
+
+def merge(stages_ms: dict[str, float]) -> None:
+    timing = _current.get()
+    if timing is not None:
+        timing.merge(stages_ms)
+
+
+def annotate(**fields: Any) -> None:
+    """Endpunkt-spezifische Felder fuer das Telemetrie-Event setzen."""
+    timing = _current.get()
+    if timing is not None:
+        timing.fields.update(fields)
+
+
+def mark_handler_done() -> None:
+    """Handler fertig: ab hier zaehlt die Zeit als Serialisierung."""
+    timing = _current.get()
+    if timing is not None:
+        timing.handler_done = time.perf_counter()
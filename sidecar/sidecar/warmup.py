@@ -0,0 +1,142 @@
+"""Startup warm-up: load the configured model slots in parallel in the background.
+
+The server accepts requests (and answers /health) while the slots load;
+``/health`` → ``warmup`` reports a readiness state per slot so the client
+can wait for ``ready`` instead of timing out on its first frame.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from typing import Callable
+
+from .config import settings
+from .gpu_manager import ModelSlot
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+NOT_REQUESTED = "not_requested"
+
+_PRELOADABLE = (ModelSlot.YOLO, ModelSlot.DINO, ModelSlot.SAM)
+
+_lock = threading.Lock()
+_slots: dict[ModelSlot, dict] = {}
+_threads: list[threading.Thread] = []
+_process_started = time.monotonic()
+_startup_time_sec: float | None = None
+_preload_started: float | None = None
+_preload_finished: float | None = None
+
+
+def configured_slots() -> list[ModelSlot]:
+    """Slots aus ``preload_models`` (z.B. "yolo,dino,sam"); unbekannte Namen werden ignoriert."""
+    slots: list[ModelSlot] = []
+    for name in settings.preload_models.split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        try:
+            slot = ModelSlot(name)
+        except ValueError:
+            slot = None
+        if slot not in _PRELOADABLE:
+            logger.warning("Ignoring unknown preload slot %r", name)
+            continue
+        if slot not in slots:
+            slots.append(slot)
+    return slots
+
+
+def _preloader(slot: ModelSlot) -> Callable[[], None]:
+    from .models import dino_wrapper, sam_wrapper, yolo_wrapper
+
+    return {
+        ModelSlot.YOLO: yolo_wrapper.preload,
+        ModelSlot.DINO: dino_wrapper.preload,
+        ModelSlot.SAM: sam_wrapper.preload,
+    }[slot]
+
+
+def _update(slot: ModelSlot, **values) -> None:
+    global _preload_finished
+    with _lock:
+        _slots[slot].update(values)
+        if all(entry["state"] in (READY, FAILED) for entry in _slots.values()):
+            _preload_finished = time.monotonic()
+
+
+def _load(slot: ModelSlot) -> None:
+    _update(slot, state=LOADING)
+    t0 = time.perf_counter()
+    try:
+        _preloader(slot)()
+    except Exception as exc:
+        logger.error("Preloading %s failed: %s", slot.value, exc)
+        _update(slot, state=FAILED, error=str(exc), load_time_sec=round(time.perf_counter() - t0, 2))
+        return
+    elapsed = time.perf_counter() - t0
+    logger.info("Preloaded %s in %.1fs", slot.value, elapsed)
+    _update(slot, state=READY, load_time_sec=round(elapsed, 2))
+
+
+def start(slots: list[ModelSlot] | None = None) -> None:
+    """Start one daemon thread per slot; returns immediately."""
+    global _preload_started, _preload_finished
+    slots = configured_slots() if slots is None else slots
+    if not slots:
+        return
+    with _lock:
+        _preload_started = time.monotonic()
+        _preload_finished = None
+        for slot in slots:
+            _slots[slot] = {"state": PENDING, "load_time_sec": None, "error": None}
+    for slot in slots:
+        thread = threading.Thread(target=_load, args=(slot,), name=f"preload-{slot.value}", daemon=True)
+        _threads.append(thread)
+        thread.start()
+
+
+def wait(timeout: float | None = None) -> bool:
+    """Block until all started preloads are done (tests, CLI). True when finished in time."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    for thread in list(_threads):
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        thread.join(remaining)
+    return not any(thread.is_alive() for thread in _threads)
+
+
+def mark_started() -> None:
+    """Called by the lifespan once the app accepts requests."""
+    global _startup_time_sec
+    _startup_time_sec = round(time.monotonic() - _process_started, 2)
+
+
+def reset() -> None:
+    """Forget all preload state (tests)."""
+    global _preload_started, _preload_finished, _startup_time_sec
+    wait()
+    with _lock:
+        _slots.clear()
+        _threads.clear()
+        _preload_started = _preload_finished = _startup_time_sec = None
+
+
+def get_status() -> dict:
+    with _lock:
+        slots = {slot.value: dict(_slots.get(slot, {"state": NOT_REQUESTED})) for slot in _PRELOADABLE}
+        started, finished = _preload_started, _preload_finished
+    preload_time = None
+    if started is not None and finished is not None:
+        preload_time = round(finished - started, 2)
+    return {
+        "ready": all(entry["state"] not in (PENDING, LOADING) for entry in slots.values()),
+        "slots": slots,
+        "startup_time_sec": _startup_time_sec,
+        "preload_time_sec": preload_time,
+    }
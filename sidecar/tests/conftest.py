@@ -12,3 +12,13 @@ def sidecar_security_defaults_for_tests(monkeypatch):
         raising=False,
     )
     monkeypatch.setattr(settings, "auth_token", "", raising=False)
+
+
+@pytest.fixture(autouse=True)
+def sidecar_telemetry_in_tmp(tmp_path, monkeypatch):
+    from sidecar import telemetry
+    from sidecar.config import settings
+
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path / "telemetry"), raising=False)
+    yield
+    telemetry.flush()  # Events dieses Tests nicht in den naechsten tragen
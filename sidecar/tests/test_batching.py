@@ -0,0 +1,231 @@
+"""Tests fuer den Micro-Batching-Scheduler (laeuft rein auf CPU mit Fake-Modell)."""
+
+import base64
+import io
+import threading
+import time
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from sidecar.batching import BatchOutcome, MicroBatcher
+from sidecar.config import settings
+from sidecar.gpu_manager import ModelSlot
+
+
+class _FakeModel:
+    """Verdoppelt Eingaben und protokolliert jede Batch-Groesse."""
+
+    def __init__(self, delay_sec: float = 0.0):
+        self.batch_sizes: list[int] = []
+        self.delay_sec = delay_sec
+
+    def run_batch(self, items: list[int]) -> list[int]:
+        self.batch_sizes.append(len(items))
+        time.sleep(self.delay_sec)
+        return [item * 2 for item in items]
+
+
+def _submit_concurrently(batcher: MicroBatcher, items: list[int]) -> list:
+    outcomes: list = [None] * len(items)
+    barrier = threading.Barrier(len(items))
+
+    def worker(index: int, item: int) -> None:
+        barrier.wait()
+        outcomes[index] = batcher.run(item)
+
+    threads = [threading.Thread(target=worker, args=(i, item)) for i, item in enumerate(items)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_concurrent_requests_are_coalesced_into_one_batch():
+    model = _FakeModel()
+    batcher = MicroBatcher(ModelSlot.YOLO, model.run_batch, window_ms=200, max_batch_size=4)
+    try:
+        outcomes = _submit_concurrently(batcher, [1, 2, 3, 4])
+    finally:
+        batcher.shutdown()
+
+    assert model.batch_sizes == [4]
+    assert [outcome.value for outcome in outcomes] == [2, 4, 6, 8]
+    assert all(outcome.batch_size == 4 for outcome in outcomes)
+
+
+def test_max_batch_size_splits_pending_requests():
+    model = _FakeModel()
+    batcher = MicroBatcher(ModelSlot.YOLO, model.run_batch, window_ms=200, max_batch_size=2)
+    try:
+        outcomes = _submit_concurrently(batcher, [1, 2, 3, 4])
+    finally:
+        batcher.shutdown()
+
+    assert sorted(model.batch_sizes) == [2, 2]
+    assert [outcome.value for outcome in outcomes] == [2, 4, 6, 8]
+
+
+def test_queue_wait_reflects_time_spent_behind_running_batch():
+    model = _FakeModel(delay_sec=0.05)
+    batcher = MicroBatcher(ModelSlot.SAM, model.run_batch, window_ms=0, max_batch_size=1)
+    try:
+        first = batcher.submit(1)
+        second = batcher.submit(2)
+        first_outcome = first.result(5)
+        second_outcome = second.result(5)
+    finally:
+        batcher.shutdown()
+
+    assert second_outcome.queue_wait_ms >= 40
+    assert second_outcome.queue_wait_ms > first_outcome.queue_wait_ms
+
+
+def test_batch_errors_are_fanned_out_to_every_caller():
+    def boom(items):
+        raise RuntimeError("CUDA out of memory")
+
+    batcher = MicroBatcher(ModelSlot.DINO, boom, window_ms=100, max_batch_size=2)
+    try:
+        futures = [batcher.submit(1), batcher.submit(2)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="out of memory"):
+                future.result(5)
+    finally:
+        batcher.shutdown()
+
+
+def test_disabled_batching_runs_inline(monkeypatch):
+    monkeypatch.setattr(settings, "batching_enabled", False, raising=False)
+    model = _FakeModel()
+    batcher = MicroBatcher(ModelSlot.YOLO, model.run_batch)
+
+    outcome = batcher.run(21)
+
+    assert outcome.value == 42
+    assert outcome.batch_size == 1
+    assert batcher._worker is None
+
+
+def test_yolo_detect_reports_real_queue_wait(monkeypatch):
+    from sidecar.models import yolo_wrapper
+
+    class _Result:
+        boxes = None
+        names = {}
+
+    class _StubBatcher:
+        def run(self, item):
+            array, confidence_threshold = item
+            assert isinstance(array, np.ndarray)
+            assert confidence_threshold == 0.3
+            return BatchOutcome(value=_Result(), queue_wait_ms=7.26, batch_size=3, batch_time_ms=12.0)
+
+    monkeypatch.setattr(yolo_wrapper, "_get_yolo_model", lambda: object())
+    monkeypatch.setattr(yolo_wrapper, "_yolo_batcher", _StubBatcher())
+
+    rng = np.random.default_rng(0)
+    buf = io.BytesIO()
+    Image.fromarray(rng.integers(30, 220, size=(32, 32, 3)).astype(np.uint8)).save(buf, format="PNG")
+
+    response = yolo_wrapper.detect(base64.b64encode(buf.getvalue()).decode(), confidence_threshold=0.3)
+
+    assert response.queue_wait_ms == 7.3
+    assert response.inference_time_ms == 12.0
+
+
+class _ReentrancyProbe:
+    """Fake predict, der ueberlappende Aufrufe auf derselben Instanz zaehlt."""
+
+    names = {0: "crack"}
+
+    def __init__(self, delay_sec: float = 0.01):
+        self.delay_sec = delay_sec
+        self.active = 0
+        self.max_active = 0
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, items):
+        with self._lock:
+            self.active += 1
+            self.calls += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay_sec)
+        with self._lock:
+            self.active -= 1
+        return [None] * len(items)
+
+    def predict(self, source, **_kwargs):
+        return self(source)
+
+
+class _ClassifierProbe(_ReentrancyProbe):
+    def predict(self, source, **_kwargs):
+        import torch
+
+        self(source)
+        probs = type("Probs", (), {"data": torch.tensor([1.0])})()
+        return [type("Result", (), {"probs": probs})() for _ in source]
+
+
+def _run_concurrently(calls: list) -> None:
+    barrier = threading.Barrier(len(calls))
+    errors: list[BaseException] = []
+
+    def worker(call) -> None:
+        barrier.wait()
+        try:
+            call()
+        except BaseException as exc:  # pragma: no cover - Fehler im Test sichtbar machen
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(call,)) for call in calls]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert not errors
+
+
+def test_disabled_batching_never_overlaps_batches_of_one_slot(monkeypatch):
+    monkeypatch.setattr(settings, "batching_enabled", False, raising=False)
+    probe = _ReentrancyProbe()
+    batcher = MicroBatcher(ModelSlot.SAM, probe)
+
+    _run_concurrently([lambda item=item: batcher.run(item) for item in range(6)])
+
+    assert probe.calls == 6
+    assert probe.max_active == 1
+
+
+def test_yolo_predict_paths_share_one_inference_lock(monkeypatch):
+    from sidecar.models import yolo_wrapper
+
+    monkeypatch.setattr(settings, "batching_enabled", False, raising=False)
+    monkeypatch.setattr(settings, "dedup_enabled", False, raising=False)
+    model = _ReentrancyProbe()
+    pytest.importorskip("torch")
+    classifier = _ClassifierProbe()
+    monkeypatch.setattr(yolo_wrapper, "_get_yolo_model", lambda: model)
+    monkeypatch.setattr(yolo_wrapper, "_cls_model", classifier)
+
+    rng = np.random.default_rng(0)
+    frame = rng.integers(30, 220, size=(32, 32, 3)).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(frame).save(buf, format="PNG")
+    encoded = base64.b64encode(buf.getvalue()).decode()
+
+    _run_concurrently(
+        [lambda: yolo_wrapper.detect_array(frame, 0.25) for _ in range(4)]
+        + [lambda: yolo_wrapper.detect_batch([encoded, encoded], 0.25) for _ in range(2)]
+        + [yolo_wrapper.preload]
+        + [lambda: yolo_wrapper.classify_arrays([frame], top_k=1) for _ in range(3)]
+    )
+
+    assert model.calls == 7
+    assert model.max_active == 1
+    assert classifier.calls == 3
+    assert classifier.max_active == 1
@@ -0,0 +1,152 @@
+"""Tests fuer den binaeren Upload-Pfad (roher Bild-Body statt base64-JSON)."""
+
+import io
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from sidecar.config import settings
+from sidecar.main import app
+from sidecar.schemas.detection import DinoResponse, YoloResponse
+from sidecar.schemas.segmentation import SamResponse
+
+_OCTET = {"content-type": "application/octet-stream"}
+
+
+def _png_bytes(width: int = 16, height: int = 12) -> bytes:
+    img = Image.new("RGB", (width, height), (10, 20, 30))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def test_decode_image_bytes_applies_pixel_limit():
+    from sidecar.models.image_decode import decode_image_bytes
+
+    assert decode_image_bytes(_png_bytes(), max_bytes=1024 * 1024, max_pixels=1_000).size == (16, 12)
+    with pytest.raises(HTTPException) as exc:
+        decode_image_bytes(_png_bytes(), max_bytes=1024 * 1024, max_pixels=100)
+    assert exc.value.status_code == 400
+
+
+def test_decode_image_bytes_applies_size_limit():
+    from sidecar.models.image_decode import decode_image_bytes
+
+    with pytest.raises(HTTPException) as exc:
+        decode_image_bytes(_png_bytes(), max_bytes=10, max_pixels=1_000)
+    assert exc.value.status_code == 413
+
+
+def test_yolo_binary_endpoint_decodes_raw_body(monkeypatch, tmp_path):
+    from sidecar.models import yolo_wrapper
+
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
+    seen: dict = {}
+
+    def fake_detect_array(img_array, confidence_threshold, session_id=None, original_size=None):
+        seen["shape"] = img_array.shape
+        seen["conf"] = confidence_threshold
+        return YoloResponse(is_relevant=True, frame_class="relevant")
+
+    monkeypatch.setattr(yolo_wrapper, "detect_array", fake_detect_array)
+
+    resp = TestClient(app).post(
+        "/detect/yolo/binary?confidence_threshold=0.6",
+        content=_png_bytes(),
+        headers=_OCTET,
+    )
+
+    assert resp.status_code == 200
+    assert seen == {"shape": (12, 16, 3), "conf": 0.6}
+
+
+def test_binary_body_over_size_limit_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "inference_max_image_bytes", 32, raising=False)
+
+    resp = TestClient(app).post("/detect/yolo/binary", content=_png_bytes(), headers=_OCTET)
+
+    assert resp.status_code == 413
+
+
+def test_binary_body_requires_image_content_type():
+    resp = TestClient(app).post(
+        "/detect/yolo/binary",
+        content=_png_bytes(),
+        headers={"content-type": "application/json"},
+    )
+
+    assert resp.status_code == 415
+
+
+def test_binary_body_with_invalid_image_returns_400(monkeypatch):
+    from sidecar.models import yolo_wrapper
+
+    monkeypatch.setattr(yolo_wrapper, "_get_yolo_model", lambda: object())
+
+    resp = TestClient(app).post("/detect/yolo/binary", content=b"not an image", headers=_OCTET)
+
+    assert resp.status_code == 400
+
+
+def test_dino_binary_endpoint_forwards_query_parameters(monkeypatch):
+    from sidecar.models import dino_wrapper
+
+    seen: dict = {}
+
+    def fake_detect_array(img_array, text_prompt, box_threshold, text_threshold, original_size=None):
+        seen.update(prompt=text_prompt, box=box_threshold, text=text_threshold)
+        assert isinstance(img_array, np.ndarray)
+        return DinoResponse()
+
+    monkeypatch.setattr(dino_wrapper, "detect_array", fake_detect_array)
+
+    resp = TestClient(app).post(
+        "/detect/dino/binary?text_prompt=crack&box_threshold=0.4&text_threshold=0.3",
+        content=_png_bytes(),
+        headers={"content-type": "image/png"},
+    )
+
+    assert resp.status_code == 200
+    assert seen == {"prompt": "crack", "box": 0.4, "text": 0.3}
+
+
+def test_sam_binary_endpoint_parses_boxes_from_query(monkeypatch):
+    from sidecar.models import sam_wrapper
+
+    seen: dict = {}
+
+    def fake_segment_array(
+        img_array, bounding_boxes, pipe_diameter_mm=None, frame_key=None, mask_encoding="rle", crop_masks=False
+    ):
+        seen["labels"] = [box.label for box in bounding_boxes]
+        seen["diameter"] = pipe_diameter_mm
+        seen["encoding"] = mask_encoding
+        return SamResponse(image_width=img_array.shape[1], image_height=img_array.shape[0])
+
+    monkeypatch.setattr(sam_wrapper, "segment_array", fake_segment_array)
+
+    boxes = '[{"x1": 1, "y1": 1, "x2": 8, "y2": 8, "label": "crack"}]'
+    resp = TestClient(app).post(
+        "/segment/sam/binary",
+        params={"bounding_boxes": boxes, "pipe_diameter_mm": 300, "mask_encoding": "coco_rle"},
+        content=_png_bytes(),
+        headers=_OCTET,
+    )
+
+    assert resp.status_code == 200
+    assert resp.json()["image_width"] == 16
+    assert seen == {"labels": ["crack"], "diameter": 300, "encoding": "coco_rle"}
+
+
+def test_sam_binary_endpoint_rejects_malformed_boxes():
+    resp = TestClient(app).post(
+        "/segment/sam/binary",
+        params={"bounding_boxes": "[{"},
+        content=_png_bytes(),
+        headers=_OCTET,
+    )
+
+    assert resp.status_code == 422
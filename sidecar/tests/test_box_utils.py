@@ -1,6 +1,8 @@
-"""Tests fuer clamp_box: Box-Ordnung, Clamping auf Bildgrenzen, Degenerate-Verwurf."""
+"""Tests fuer clamp_box (Box-Ordnung, Clamping, Degenerate-Verwurf) und box_iou."""
 
-from sidecar.models.box_utils import clamp_box
+import pytest
+
+from sidecar.models.box_utils import box_iou, clamp_box
 
 
 def test_normal_box_unchanged():
@@ -23,3 +25,10 @@ def test_degenerate_zero_area_returns_none():
 def test_fully_out_of_image_returns_none():
     # komplett links ausserhalb -> nach Clamp Null-Breite
     assert clamp_box(-50, 10, -10, 80, 100, 100) is None
+
+
+def test_box_iou_identical_disjoint_and_partial():
+    assert box_iou((0, 0, 10, 10), (0, 0, 10, 10)) == 1.0
+    assert box_iou((0, 0, 10, 10), (20, 20, 30, 30)) == 0.0
+    # 50 ueberlappend / (100 + 100 - 50)
+    assert box_iou((0, 0, 10, 10), (5, 0, 15, 10)) == pytest.approx(1 / 3)
@@ -0,0 +1,47 @@
+"""Tests fuer den LRU-Cache mit Byte-Budget."""
+
+from sidecar.cache import ByteBudgetLRU
+
+
+def test_lru_evicts_least_recently_used_entry_when_budget_is_exceeded():
+    cache = ByteBudgetLRU(max_bytes=100)
+    cache.put("a", "A", 40)
+    cache.put("b", "B", 40)
+    assert cache.get("a") == "A"  # a ist jetzt juenger als b
+
+    cache.put("c", "C", 40)
+
+    assert "b" not in cache
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.size_bytes == 80
+    assert cache.evictions == 1
+
+
+def test_lru_refuses_entries_larger_than_budget():
+    cache = ByteBudgetLRU(max_bytes=10)
+
+    assert cache.put("big", object(), 11) is False
+    assert len(cache) == 0
+
+
+def test_lru_respects_entry_limit_and_counts_hits_and_misses():
+    cache = ByteBudgetLRU(max_bytes=1_000, max_entries=2)
+    cache.put(1, "x", 1)
+    cache.put(2, "y", 1)
+    cache.put(3, "z", 1)
+
+    assert cache.get(1) is None
+    assert cache.get(3) == "z"
+    assert cache.stats()["entries"] == 2
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_lru_replacing_a_key_updates_size():
+    cache = ByteBudgetLRU(max_bytes=100)
+    cache.put("a", "old", 60)
+    cache.put("a", "new", 30)
+
+    assert cache.get("a") == "new"
+    assert cache.size_bytes == 30
@@ -0,0 +1,94 @@
+"""Tests fuer gebuendelte Grounding-DINO-Inferenz (Fake-Modell, kein groundingdino noetig)."""
+
+import numpy as np
+import pytest
+import torch
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from sidecar.config import settings
+from sidecar.gpu_manager import SlotState
+from sidecar.main import app
+from sidecar.models import dino_wrapper
+
+
+@pytest.fixture
+def fake_dino(monkeypatch):
+    calls: list[dict] = []
+
+    def fake_predict_many(_model, arrays, prompt, thresholds):
+        calls.append({"shapes": [a.shape for a in arrays], "prompt": prompt, "thresholds": thresholds})
+        # eine Box in der Bildmitte, halbe Breite/Hoehe (normiert)
+        return [(torch.tensor([[0.5, 0.5, 0.5, 0.5]]), torch.tensor([0.8]), ["crack"]) for _ in arrays]
+
+    monkeypatch.setattr(dino_wrapper, "_predict_many", fake_predict_many)
+    monkeypatch.setattr(
+        dino_wrapper.gpu_manager,
+        "ensure_loaded",
+        lambda *_args, **_kwargs: SlotState(model=object(), processor=None, device="cpu"),
+    )
+    monkeypatch.setattr(settings, "batching_enabled", False, raising=False)
+    return calls
+
+
+def test_working_size_matches_dino_resize_rule():
+    assert dino_wrapper._working_size(640, 480) == (1066, 800)
+    assert dino_wrapper._working_size(1920, 1080) == (1333, 750)
+    assert dino_wrapper._working_size(480, 640) == (800, 1066)
+
+
+def test_batch_runs_one_forward_and_maps_boxes_per_frame(fake_dino):
+    frames = [np.zeros((100, 200, 3), dtype=np.uint8), np.zeros((400, 300, 3), dtype=np.uint8)]
+
+    response = dino_wrapper.detect_batch_arrays(frames, "crack", 0.3, 0.25)
+
+    assert len(fake_dino) == 1
+    assert fake_dino[0]["prompt"] == "crack"
+    assert response.frame_count == 2
+    first, second = (r.detections[0] for r in response.results)
+    assert (first.x1, first.y1, first.x2, first.y2) == (50.0, 25.0, 150.0, 75.0)
+    assert (second.x1, second.y1, second.x2, second.y2) == (75.0, 100.0, 225.0, 300.0)
+
+
+def test_batch_over_frame_limit_is_rejected(fake_dino, monkeypatch):
+    monkeypatch.setattr(settings, "dino_batch_max_frames", 2, raising=False)
+    frames = [np.zeros((8, 8, 3), dtype=np.uint8)] * 3
+
+    with pytest.raises(HTTPException) as exc:
+        dino_wrapper.detect_batch_arrays(frames, None, 0.3, 0.25)
+
+    assert exc.value.status_code == 413
+    assert fake_dino == []
+
+
+def test_micro_batch_groups_items_by_prompt(fake_dino):
+    frame = np.zeros((8, 8, 3), dtype=np.uint8)
+    items = [(frame, "crack", 0.3, 0.2), (frame, "root", 0.3, 0.2), (frame, "crack", 0.5, 0.4)]
+
+    outputs = dino_wrapper._run_dino_batch(items)
+
+    assert len(outputs) == 3
+    assert [call["prompt"] for call in fake_dino] == ["crack", "root"]
+    assert fake_dino[0]["thresholds"] == [(0.3, 0.2), (0.5, 0.4)]
+
+
+def test_batch_endpoint_accepts_image_ids(fake_dino):
+    from sidecar.models import image_store
+
+    client = TestClient(app)
+    image_id = "frame-1"
+    image_store._cache.put(image_id, np.zeros((10, 20, 3), dtype=np.uint8), 600)
+    try:
+        resp = client.post("/detect/dino/batch", json={"image_ids": [image_id, image_id]})
+    finally:
+        image_store.discard(image_id)
+
+    assert resp.status_code == 200
+    assert resp.json()["frame_count"] == 2
+    assert fake_dino[0]["shapes"] == [(10, 20, 3), (10, 20, 3)]
+
+
+def test_batch_endpoint_requires_exactly_one_source():
+    resp = TestClient(app).post("/detect/dino/batch", json={"images_base64": ["x"], "image_ids": ["y"]})
+
+    assert resp.status_code == 422
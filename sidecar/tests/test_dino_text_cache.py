@@ -0,0 +1,116 @@
+"""Tests fuer den Grounding-DINO-Textcache (Fake-Tokenizer/-BERT, kein groundingdino noetig)."""
+
+import pytest
+import torch
+
+from sidecar.cache import ByteBudgetLRU
+from sidecar.config import settings
+from sidecar.models import dino_wrapper
+
+
+class _FakeTokenizer:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, text, **_kwargs):
+        self.calls += 1
+        texts = [text] if isinstance(text, str) else text
+        return {"input_ids": torch.tensor([[101, len(t), 102] for t in texts])}
+
+    def decode(self, ids):
+        return "decoded"
+
+
+class _FakeBert:
+    def __init__(self):
+        self.calls = 0
+
+    def forward(self, **kwargs):
+        self.calls += 1
+        return {"last_hidden_state": kwargs["input_ids"].float()[..., None].repeat(1, 1, 4)}
+
+    def __call__(self, **kwargs):
+        return self.forward(**kwargs)
+
+
+class _FakeModel:
+    def __init__(self):
+        self.tokenizer = _FakeTokenizer()
+        self.bert = _FakeBert()
+
+
+@pytest.fixture
+def model(monkeypatch):
+    monkeypatch.setattr(dino_wrapper, "_token_cache", ByteBudgetLRU(1024 * 1024, max_entries=4))
+    monkeypatch.setattr(dino_wrapper, "_text_feature_cache", ByteBudgetLRU(1024 * 1024, max_entries=4))
+    fake = _FakeModel()
+    inner_tokenizer, inner_bert = fake.tokenizer, fake.bert
+    dino_wrapper._install_text_cache(fake)
+    return fake, inner_tokenizer, inner_bert
+
+
+def test_same_caption_is_tokenized_once(model):
+    fake, inner_tokenizer, _ = model
+
+    first = fake.tokenizer("crack . root .", return_tensors="pt")
+    first["input_ids"] = first["input_ids"][:, :1]  # DINO kuerzt per Zuweisung
+    second = fake.tokenizer("crack . root .", return_tensors="pt")
+
+    assert inner_tokenizer.calls == 1
+    assert second["input_ids"].shape == (1, 3)
+    assert fake.tokenizer.decode([1]) == "decoded"
+
+
+def test_text_features_are_reused_for_equal_inputs(model):
+    fake, _, inner_bert = model
+
+    a = fake.bert(input_ids=torch.tensor([[101, 7, 102]]), attention_mask=None)
+    b = fake.bert(input_ids=torch.tensor([[101, 7, 102]]), attention_mask=None)
+    fake.bert(input_ids=torch.tensor([[101, 8, 102]]), attention_mask=None)
+
+    assert inner_bert.calls == 2
+    assert a is b
+    assert dino_wrapper.get_text_cache_status()["text_features"]["hits"] == 1
+
+
+def test_one_prompt_runs_bert_once_across_batch_sizes(model):
+    fake, inner_tokenizer, inner_bert = model
+
+    for batch_size in (1, 4, 2):
+        encoded = fake.tokenizer(["crack . root ."] * batch_size, padding="longest", return_tensors="pt")
+        output = fake.bert(**encoded)
+        assert output["last_hidden_state"].shape == (batch_size, 3, 4)
+
+    assert inner_tokenizer.calls == 1
+    assert inner_bert.calls == 1
+
+
+def test_mixed_prompts_in_one_batch_are_not_collapsed(model):
+    fake, _, inner_bert = model
+
+    encoded = fake.tokenizer(["crack .", "root ."], return_tensors="pt")
+    output = fake.bert(**encoded)
+
+    assert inner_bert.calls == 1
+    assert output["last_hidden_state"][:, 1, 0].tolist() == [7.0, 6.0]
+
+
+def test_cache_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(settings, "dino_text_cache_size", 0, raising=False)
+    fake = _FakeModel()
+    tokenizer = fake.tokenizer
+
+    dino_wrapper._install_text_cache(fake)
+
+    assert fake.tokenizer is tokenizer
+
+
+def test_prewarm_runs_default_labels(monkeypatch):
+    prompts: list[str] = []
+    monkeypatch.setattr(
+        dino_wrapper, "_predict_many", lambda _model, _arrays, prompt, _thresholds: prompts.append(prompt)
+    )
+
+    dino_wrapper._prewarm_text_cache(object())
+
+    assert prompts == [settings.dino_labels]
@@ -0,0 +1,93 @@
+"""Tests fuer die Slot-Executors: Inferenz blockiert den Event-Loop nicht mehr."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from sidecar.executors import SlotExecutor
+
+
+def test_executor_runs_blocking_call_off_the_event_loop_thread():
+    executor = SlotExecutor("test", max_workers=1, max_queue=0)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        worker_thread = await executor.run(threading.get_ident)
+        return loop_thread, worker_thread
+
+    try:
+        loop_thread, worker_thread = asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    assert loop_thread != worker_thread
+
+
+def test_full_executor_rejects_with_503_and_retry_after():
+    executor = SlotExecutor("sam", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def main():
+        running = [asyncio.ensure_future(executor.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        try:
+            with pytest.raises(HTTPException) as exc:
+                await executor.run(lambda: None)
+        finally:
+            release.set()
+            await asyncio.gather(*running)
+        return exc.value
+
+    try:
+        error = asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+    assert executor.stats()["rejected"] == 1
+    assert executor.stats()["in_flight"] == 0
+
+
+def test_slow_sam_call_does_not_block_health(monkeypatch):
+    from sidecar.main import app
+    from sidecar.models import sam_wrapper
+    from sidecar.schemas.segmentation import SamResponse
+
+    release = threading.Event()
+    entered = threading.Event()
+
+    def slow_segment(**_kwargs):
+        entered.set()
+        release.wait(5)
+        return SamResponse()
+
+    monkeypatch.setattr(sam_wrapper, "segment", slow_segment)
+
+    with TestClient(app) as client:
+        sam_result: dict = {}
+
+        def call_sam():
+            sam_result["status"] = client.post(
+                "/segment/sam",
+                json={"image_base64": "x", "bounding_boxes": []},
+            ).status_code
+
+        sam_thread = threading.Thread(target=call_sam)
+        sam_thread.start()
+        try:
+            assert entered.wait(5)
+            started = time.perf_counter()
+            health = client.get("/health")
+            health_ms = (time.perf_counter() - started) * 1000
+        finally:
+            release.set()
+            sam_thread.join(5)
+
+    assert health.status_code == 200
+    assert health_ms < 2000
+    assert sam_result["status"] == 200
@@ -0,0 +1,77 @@
+"""Tests fuer den Standbild-Filter pro session_id."""
+
+import numpy as np
+import pytest
+
+from sidecar.cache import ByteBudgetLRU
+from sidecar.config import settings
+from sidecar.models import frame_dedup, yolo_wrapper
+from sidecar.schemas.detection import YoloResponse
+
+
+def _frame(value: int = 120, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return np.clip(value + rng.normal(0, 10, (120, 160, 3)), 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def fake_yolo(monkeypatch):
+    monkeypatch.setattr(frame_dedup, "_sessions", ByteBudgetLRU(1024 * 1024, max_entries=4))
+    calls: list[np.ndarray] = []
+
+    def fake_detect(img_array, confidence_threshold, box_scale=(1.0, 1.0)):
+        calls.append(img_array)
+        return YoloResponse(is_relevant=True, frame_class="relevant", inference_time_ms=12.0)
+
+    monkeypatch.setattr(yolo_wrapper, "_detect_uncached", fake_detect)
+    return calls
+
+
+def test_near_duplicate_frame_reuses_previous_result(fake_yolo):
+    frame = _frame()
+    jitter = np.clip(frame.astype(np.int16) + 1, 0, 255).astype(np.uint8)
+
+    first = yolo_wrapper.detect_array(frame, 0.25, session_id="haltung-1")
+    second = yolo_wrapper.detect_array(jitter, 0.25, session_id="haltung-1")
+
+    assert len(fake_yolo) == 1
+    assert first.reused is False
+    assert second.reused is True
+    assert second.inference_time_ms == 0.0
+    assert second.frame_class == "relevant"
+
+
+def test_changed_scene_is_analysed_again(fake_yolo):
+    yolo_wrapper.detect_array(_frame(120, seed=0), 0.25, session_id="haltung-1")
+    response = yolo_wrapper.detect_array(_frame(60, seed=1), 0.25, session_id="haltung-1")
+
+    assert len(fake_yolo) == 2
+    assert response.reused is False
+
+
+def test_sessions_and_thresholds_are_isolated(fake_yolo):
+    frame = _frame()
+
+    yolo_wrapper.detect_array(frame, 0.25, session_id="a")
+    yolo_wrapper.detect_array(frame, 0.25, session_id="b")
+    yolo_wrapper.detect_array(frame, 0.5, session_id="a")
+    yolo_wrapper.detect_array(frame, 0.25)
+
+    assert len(fake_yolo) == 4
+
+
+def test_reuse_is_capped(fake_yolo, monkeypatch):
+    monkeypatch.setattr(settings, "dedup_max_reuse", 2, raising=False)
+    frame = _frame()
+
+    responses = [yolo_wrapper.detect_array(frame, 0.25, session_id="a") for _ in range(4)]
+
+    assert [r.reused for r in responses] == [False, True, True, False]
+
+
+def test_fingerprint_ignores_sensor_noise():
+    a = frame_dedup.fingerprint(_frame(120, seed=0))
+    b = frame_dedup.fingerprint(_frame(120, seed=1))
+
+    assert a.shape == (settings.dedup_thumbnail_size,) * 2
+    assert np.abs(a - b).mean() <= settings.dedup_max_mean_diff
@@ -7,6 +7,8 @@ verworfen werden, waehrend echtes Schwarz/Ueberbelichtung/Uniform weiter rausfae
 import numpy as np
 from PIL import Image
 
+from benchmarks.frame_quality_gate import legacy_is_frame_usable, reference_frames
+from sidecar.models import frame_quality
 from sidecar.models.yolo_wrapper import _is_frame_usable
 
 
@@ -40,3 +42,24 @@ def test_overexposed_frame_rejected():
 def test_uniform_frame_rejected():
     usable, reason = _is_frame_usable(_img(np.full((64, 64, 3), 100)))
     assert not usable and reason == "too_uniform"
+
+
+def test_sampled_gate_matches_full_resolution_reference():
+    # 481 Pixel lange Seite -> Schrittweite 3 bei sample_side=320
+    for name, frame in reference_frames(sizes=[(270, 481), (240, 320)]):
+        assert frame_quality.assess_frame(frame).reason == legacy_is_frame_usable(frame)[1], name
+
+
+def test_batch_variant_matches_single_frames():
+    frames = np.stack([frame for _, frame in reference_frames(sizes=[(90, 120)])])
+
+    batch = frame_quality.assess_frames(frames)
+
+    assert batch == [frame_quality.assess_frame(frame) for frame in frames]
+
+
+def test_grayscale_frames_are_accepted():
+    quality = frame_quality.assess_frame(_checkerboard(40, 90)[..., 0].astype(np.uint8))
+
+    assert quality.usable
+    assert quality.brightness == 65.0
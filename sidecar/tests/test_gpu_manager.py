@@ -0,0 +1,270 @@
+"""Tests fuer das VRAM-Budget im GpuModelManager (Fake-Groessen, keine GPU noetig)."""
+
+from sidecar.gpu_manager import GpuModelManager, ModelSlot
+
+_GB = 1024 ** 3
+
+
+class _FakeVram:
+    """Simuliert torch.cuda.memory_allocated: Loader und Mover buchen Bytes."""
+
+    def __init__(self):
+        self.allocated = 0
+
+    def probe(self, _device: str) -> int:
+        return self.allocated
+
+    def loader(self, size_gb: float):
+        def load():
+            model = _FakeModel(self, int(size_gb * _GB))
+            self.allocated += model.size
+            return model, None
+        return load
+
+    def move(self, model, device: str) -> None:
+        if device == "cpu":
+            self.allocated -= model.size
+        else:
+            self.allocated += model.size
+        model.device = device
+
+
+class _FakeModel:
+    def __init__(self, vram: _FakeVram, size: int):
+        self.vram = vram
+        self.size = size
+        self.device = "cuda:0"
+
+
+def _manager(vram: _FakeVram, budget_gb: float, **kwargs) -> GpuModelManager:
+    return GpuModelManager(
+        int(budget_gb * _GB),
+        memory_probe=vram.probe,
+        mover=vram.move,
+        **kwargs,
+    )
+
+
+def _load(manager, vram, slot, size_gb):
+    return manager.ensure_loaded(slot, "cuda:0", vram.loader(size_gb))
+
+
+def test_load_measures_slot_size():
+    vram = _FakeVram()
+    manager = _manager(vram, budget_gb=10)
+
+    state = _load(manager, vram, ModelSlot.DINO, 3)
+
+    assert state.size_bytes == 3 * _GB
+    assert manager.get_status()["loaded_models"]["dino"]["size_gb"] == 3.0
+
+
+def test_no_budget_keeps_everything_resident():
+    vram = _FakeVram()
+    manager = _manager(vram, budget_gb=0)
+
+    for slot in (ModelSlot.YOLO, ModelSlot.DINO, ModelSlot.SAM):
+        _load(manager, vram, slot, 4)
+
+    assert set(manager.get_status()["loaded_models"]) == {"yolo", "dino", "sam"}
+    assert manager.get_status()["vram_budget"]["evictions"] == {}
+
+
+def test_over_budget_unloads_least_recently_used_slot():
+    vram = _FakeVram()
+    manager = _manager(vram, budget_gb=5)
+    unloaded = []
+    manager.add_unload_hook(ModelSlot.YOLO, lambda: unloaded.append("yolo"))
+
+    _load(manager, vram, ModelSlot.YOLO, 2)
+    _load(manager, vram, ModelSlot.DINO, 2)
+    _load(manager, vram, ModelSlot.DINO, 2)  # DINO zuletzt benutzt
+    _load(manager, vram, ModelSlot.SAM, 2)
+
+    status = manager.get_status()
+    assert set(status["loaded_models"]) == {"dino", "sam"}
+    assert status["vram_budget"]["evictions"] == {"yolo": 1}
+    assert unloaded == ["yolo"]
+
+
+def test_known_size_evicts_before_reload():
+    vram = _FakeVram()
+    manager = _manager(vram, budget_gb=5)
+    _load(manager, vram, ModelSlot.SAM, 3)
+    _load(manager, vram, ModelSlot.DINO, 3)  # verdraengt SAM nach dem Laden
+    vram.allocated = 3 * _GB  # Allocator hat SAM freigegeben
+    loaded_during_load = []
+
+    def load_sam():
+        loaded_during_load.extend(manager.get_status()["loaded_models"])
+        return vram.loader(3)()
+
+    manager.ensure_loaded(ModelSlot.SAM, "cuda:0", load_sam)
+
+    # DINO wurde schon vor dem Laden verdraengt, weil die SAM-Groesse bekannt war
+    assert loaded_during_load == []
+
+
+def test_pinned_slot_is_never_evicted():
+    vram = _FakeVram()
+    manager = _manager(vram, budget_gb=5, pinned=["yolo"])
+
+    _load(manager, vram, ModelSlot.YOLO, 2)
+    _load(manager, vram, ModelSlot.DINO, 2)
+    _load(manager, vram, ModelSlot.SAM, 2)
+
+    loaded = manager.get_status()["loaded_models"]
+    assert "yolo" in loaded and loaded["yolo"]["pinned"] is True
+    assert "dino" not in loaded
+
+
+def test_busy_slot_is_not_evicted():
+    vram = _FakeVram()
+    manager = _manager(vram, budget_gb=3)
+    _load(manager, vram, ModelSlot.YOLO, 2)
+
+    with manager.in_use(ModelSlot.YOLO):
+        _load(manager, vram, ModelSlot.DINO, 2)
+        assert "yolo" in manager.get_status()["loaded_models"]
+
+    _load(manager, vram, ModelSlot.SAM, 2)
+    assert "yolo" not in manager.get_status()["loaded_models"]
+
+
+def test_offload_moves_to_cpu_and_restores_on_next_use():
+    vram = _FakeVram()
+    manager = _manager(vram, budget_gb=5, eviction_mode="offload")
+    loads = []
+
+    def load_yolo():
+        loads.append("yolo")
+        return vram.loader(3)()
+
+    yolo = manager.ensure_loaded(ModelSlot.YOLO, "cuda:0", load_yolo)
+    _load(manager, vram, ModelSlot.DINO, 3)
+
+    assert yolo.offloaded is True
+    assert yolo.model.device == "cpu"
+    assert manager.get_status()["loaded_models"]["yolo"]["offloaded"] is True
+
+    restored = manager.ensure_loaded(ModelSlot.YOLO, "cuda:0", load_yolo)
+
+    assert restored is yolo
+    assert restored.model.device == "cuda:0"
+    assert restored.offloaded is False
+    assert loads == ["yolo"]  # kein zweiter Ladevorgang
+    assert manager.get_status()["loaded_models"]["dino"]["offloaded"] is True
+
+
+def test_offload_runs_only_offload_hooks():
+    vram = _FakeVram()
+    manager = _manager(vram, budget_gb=5, eviction_mode="offload")
+    calls = []
+    manager.add_unload_hook(ModelSlot.YOLO, lambda: calls.append("cache"))
+    manager.add_unload_hook(ModelSlot.YOLO, lambda: calls.append("precision"), on_offload=False)
+
+    _load(manager, vram, ModelSlot.YOLO, 3)
+    _load(manager, vram, ModelSlot.DINO, 3)
+    assert calls == ["cache"]
+
+    manager.unload(ModelSlot.YOLO)
+    assert calls == ["cache", "cache", "precision"]
+
+
+def test_failed_offload_falls_back_to_unload():
+    vram = _FakeVram()
+
+    def broken_move(_model, _device):
+        raise RuntimeError("no host memory")
+
+    manager = GpuModelManager(
+        5 * _GB, eviction_mode="offload", memory_probe=vram.probe, mover=broken_move,
+    )
+    _load(manager, vram, ModelSlot.YOLO, 3)
+    _load(manager, vram, ModelSlot.DINO, 3)
+
+    assert "yolo" not in manager.get_status()["loaded_models"]
+    assert manager.get_status()["vram_budget"]["evictions"] == {"yolo": 1}
+
+
+def test_budget_ignored_for_cpu_slots():
+    vram = _FakeVram()
+    manager = _manager(vram, budget_gb=1)
+
+    manager.ensure_loaded(ModelSlot.YOLO, "cpu", vram.loader(2))
+    manager.ensure_loaded(ModelSlot.DINO, "cpu", vram.loader(2))
+
+    assert set(manager.get_status()["loaded_models"]) == {"yolo", "dino"}
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_idle_slot_is_unloaded_and_reloaded_on_next_use():
+    vram, clock = _FakeVram(), _FakeClock()
+    manager = _manager(vram, budget_gb=0, idle_timeouts={"sam": 60}, clock=clock)
+    unloaded = []
+    manager.add_unload_hook(ModelSlot.SAM, lambda: unloaded.append("sam"))
+    try:
+        _load(manager, vram, ModelSlot.SAM, 3)
+        _load(manager, vram, ModelSlot.YOLO, 1)  # ohne Timeout
+
+        clock.now += 30
+        assert manager.reap_idle() == []
+
+        clock.now += 31
+        assert manager.reap_idle() == [ModelSlot.SAM]
+        assert set(manager.get_status()["loaded_models"]) == {"yolo"}
+        assert unloaded == ["sam"]
+
+        _load(manager, vram, ModelSlot.SAM, 3)
+        idle = manager.get_status()["idle"]
+        assert idle["unloads"] == {"sam": 1}
+        assert idle["reloads"] == {"sam": 1}
+        assert idle["reaper_running"] is True
+    finally:
+        manager.stop_reaper()
+
+
+def test_use_resets_idle_timer_and_busy_slot_is_kept():
+    vram, clock = _FakeVram(), _FakeClock()
+    manager = _manager(vram, budget_gb=0, idle_timeouts={"dino": 60}, clock=clock)
+    try:
+        _load(manager, vram, ModelSlot.DINO, 2)
+        clock.now += 50
+        _load(manager, vram, ModelSlot.DINO, 2)  # Fast Path zaehlt als Nutzung
+        clock.now += 50
+        assert manager.reap_idle() == []
+
+        with manager.in_use(ModelSlot.DINO):
+            clock.now += 120
+            assert manager.reap_idle() == []
+        # Leerlauf zaehlt ab Ende der Inferenz
+        assert manager.reap_idle() == []
+    finally:
+        manager.stop_reaper()
+
+
+def test_pinned_slot_ignores_idle_timeout():
+    vram, clock = _FakeVram(), _FakeClock()
+    manager = _manager(vram, budget_gb=0, idle_timeouts={"yolo": 10}, pinned=["yolo"], clock=clock)
+
+    _load(manager, vram, ModelSlot.YOLO, 1)
+    clock.now += 100
+
+    assert manager.reap_idle() == []
+    assert manager.get_status()["idle"]["reaper_running"] is False
+
+
+def test_idle_timeouts_default_to_settings(monkeypatch):
+    from sidecar.config import settings
+
+    monkeypatch.setattr(settings, "sam_idle_timeout_sec", 900.0, raising=False)
+    manager = GpuModelManager()
+
+    assert manager.get_status()["idle"]["timeouts_sec"] == {"yolo": 0.0, "dino": 0.0, "sam": 900.0}
@@ -0,0 +1,89 @@
+"""Tests fuer den GPU-Metrik-Sampler (Fake-Quelle, keine GPU noetig)."""
+
+import time
+
+import pytest
+
+from sidecar import gpu_metrics
+from sidecar.config import settings
+from sidecar.gpu_metrics import GpuMetricsSampler, GpuSnapshot
+
+
+class _FakeSource:
+    name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    def sample(self):
+        self.calls += 1
+        return GpuSnapshot(
+            gpu_utilization_percent=40.0 + self.calls,
+            vram_allocated_gb=3.4,
+            vram_total_gb=24.0,
+            source=self.name,
+        )
+
+
+class _BrokenSource:
+    name = "broken"
+
+    def sample(self):
+        raise RuntimeError("driver gone")
+
+
+def test_snapshot_starts_sampler_and_returns_latest_values():
+    source = _FakeSource()
+    sampler = GpuMetricsSampler(source, interval_sec=0.01)
+    try:
+        sampler.snapshot()  # startet den Thread
+        deadline = time.monotonic() + 2.0
+        while sampler.snapshot().source != "fake" and time.monotonic() < deadline:
+            time.sleep(0.005)
+        snapshot = sampler.snapshot()
+    finally:
+        sampler.stop()
+
+    assert snapshot.source == "fake"
+    assert snapshot.vram_total_gb == 24.0
+    assert snapshot.sampled_at > 0
+
+
+def test_failed_sample_keeps_previous_snapshot():
+    sampler = GpuMetricsSampler(_FakeSource())
+    first = sampler.sample_now()
+
+    sampler._source = _BrokenSource()
+    assert sampler.sample_now() is first
+
+    assert sampler.status()["errors"] == 1
+    assert sampler.status()["gpu_utilization_percent"] == first.gpu_utilization_percent
+
+
+def test_disabled_sampler_does_not_start(monkeypatch):
+    monkeypatch.setattr(settings, "gpu_metrics_enabled", False, raising=False)
+    sampler = GpuMetricsSampler(_FakeSource())
+
+    sampler.snapshot()
+
+    assert sampler.status()["running"] is False
+
+
+def test_cpu_configuration_uses_null_source(monkeypatch):
+    monkeypatch.setattr(settings, "gpu_device", "cpu", raising=False)
+
+    assert isinstance(gpu_metrics.default_source(), gpu_metrics.NullSource)
+
+
+def test_yolo_telemetry_reads_snapshot(monkeypatch):
+    from sidecar.models import yolo_wrapper
+
+    snapshot = GpuSnapshot(gpu_utilization_percent=55.0, vram_allocated_gb=2.5, vram_total_gb=8.0)
+    monkeypatch.setattr(gpu_metrics, "get_snapshot", lambda: snapshot)
+    monkeypatch.setattr(yolo_wrapper, "_resolve_device", lambda: "cuda:0")
+
+    telemetry = yolo_wrapper._response_telemetry()
+
+    assert telemetry["gpu_utilization_percent"] == pytest.approx(55.0)
+    assert telemetry["vram_allocated_gb"] == 2.5
+    assert telemetry["vram_total_gb"] == 8.0
@@ -3,6 +3,7 @@
 import base64
 import io
 
+import numpy as np
 from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from PIL import Image
@@ -79,3 +80,71 @@ def test_yolo_detect_rejects_invalid_base64_with_400(monkeypatch):
     )
 
     assert resp.status_code == 400
+
+
+def _jpeg_bytes(width: int, height: int) -> bytes:
+    rng = np.random.default_rng(0)
+    img = Image.fromarray(rng.integers(0, 256, (height, width, 3), dtype=np.uint8))
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+def test_jpeg_is_decoded_at_smallest_covering_scale():
+    from sidecar.models.image_decode import decode_image_bytes, long_side_size, original_size
+
+    img = decode_image_bytes(
+        _jpeg_bytes(1600, 1200),
+        max_bytes=10 * 1024 * 1024,
+        max_pixels=10_000_000,
+        min_size=lambda w, h: long_side_size(w, h, 500),
+    )
+
+    # 1/4 -> 400 px < 500, also 1/2
+    assert img.size == (800, 600)
+    assert img.mode == "RGB"
+    assert original_size(img) == (1600, 1200)
+
+
+def test_reduced_decode_keeps_png_and_can_be_disabled(monkeypatch):
+    from sidecar.config import settings
+    from sidecar.models.image_decode import decode_image_bytes, long_side_size, original_size
+
+    def quarter(w, h):
+        return long_side_size(w, h, 100)
+
+    png = base64.b64decode(_png_base64(400, 300))
+    img = decode_image_bytes(png, max_bytes=1024 * 1024, max_pixels=1_000_000, min_size=quarter)
+    assert img.size == original_size(img) == (400, 300)
+
+    monkeypatch.setattr(settings, "reduced_decode_enabled", False, raising=False)
+    img = decode_image_bytes(_jpeg_bytes(400, 300), max_bytes=1024 * 1024, max_pixels=1_000_000, min_size=quarter)
+    assert img.size == original_size(img) == (400, 300)
+
+
+def test_yolo_boxes_are_mapped_back_to_original_resolution(monkeypatch):
+    from sidecar.batching import BatchOutcome
+    from sidecar.config import settings
+    from sidecar.models import yolo_wrapper
+    from sidecar.models.onnx_yolo import OnnxYoloResult
+
+    monkeypatch.setattr(settings, "yolo_imgsz", 400, raising=False)
+    seen = {}
+
+    def fake_run(item):
+        seen["shape"] = item[0].shape
+        result = OnnxYoloResult(
+            xyxy=np.array([[10.0, 20.0, 110.0, 220.0]], dtype=np.float32),
+            conf=np.array([0.9], dtype=np.float32),
+            cls=np.array([0]),
+            names={0: "crack"},
+        )
+        return BatchOutcome(value=result, queue_wait_ms=0.0, batch_size=1, batch_time_ms=1.0)
+
+    monkeypatch.setattr(yolo_wrapper._yolo_batcher, "run", fake_run)
+
+    response = yolo_wrapper.detect_bytes(_jpeg_bytes(1600, 1200), 0.25)
+
+    assert seen["shape"] == (300, 400, 3)
+    box = response.detections[0]
+    assert (box.x1, box.y1, box.x2, box.y2) == (40.0, 80.0, 440.0, 880.0)
@@ -0,0 +1,111 @@
+"""Tests fuer /images und die Wiederverwendung per image_id."""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from sidecar.cache import ByteBudgetLRU
+from sidecar.main import app
+from sidecar.models import image_store
+from sidecar.schemas.detection import DinoResponse, YoloResponse
+from sidecar.schemas.segmentation import SamResponse
+
+
+def _png_bytes(width: int = 20, height: int = 10) -> bytes:
+    rng = np.random.default_rng(width * height)
+    img = Image.fromarray(rng.integers(0, 255, size=(height, width, 3)).astype(np.uint8))
+    buf = io.BytesIO()
+    img.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def fresh_image_cache(monkeypatch):
+    monkeypatch.setattr(image_store, "_cache", ByteBudgetLRU(64 * 1024 * 1024))
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_upload_returns_content_hash_and_dimensions(client):
+    raw = _png_bytes()
+
+    first = client.post("/images", json={"image_base64": base64.b64encode(raw).decode()})
+    second = client.post(
+        "/images/binary", content=raw, headers={"content-type": "application/octet-stream"},
+    )
+
+    assert first.status_code == 200
+    data = first.json()
+    assert data["image_id"] == image_store.image_id_for(raw)
+    assert (data["width"], data["height"]) == (20, 10)
+    assert data["size_bytes"] == 20 * 10 * 3
+    assert data["already_cached"] is False
+    assert second.json()["image_id"] == data["image_id"]
+    assert second.json()["already_cached"] is True
+
+
+def test_yolo_dino_sam_reuse_the_same_decoded_array(client, monkeypatch):
+    from sidecar.models import dino_wrapper, sam_wrapper, yolo_wrapper
+
+    image_id = client.post("/images", json={
+        "image_base64": base64.b64encode(_png_bytes()).decode(),
+    }).json()["image_id"]
+    seen: list = []
+
+    def fake_yolo(img_array, confidence_threshold, session_id=None):
+        seen.append(img_array)
+        return YoloResponse(is_relevant=True)
+
+    def fake_dino(img_array, text_prompt, box_threshold, text_threshold):
+        seen.append(img_array)
+        return DinoResponse()
+
+    def fake_sam(img_array, bounding_boxes, pipe_diameter_mm=None, **_kwargs):
+        seen.append(img_array)
+        return SamResponse()
+
+    def no_decode(*_args, **_kwargs):
+        raise AssertionError("image_id path must not decode again")
+
+    monkeypatch.setattr(yolo_wrapper, "detect_array", fake_yolo)
+    monkeypatch.setattr(dino_wrapper, "detect_array", fake_dino)
+    monkeypatch.setattr(sam_wrapper, "segment_array", fake_sam)
+    monkeypatch.setattr(image_store, "decode_image_bytes", no_decode)
+
+    assert client.post("/detect/yolo", json={"image_id": image_id}).status_code == 200
+    assert client.post("/detect/dino", json={"image_id": image_id}).status_code == 200
+    assert client.post("/segment/sam", json={"image_id": image_id, "bounding_boxes": []}).status_code == 200
+
+    assert len(seen) == 3
+    assert seen[0] is seen[1] is seen[2]
+    assert not seen[0].flags.writeable
+
+
+def test_unknown_image_id_returns_404(client):
+    resp = client.post("/detect/yolo", json={"image_id": "does-not-exist"})
+
+    assert resp.status_code == 404
+
+
+def test_request_needs_exactly_one_image_source(client):
+    both = client.post("/detect/yolo", json={"image_base64": "x", "image_id": "y"})
+    neither = client.post("/detect/yolo", json={"confidence_threshold": 0.3})
+
+    assert both.status_code == 422
+    assert neither.status_code == 422
+
+
+def test_delete_image_drops_handle(client):
+    image_id = client.post("/images", json={
+        "image_base64": base64.b64encode(_png_bytes()).decode(),
+    }).json()["image_id"]
+
+    assert client.delete(f"/images/{image_id}").status_code == 204
+    assert client.delete(f"/images/{image_id}").status_code == 404
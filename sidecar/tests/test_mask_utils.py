@@ -0,0 +1,103 @@
+"""Tests fuer die vektorisierten Masken-Helfer."""
+
+import numpy as np
+import pytest
+
+from sidecar.models.mask_utils import (
+    MASK_ENCODINGS,
+    decode_mask,
+    encode_coco_rle,
+    encode_mask,
+    encode_rle,
+    mask_iou,
+    mask_statistics,
+)
+
+
+def _reference(mask: np.ndarray) -> dict:
+    ys, xs = np.where(mask)
+    return {
+        "area": int(mask.sum()),
+        "height": int(ys.max() - ys.min() + 1),
+        "width": int(xs.max() - xs.min() + 1),
+        "centroid_x": float(xs.mean()),
+        "centroid_y": float(ys.mean()),
+    }
+
+
+def test_mask_statistics_match_per_mask_reference():
+    rng = np.random.default_rng(7)
+    masks = rng.random((5, 30, 40)) > 0.8
+    masks[2] = False
+    masks[2, 3:9, 10:25] = True  # Rechteck
+
+    stats = mask_statistics(masks)
+
+    for index in range(len(masks)):
+        expected = _reference(masks[index])
+        assert stats.area[index] == expected["area"]
+        assert stats.height[index] == expected["height"]
+        assert stats.width[index] == expected["width"]
+        assert np.isclose(stats.centroid_x[index], expected["centroid_x"])
+        assert np.isclose(stats.centroid_y[index], expected["centroid_y"])
+
+
+def test_mask_statistics_handles_empty_masks():
+    masks = np.zeros((2, 4, 4), dtype=bool)
+    masks[1, 1, 2] = True
+
+    stats = mask_statistics(masks)
+
+    assert stats.area.tolist() == [0, 1]
+    assert (stats.x_min[1], stats.y_min[1]) == (2, 1)
+    assert (stats.width[1], stats.height[1]) == (1, 1)
+
+
+def test_legacy_rle_format_is_unchanged():
+    mask = np.array([[0, 1, 1], [1, 0, 0]], dtype=bool)
+
+    assert encode_rle(mask) == "0,1,3,2"
+
+
+def test_coco_rle_matches_known_counts_string():
+    # spaltenweise: 0 | 1 1 1 -> counts [1, 3]
+    assert encode_coco_rle(np.array([[0, 1], [1, 1]], dtype=bool)) == "13"
+
+
+@pytest.mark.parametrize("encoding", MASK_ENCODINGS)
+def test_mask_encodings_round_trip(encoding):
+    rng = np.random.default_rng(3)
+    masks = [rng.random((37, 53)) > 0.6, np.ones((5, 7), dtype=bool), np.zeros((4, 9), dtype=bool)]
+    big = np.zeros((300, 400), dtype=bool)
+    big[50:250, 10:390] = True  # lange Laeufe -> mehrere 5-Bit-Gruppen
+    masks.append(big)
+
+    for mask in masks:
+        decoded = decode_mask(encode_mask(mask, encoding), encoding, mask.shape)
+        assert np.array_equal(decoded, mask)
+
+
+def test_coco_rle_matches_pycocotools():
+    coco_mask = pytest.importorskip("pycocotools.mask")
+    rng = np.random.default_rng(11)
+
+    for _ in range(50):
+        h, w = rng.integers(1, 120, size=2)
+        mask = rng.random((h, w)) > rng.random()
+        expected = coco_mask.encode(np.asfortranarray(mask.astype(np.uint8)))["counts"].decode()
+        assert encode_coco_rle(mask) == expected
+
+
+def test_unknown_encoding_is_rejected():
+    with pytest.raises(ValueError):
+        encode_mask(np.zeros((2, 2), dtype=bool), "png")
+
+
+def test_mask_iou():
+    a = np.zeros((10, 10), dtype=bool)
+    b = np.zeros((10, 10), dtype=bool)
+    assert mask_iou(a, b) == 1.0
+
+    a[0:4, 0:5] = True   # 20 Pixel
+    b[2:6, 0:5] = True   # 20 Pixel, 10 davon gemeinsam
+    assert mask_iou(a, b) == pytest.approx(10 / 30)
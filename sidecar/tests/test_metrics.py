@@ -0,0 +1,92 @@
+"""Tests fuer die In-Process-Metriken und den Prometheus-Endpunkt /metrics."""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+from fastapi.testclient import TestClient
+
+from sidecar import metrics
+from sidecar.main import app
+from sidecar.metrics import Counter, Histogram
+from sidecar.models import yolo_wrapper
+
+
+@pytest.fixture(autouse=True)
+def _fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _black_png() -> str:
+    buf = io.BytesIO()
+    Image.fromarray(np.zeros((48, 64, 3), dtype=np.uint8)).save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def test_histogram_renders_cumulative_buckets_and_quantiles():
+    histogram = Histogram("demo_ms", "Demo", ("endpoint",), buckets=(10, 100))
+    for value in (5, 50, 50, 500):
+        histogram.observe(value, endpoint="/x")
+    metrics.REGISTRY.append(histogram)
+    try:
+        text = metrics.render()
+    finally:
+        metrics.REGISTRY.remove(histogram)
+
+    assert "# TYPE demo_ms histogram" in text
+    assert 'demo_ms_bucket{endpoint="/x",le="10"} 1' in text
+    assert 'demo_ms_bucket{endpoint="/x",le="100"} 3' in text
+    assert 'demo_ms_bucket{endpoint="/x",le="+Inf"} 4' in text
+    assert 'demo_ms_sum{endpoint="/x"} 605' in text
+    assert 'demo_ms_count{endpoint="/x"} 4' in text
+    assert histogram.quantile(0.5, endpoint="/x") == pytest.approx(55.0)
+    assert histogram.quantile(0.99, endpoint="/x") == 100  # +Inf-Bucket -> letzte Grenze
+
+
+def test_counter_rejects_wrong_labels():
+    counter = Counter("demo_total", "Demo", ("slot",))
+
+    with pytest.raises(ValueError):
+        counter.inc(frame_class="dark")
+
+
+def test_metrics_endpoint_reports_requests_stages_and_rejected_frames():
+    client = TestClient(app)
+    for _ in range(3):
+        assert client.post("/detect/yolo", json={"image_base64": _black_png()}).status_code == 200
+
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert 'sidecar_requests_total{endpoint="/detect/yolo",status="200"} 3' in text
+    assert 'sidecar_request_duration_seconds_count{endpoint="/detect/yolo"} 3' in text
+    assert 'sidecar_request_duration_seconds_bucket{endpoint="/detect/yolo",le="0.001"}' in text
+    assert 'sidecar_stage_duration_seconds_count{endpoint="/detect/yolo",stage="decode"} 3' in text
+    assert 'sidecar_stage_duration_seconds_count{endpoint="/detect/yolo",stage="quality"} 3' in text
+    assert metrics.rejected_frames.value(frame_class="too_dark") == 3
+    assert 'sidecar_cache_hits_total{cache="image_store"}' in text
+    latency = client.get("/health").json()["latency"]["endpoints"]["/detect/yolo"]
+    assert latency["count"] == 3
+    assert 0 < latency["p50_ms"] <= 60000
+
+
+def test_oom_recovery_is_counted(monkeypatch):
+    class OutOfMemoryError(RuntimeError):
+        pass
+
+    def boom(*_args, **_kwargs):
+        raise OutOfMemoryError("CUDA out of memory")
+
+    monkeypatch.setattr(yolo_wrapper, "detect", boom)
+
+    resp = TestClient(app, raise_server_exceptions=False).post("/detect/yolo", json={"image_base64": "x"})
+
+    assert resp.status_code == 503
+    assert metrics.oom_recoveries.value() == 1
+    assert metrics.requests_total.value(endpoint="/detect/yolo", status="503") == 1
@@ -0,0 +1,137 @@
+"""Tests fuer das ONNX-Runtime-CPU-Backend (winzige synthetische ONNX-Graphen)."""
+
+import numpy as np
+import pytest
+
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+
+from onnx import TensorProto, helper  # noqa: E402
+
+from sidecar.config import settings  # noqa: E402
+from sidecar.models import onnx_yolo, yolo_wrapper  # noqa: E402
+from sidecar.models.onnx_yolo import OnnxYoloModel, letterbox, nms  # noqa: E402
+
+
+def _constant_model(path, predictions: np.ndarray, size: int = 64, names="{0: 'crack', 1: 'root'}"):
+    """ONNX-Graph mit fester Ausgabe; die Eingabe geht mit Gewicht 0 ein (statische Form 1x3xSxS)."""
+    images = helper.make_tensor_value_info("images", TensorProto.FLOAT, [1, 3, size, size])
+    output = helper.make_tensor_value_info("output0", TensorProto.FLOAT, list(predictions.shape))
+    nodes = [
+        helper.make_node("ReduceMean", ["images"], ["mean"], keepdims=0),
+        helper.make_node("Mul", ["mean", "zero"], ["zeroed"]),
+        helper.make_node("Add", ["preds", "zeroed"], ["output0"]),
+    ]
+    initializers = [
+        helper.make_tensor("zero", TensorProto.FLOAT, [], [0.0]),
+        helper.make_tensor("preds", TensorProto.FLOAT, predictions.shape, predictions.flatten().tolist()),
+    ]
+    graph = helper.make_graph(nodes, "tiny_yolo", [images], [output], initializers)
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 9
+    helper.set_model_props(model, {"names": names, "stride": "32"})
+    onnx.save(model, str(path))
+    return path
+
+
+def _classic_head() -> np.ndarray:
+    # Spalten = Kandidaten (cx, cy, w, h, score_crack, score_root); Letterbox-Pixel 64x64
+    candidates = [
+        (32, 32, 20, 10, 0.9, 0.1),   # crack, behalten
+        (33, 32, 20, 10, 0.8, 0.1),   # crack, Duplikat -> NMS
+        (33, 32, 20, 10, 0.1, 0.7),   # root, gleiche Stelle, andere Klasse -> behalten
+        (10, 20, 4, 4, 0.1, 0.2),     # unter der Schwelle
+    ]
+    return np.asarray(candidates, dtype=np.float32).T[None]  # (1, 6, 4)
+
+
+def test_letterbox_matches_ultralytics_padding():
+    img = np.zeros((64, 128, 3), dtype=np.uint8)
+
+    padded, ratio, pad = letterbox(img, (64, 64))
+
+    assert padded.shape == (64, 64, 3)
+    assert ratio == 0.5
+    assert pad == (0, 16)
+    assert padded[0, 0, 0] == onnx_yolo.PAD_VALUE
+
+
+def test_nms_suppresses_overlaps():
+    boxes = np.array([[0, 0, 10, 10], [1, 0, 11, 10], [20, 20, 30, 30]], dtype=np.float32)
+    scores = np.array([0.9, 0.8, 0.5], dtype=np.float32)
+
+    assert nms(boxes, scores, 0.5).tolist() == [0, 2]
+
+
+def test_classic_head_decodes_and_maps_to_original_pixels(tmp_path):
+    model = OnnxYoloModel(_constant_model(tmp_path / "tiny.onnx", _classic_head()))
+    frame = np.zeros((64, 128, 3), dtype=np.uint8)  # Skalierung 0.5, 16 px Rand oben
+
+    (result,) = model.predict([frame], conf=0.25, imgsz=64)
+
+    assert result.cls.tolist() == [0, 1]
+    np.testing.assert_allclose(result.conf, [0.9, 0.7], rtol=1e-6)
+    # crack: Letterbox (22, 27, 42, 37) -> Original (44, 22, 84, 42)
+    np.testing.assert_allclose(result.xyxy[0], [44, 22, 84, 42], atol=1e-4)
+    assert result.names == {0: "crack", 1: "root"}
+
+
+def test_end_to_end_head_and_batched_frames(tmp_path):
+    rows = np.array([[[10, 10, 30, 30, 0.95, 1], [0, 0, 5, 5, 0.1, 0]]], dtype=np.float32)  # (1, 2, 6)
+    rows = np.repeat(rows, 4, axis=1)  # (1, 8, 6): mehr Zeilen als Spalten -> End-to-End-Kopf
+    model = OnnxYoloModel(_constant_model(tmp_path / "e2e.onnx", rows))
+    frames = [np.zeros((64, 64, 3), np.uint8), np.zeros((32, 32, 3), np.uint8)]
+
+    results = model.predict(frames, conf=0.5, imgsz=64)
+
+    assert [len(result.conf) for result in results] == [4, 4]
+    assert results[0].cls.tolist() == [1, 1, 1, 1]
+    np.testing.assert_allclose(results[1].xyxy[0], [5, 5, 15, 15], atol=1e-4)
+
+
+def test_session_uses_thread_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "onnx_intra_op_threads", 2, raising=False)
+    monkeypatch.setattr(settings, "onnx_graph_optimization", "basic", raising=False)
+
+    status = OnnxYoloModel(_constant_model(tmp_path / "tiny.onnx", _classic_head())).status()
+
+    assert status["intra_op_threads"] == 2
+    assert status["graph_optimization"] == "basic"
+    assert status["providers"] == ["CPUExecutionProvider"]
+
+
+def test_int8_quantized_copy_is_created(tmp_path, monkeypatch):
+    pytest.importorskip("onnxruntime.quantization")
+    monkeypatch.setattr(settings, "onnx_quantize_int8", True, raising=False)
+
+    model = OnnxYoloModel(_constant_model(tmp_path / "tiny.onnx", _classic_head()))
+
+    assert model.quantized is True
+    assert (tmp_path / "tiny.int8.onnx").exists()
+
+
+def test_yolo_wrapper_uses_onnxruntime_on_cpu(tmp_path, monkeypatch):
+    _constant_model(tmp_path / "sewer.onnx", _classic_head())
+    monkeypatch.setattr(settings, "models_dir", str(tmp_path), raising=False)
+    monkeypatch.setattr(settings, "yolo_model_name", "sewer.pt", raising=False)
+    monkeypatch.setattr(settings, "yolo_device", "cpu", raising=False)
+    monkeypatch.setattr(settings, "yolo_imgsz", 64, raising=False)
+    monkeypatch.setattr(yolo_wrapper, "_cpu_model", None)
+    monkeypatch.setattr(yolo_wrapper, "_resolved_model_path", None)
+
+    model = yolo_wrapper._get_yolo_model()
+    (result,) = yolo_wrapper._predict_many(model, [np.zeros((64, 128, 3), np.uint8)], 0.25)
+    detections = yolo_wrapper._detections_from_result(result)
+
+    assert isinstance(model, OnnxYoloModel)
+    assert [detection.class_name for detection in detections] == ["crack", "root"]
+    assert yolo_wrapper._response_telemetry()["model_backend"] == "onnxruntime"
+    assert yolo_wrapper.get_runtime_status()["onnxruntime"]["providers"] == ["CPUExecutionProvider"]
+
+
+def test_forced_onnxruntime_without_export_reports_missing_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "models_dir", str(tmp_path), raising=False)
+    monkeypatch.setattr(settings, "yolo_cpu_backend", "onnxruntime", raising=False)
+
+    with pytest.raises(FileNotFoundError):
+        yolo_wrapper._load_yolo_on("cpu")
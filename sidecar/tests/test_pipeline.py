@@ -39,8 +39,11 @@ def test_full_pipeline_health_then_yolo(client):
     assert isinstance(data["detections"], list)
 
 
-def test_training_export(client):
+def test_training_export(client, tmp_path, monkeypatch):
     """Smoke test: training export creates valid response."""
+    from sidecar.config import settings
+
+    monkeypatch.setattr(settings, "training_export_root", str(tmp_path), raising=False)
     img_b64 = _make_test_image(w=100, h=100)
     resp = client.post("/training/export-yolo", json={
         "samples": [
@@ -58,3 +61,4 @@ def test_training_export(client):
     data = resp.json()
     assert data["total_samples"] == 1
     assert len(data["classes_used"]) > 0
+    assert (tmp_path / "test_export_tmp" / "data.yaml").exists()
@@ -0,0 +1,129 @@
+"""Tests fuer die Praezisions-Modi (winziges SAM auf CPU, keine Gewichte noetig)."""
+
+import copy
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+build_sam = pytest.importorskip("segment_anything.build_sam")
+
+from sidecar.config import settings  # noqa: E402
+from sidecar.models import precision, sam_wrapper  # noqa: E402
+from sidecar.models.mask_utils import mask_iou  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _forget_active():
+    yield
+    precision.forget("sam")
+    precision.forget("dino")
+
+
+def _tiny_sam():
+    torch.manual_seed(0)
+    return build_sam._build_sam(
+        encoder_embed_dim=32,
+        encoder_depth=2,
+        encoder_num_heads=2,
+        encoder_global_attn_indexes=[1],
+    ).eval()
+
+
+def _masks(sam, frame, boxes):
+    from segment_anything import SamPredictor
+
+    predictor = SamPredictor(sam)
+    embedding = sam_wrapper._embed_images(predictor, [frame])[0]
+    sam_wrapper._use_embedding(predictor, embedding)
+    return embedding, sam_wrapper._predict_boxes(predictor, boxes)
+
+
+@pytest.mark.parametrize(
+    ("requested", "device", "expected"),
+    [
+        ("fp32", "cpu", "fp32"),
+        ("BF16", "cpu", "bf16"),
+        ("fp16", "cpu", "bf16"),
+        ("autocast", "cpu", "autocast"),
+        ("int4", "cuda:0", "fp32"),
+    ],
+)
+def test_resolve(requested, device, expected):
+    assert precision.resolve(requested, device) == expected
+
+
+def test_bf16_sam_on_cpu_matches_fp32_masks(monkeypatch):
+    frame = (np.random.default_rng(0).random((120, 160, 3)) * 255).astype(np.uint8)
+    boxes = [(10.0, 10.0, 80.0, 80.0), (60.0, 20.0, 150.0, 110.0)]
+    reference = _tiny_sam()
+    _, (ref_masks, ref_scores) = _masks(reference, frame, boxes)
+
+    monkeypatch.setattr(settings, "sam_precision", "bf16", raising=False)
+    sam = copy.deepcopy(reference)
+    assert precision.prepare_model("sam", sam, "cpu") == "bf16"
+    embedding, (masks, scores) = _masks(sam, frame, boxes)
+
+    assert next(sam.parameters()).dtype == torch.bfloat16
+    assert embedding.features.dtype == torch.bfloat16
+    assert scores.dtype == np.float32
+    for mask, ref_mask in zip(masks, ref_masks):
+        assert mask_iou(mask, ref_mask) > 0.9
+    np.testing.assert_allclose(scores, ref_scores, atol=0.05)
+
+
+def test_autocast_keeps_fp32_weights(monkeypatch):
+    monkeypatch.setattr(settings, "sam_precision", "autocast", raising=False)
+    sam = _tiny_sam()
+
+    precision.prepare_model("sam", sam, "cpu")
+
+    assert next(sam.parameters()).dtype == torch.float32
+    assert precision.active("sam") == "autocast"
+
+
+def test_offloaded_half_precision_slot_runs_after_restore(monkeypatch):
+    from sidecar.gpu_manager import ModelSlot, gpu_manager
+
+    frame = (np.random.default_rng(0).random((120, 160, 3)) * 255).astype(np.uint8)
+    boxes = [(10.0, 10.0, 80.0, 80.0)]
+    monkeypatch.setattr(settings, "sam_precision", "bf16", raising=False)
+    monkeypatch.setattr(gpu_manager, "eviction_mode", "offload")
+    monkeypatch.setattr(gpu_manager, "_mover", lambda model, device: model.to(device))
+
+    def load():
+        sam = _tiny_sam()
+        precision.prepare_model("sam", sam, "cpu")
+        return sam, None
+
+    try:
+        state = gpu_manager.ensure_loaded(ModelSlot.SAM, "cpu", load)
+        gpu_manager._evict(ModelSlot.SAM)
+        assert state.offloaded is True
+        assert precision.active("sam") == "bf16"
+
+        restored = gpu_manager.ensure_loaded(ModelSlot.SAM, "cpu", load)
+        assert restored is state and restored.offloaded is False
+        sam = restored.model
+        embedding, result = _masks(sam, frame, boxes)
+    finally:
+        gpu_manager.unload(ModelSlot.SAM)
+
+    assert next(sam.parameters()).dtype == torch.bfloat16
+    assert embedding.features.dtype == torch.bfloat16
+    assert result is not None and len(result[0]) == 1
+    assert precision.active("sam") is None
+
+
+def test_health_reports_precision(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from sidecar.main import app
+
+    monkeypatch.setattr(settings, "dino_precision", "fp16", raising=False)
+    precision.prepare_model("sam", _tiny_sam(), "cpu")
+
+    data = TestClient(app).get("/health").json()["precision"]
+
+    assert data["dino"] == {"configured": "fp16", "active": None}
+    assert data["sam"]["active"] == "fp32"
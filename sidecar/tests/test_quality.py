@@ -0,0 +1,94 @@
+"""Tests fuer /quality/check (reines Quality-Gate, ohne Modell/GPU-Manager)."""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from sidecar.main import app
+
+
+def _png(arr: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    Image.fromarray(arr.astype(np.uint8)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def _black() -> np.ndarray:
+    return np.zeros((48, 64, 3))
+
+
+def _textured() -> np.ndarray:
+    return np.random.default_rng(1).integers(40, 200, size=(48, 64, 3))
+
+
+@pytest.fixture
+def client(monkeypatch):
+    from sidecar.gpu_manager import gpu_manager
+
+    def no_model(*_args, **_kwargs):
+        raise AssertionError("quality check must not touch the GPU manager")
+
+    monkeypatch.setattr(gpu_manager, "ensure_loaded", no_model)
+    return TestClient(app)
+
+
+def test_quality_check_rejects_black_frame(client):
+    resp = client.post("/quality/check", json={"image_base64": base64.b64encode(_png(_black())).decode()})
+
+    assert resp.status_code == 200
+    assert resp.json()["usable"] is False
+    assert resp.json()["reason"] == "too_dark"
+
+
+def test_quality_check_binary_accepts_textured_frame(client):
+    resp = client.post(
+        "/quality/check/binary",
+        content=_png(_textured()),
+        headers={"content-type": "image/png"},
+    )
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["usable"] is True
+    assert data["reason"] == "ok"
+    assert data["edge_var"] > 0
+
+
+def test_quality_check_batch_keeps_input_order(client):
+    frames = [_textured(), _black(), np.full((48, 64, 3), 255)]
+    payload = {"images_base64": [base64.b64encode(_png(frame)).decode() for frame in frames]}
+
+    resp = client.post("/quality/check/batch", json=payload)
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert [result["reason"] for result in data["results"]] == ["ok", "too_dark", "too_bright"]
+    assert data["usable_count"] == 1
+
+
+def test_quality_check_batch_limit(client, monkeypatch):
+    from sidecar.config import settings
+
+    monkeypatch.setattr(settings, "quality_batch_max_frames", 1, raising=False)
+
+    resp = client.post("/quality/check/batch", json={"image_ids": ["a", "b"]})
+
+    assert resp.status_code == 413
+
+
+def test_rejected_yolo_frame_does_not_load_model(monkeypatch):
+    from sidecar.models import yolo_wrapper
+
+    def fail_load():
+        raise AssertionError("model must not load for rejected frames")
+
+    monkeypatch.setattr(yolo_wrapper, "_get_yolo_model", fail_load)
+
+    response = yolo_wrapper.detect_array(_black().astype(np.uint8), 0.25)
+
+    assert response.is_relevant is False
+    assert response.frame_class == "too_dark"
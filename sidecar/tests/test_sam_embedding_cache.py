@@ -0,0 +1,154 @@
+"""Tests fuer den SAM-Einbettungs-Cache (Fake-Predictor, kein torch/GPU noetig)."""
+
+import numpy as np
+import pytest
+
+from sidecar.cache import ByteBudgetLRU
+from sidecar.config import settings
+from sidecar.gpu_manager import SlotState
+from sidecar.models import sam_wrapper
+from sidecar.schemas.detection import BoundingBox
+
+
+class _FakeFeatures:
+    def numel(self):
+        return 256 * 64 * 64
+
+    def element_size(self):
+        return 4
+
+    def to(self, _device, copy=False):
+        return self
+
+    def clone(self):
+        return self
+
+
+class _FakePredictor:
+    device = "cpu"
+
+    def __init__(self):
+        self.features = None
+        self.is_image_set = False
+
+    def reset_image(self):
+        self.features = None
+        self.is_image_set = False
+
+
+def _fake_predict_boxes(predictor, boxes):
+    """Rechteck-Maske je Box (ersetzt den Maskendecoder)."""
+    assert predictor.is_image_set
+    if not boxes:
+        return None
+    masks = np.zeros((len(boxes), *predictor.original_size), dtype=bool)
+    for index, (x1, y1, x2, y2) in enumerate(boxes):
+        masks[index, int(y1):int(y2), int(x1):int(x2)] = True
+    return masks, np.full(len(boxes), 0.9)
+
+
+@pytest.fixture
+def fake_sam(monkeypatch):
+    predictor = _FakePredictor()
+    encoded: list[int] = []
+
+    def fake_embed(_predictor, images):
+        encoded.append(len(images))
+        return [
+            sam_wrapper._ImageEmbedding(_FakeFeatures(), img.shape[:2], (1024, 1024))
+            for img in images
+        ]
+
+    monkeypatch.setattr(sam_wrapper, "_embed_images", fake_embed)
+    monkeypatch.setattr(sam_wrapper, "_predict_boxes", _fake_predict_boxes)
+    monkeypatch.setattr(sam_wrapper, "_embedding_cache", ByteBudgetLRU(64 * 1024 * 1024))
+    monkeypatch.setattr(
+        sam_wrapper.gpu_manager,
+        "ensure_loaded",
+        lambda *_args, **_kwargs: SlotState(model=object(), processor=predictor, device="cpu"),
+    )
+    monkeypatch.setattr(settings, "batching_enabled", False, raising=False)
+    return encoded
+
+
+def _frame() -> np.ndarray:
+    return np.full((40, 60, 3), 120, dtype=np.uint8)
+
+
+def test_second_request_for_same_frame_skips_image_encoder(fake_sam):
+    box = [BoundingBox(x1=5, y1=5, x2=20, y2=15, label="crack")]
+    corrected = [BoundingBox(x1=6, y1=6, x2=25, y2=18, label="crack")]
+
+    first = sam_wrapper.segment_array(_frame(), box, frame_key="frame-1")
+    second = sam_wrapper.segment_array(_frame(), corrected, frame_key="frame-1")
+
+    assert fake_sam == [1]
+    assert first.embedding_cached is False
+    assert second.embedding_cached is True
+    assert second.masks[0].mask_area_pixels == 19 * 12
+    stats = sam_wrapper.get_embedding_cache_status()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_frame_key_defaults_to_array_content_hash(fake_sam):
+    sam_wrapper.segment_array(_frame(), [])
+    sam_wrapper.segment_array(_frame(), [])
+
+    other = _frame()
+    other[0, 0, 0] = 0
+    sam_wrapper.segment_array(other, [])
+
+    assert fake_sam == [1, 1]
+
+
+def test_disabled_cache_always_encodes(fake_sam, monkeypatch):
+    monkeypatch.setattr(settings, "sam_embedding_cache_max_bytes", 0, raising=False)
+
+    sam_wrapper.segment_array(_frame(), [], frame_key="frame-1")
+    sam_wrapper.segment_array(_frame(), [], frame_key="frame-1")
+
+    assert fake_sam == [1, 1]
+
+
+def test_cropped_compact_mask_encoding(fake_sam):
+    from sidecar.models.mask_utils import decode_mask
+
+    box = [BoundingBox(x1=5, y1=8, x2=20, y2=15, label="crack")]
+
+    result = sam_wrapper.segment_array(
+        _frame(), box, frame_key="frame-1", mask_encoding="bitpacked", crop_masks=True
+    )
+
+    mask = result.masks[0]
+    assert mask.mask_encoding == "bitpacked"
+    assert mask.mask_size == [7, 15]
+    assert mask.mask_offset == [5, 8]
+    assert decode_mask(mask.mask_rle, "bitpacked", mask.mask_size).all()
+
+
+def test_unloading_sam_clears_embedding_cache():
+    from sidecar.gpu_manager import GpuModelManager, ModelSlot
+
+    manager = GpuModelManager()
+    cache = ByteBudgetLRU(1024)
+    manager.add_unload_hook(ModelSlot.SAM, cache.clear)
+    cache.put("frame", object(), 10)
+    manager.ensure_loaded(ModelSlot.SAM, "cpu", lambda: (object(), object()))
+
+    manager.unload(ModelSlot.SAM)
+
+    assert len(cache) == 0
+
+
+def test_cached_embedding_does_not_keep_the_batch_alive(monkeypatch):
+    torch = pytest.importorskip("torch")
+    monkeypatch.setattr(sam_wrapper, "_embedding_cache", ByteBudgetLRU(64 * 1024 * 1024))
+    batch = torch.zeros(4, 256, 64, 64)
+    embedding = sam_wrapper._ImageEmbedding(batch[1:2], (40, 60), (1024, 1024))
+
+    sam_wrapper._cache_embedding("frame-1", embedding)
+
+    cached = sam_wrapper._embedding_cache.get("frame-1").features
+    assert cached.untyped_storage().data_ptr() != batch.untyped_storage().data_ptr()
+    assert cached.untyped_storage().nbytes() == sam_wrapper._embedding_size_bytes(embedding)
@@ -0,0 +1,64 @@
+"""Tests fuer die Box-Prompts des SAM-Maskendecoders (Fake-Predictor, keine Gewichte noetig)."""
+
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from sidecar.config import settings  # noqa: E402
+from sidecar.models import sam_wrapper  # noqa: E402
+
+
+class _FakeTransform:
+    def apply_boxes_torch(self, boxes, _original_size):
+        return boxes
+
+
+class _FakePredictor:
+    """Rechteck-Maske je Box; Aufrufe mit mehr als *max_boxes* Boxen oder mit *broken* schlagen fehl."""
+
+    device = "cpu"
+    original_size = (40, 60)
+
+    def __init__(self, max_boxes=64, broken=()):
+        self.transform = _FakeTransform()
+        self.max_boxes = max_boxes
+        self.broken = set(broken)
+        self.calls: list[int] = []
+
+    def predict_torch(self, point_coords, point_labels, boxes, multimask_output):
+        self.calls.append(len(boxes))
+        if len(boxes) > self.max_boxes:
+            raise RuntimeError("CUDA out of memory")
+        masks = torch.zeros((len(boxes), 1, *self.original_size), dtype=torch.bool)
+        for index, (x1, y1, x2, y2) in enumerate(boxes.tolist()):
+            if x1 in self.broken:
+                raise RuntimeError("decoder failed")
+            masks[index, 0, int(y1):int(y2), int(x1):int(x2)] = True
+        return masks, torch.full((len(boxes), 1), 0.9), None
+
+
+def _boxes(count):
+    return [(float(i), 0.0, float(i) + 10.0, 10.0) for i in range(count)]
+
+
+def test_boxes_are_split_into_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "sam_max_boxes_per_call", 4, raising=False)
+    predictor = _FakePredictor()
+
+    masks, scores = sam_wrapper._predict_boxes(predictor, _boxes(10))
+
+    assert predictor.calls == [4, 4, 2]
+    assert masks.shape == (10, 40, 60)
+    assert [int(mask.sum()) for mask in masks] == [100] * 10
+    assert scores.shape == (10,)
+
+
+def test_failed_chunk_falls_back_to_single_boxes(monkeypatch):
+    monkeypatch.setattr(settings, "sam_max_boxes_per_call", 8, raising=False)
+    predictor = _FakePredictor(max_boxes=2, broken={3.0})
+
+    masks, scores = sam_wrapper._predict_boxes(predictor, _boxes(5))
+
+    assert predictor.calls == [5, 1, 1, 1, 1, 1]
+    assert [int(mask.sum()) for mask in masks] == [100, 100, 100, 0, 100]
+    assert scores.tolist() == pytest.approx([0.9, 0.9, 0.9, 0.0, 0.9])
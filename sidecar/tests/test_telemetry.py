@@ -4,6 +4,7 @@ from fastapi.testclient import TestClient
 
 
 def test_detect_yolo_writes_telemetry_jsonl(tmp_path, monkeypatch):
+    from sidecar import telemetry
     from sidecar.config import settings
     from sidecar.main import app
     from sidecar.routes import yolo as yolo_route
@@ -12,7 +13,7 @@ def test_detect_yolo_writes_telemetry_jsonl(tmp_path, monkeypatch):
     monkeypatch.setattr(settings, "telemetry_enabled", True, raising=False)
     monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
 
-    def fake_detect(image_base64: str, confidence_threshold: float) -> YoloResponse:
+    def fake_detect(image_base64: str, confidence_threshold: float, session_id=None) -> YoloResponse:
         assert image_base64 == "test-image"
         assert confidence_threshold == 0.7
         return YoloResponse(
@@ -50,6 +51,7 @@ def test_detect_yolo_writes_telemetry_jsonl(tmp_path, monkeypatch):
     )
 
     assert response.status_code == 200
+    telemetry.flush()
 
     telemetry_path = tmp_path / "sidecar.jsonl"
     lines = telemetry_path.read_text(encoding="utf-8").splitlines()
@@ -65,3 +67,202 @@ def test_detect_yolo_writes_telemetry_jsonl(tmp_path, monkeypatch):
     assert event["vram_total_gb"] == 31.5
     assert event["detection_count"] == 1
     assert event["confidence_threshold"] == 0.7
+
+
+def _event(index: int) -> dict:
+    return {"event": "yolo_detect", "index": index, "padding": "x" * 40}
+
+
+def test_full_queue_drops_instead_of_blocking(tmp_path, monkeypatch):
+    from sidecar.config import settings
+    from sidecar.telemetry import TelemetryWriter
+
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
+    writer = TelemetryWriter(queue_size=2, autostart=False)
+
+    accepted = [writer.enqueue(_event(i)) for i in range(5)]
+    writer.flush()
+
+    assert accepted == [True, True, False, False, False]
+    assert writer.status()["dropped"] == 3
+    assert len((tmp_path / "sidecar.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_background_writer_batches_events(tmp_path, monkeypatch):
+    from sidecar.config import settings
+    from sidecar.telemetry import TelemetryWriter
+
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
+    writer = TelemetryWriter(queue_size=100, flush_interval_sec=0.05, flush_batch=10)
+
+    for i in range(25):
+        writer.enqueue(_event(i))
+    assert writer.flush()
+    writer.stop()
+
+    lines = (tmp_path / "sidecar.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["index"] for line in lines] == list(range(25))
+    assert writer.status()["written"] == 25
+    assert writer.status()["batches"] < 25
+
+
+def test_rotation_by_size_compresses_and_prunes(tmp_path, monkeypatch):
+    import gzip
+
+    from sidecar.config import settings
+    from sidecar.telemetry import TelemetryWriter, rotated_files
+
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
+    monkeypatch.setattr(settings, "telemetry_rotate_mb", 100 / 1024 ** 2, raising=False)  # 100 Bytes
+    monkeypatch.setattr(settings, "telemetry_keep_rotated", 2, raising=False)
+    writer = TelemetryWriter(queue_size=100, autostart=False)
+
+    for i in range(4):
+        writer.enqueue(_event(i))
+        writer.enqueue(_event(i))
+        writer.flush()
+
+    rotated = rotated_files(tmp_path / "sidecar.jsonl")
+    assert len(rotated) == 2
+    assert all(path.suffix == ".gz" for path in rotated)
+    assert writer.status()["rotations"] == 3
+    with gzip.open(rotated[-1], "rt", encoding="utf-8") as handle:
+        assert [json.loads(line)["index"] for line in handle] == [2, 2]
+
+
+def test_rotation_on_new_day(tmp_path, monkeypatch):
+    import os
+    import time
+
+    from sidecar.config import settings
+    from sidecar.telemetry import TelemetryWriter, rotated_files
+
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
+    monkeypatch.setattr(settings, "telemetry_compress_rotated", False, raising=False)
+    path = tmp_path / "sidecar.jsonl"
+    path.write_text(json.dumps(_event(0)) + "\n", encoding="utf-8")
+    yesterday = time.time() - 86400
+    os.utime(path, (yesterday, yesterday))
+    writer = TelemetryWriter(queue_size=10, autostart=False)
+
+    writer.enqueue(_event(1))
+    writer.flush()
+
+    (rotated,) = rotated_files(path)
+    assert rotated.suffix == ".jsonl"
+    assert json.loads(path.read_text(encoding="utf-8"))["index"] == 1
+
+
+def test_sam_route_writes_typed_event_with_stages(tmp_path, monkeypatch):
+    import time
+
+    from sidecar import telemetry, timing
+    from sidecar.config import settings
+    from sidecar.main import app
+    from sidecar.routes import sam as sam_route
+    from sidecar.schemas.segmentation import MaskResult, SamResponse
+
+    monkeypatch.setattr(settings, "telemetry_enabled", True, raising=False)
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
+
+    def fake_segment(image_base64, bounding_boxes, pipe_diameter_mm=None, *, mask_encoding, crop_masks):
+        with timing.stage("decode"):
+            time.sleep(0.002)
+        with timing.stage("model"):
+            time.sleep(0.005)
+        return SamResponse(masks=[MaskResult(label="crack")], embedding_cached=True, precision="bf16")
+
+    monkeypatch.setattr(sam_route.sam_wrapper, "segment", fake_segment)
+
+    response = TestClient(app).post("/segment/sam", json={
+        "image_base64": "test-image",
+        "bounding_boxes": [{"x1": 0, "y1": 0, "x2": 5, "y2": 5}, {"x1": 1, "y1": 1, "x2": 4, "y2": 4}],
+        "mask_encoding": "bitpacked",
+    })
+    assert response.status_code == 200
+    telemetry.flush()
+
+    (line,) = (tmp_path / "sidecar.jsonl").read_text(encoding="utf-8").splitlines()
+    event = json.loads(line)
+    assert event["event"] == "sam_segment"
+    assert event["endpoint"] == "/segment/sam"
+    assert event["status_code"] == 200
+    assert event["decode_ms"] >= 1.5
+    assert event["model_ms"] >= 4
+    assert event["total_ms"] >= event["model_ms"]
+    assert event["request_bytes"] > 0
+    assert event["response_bytes"] == len(response.content)
+    assert event["box_count"] == 2
+    assert event["mask_count"] == 1
+    assert event["mask_encoding"] == "bitpacked"
+    assert event["embedding_cached"] is True
+    assert event["precision"] == "bf16"
+
+
+def test_rejected_request_is_recorded_with_status(tmp_path, monkeypatch):
+    from sidecar import telemetry
+    from sidecar.config import settings
+    from sidecar.main import app
+
+    monkeypatch.setattr(settings, "telemetry_enabled", True, raising=False)
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
+    monkeypatch.setattr(settings, "dino_batch_max_frames", 1, raising=False)
+
+    response = TestClient(app).post("/detect/dino/batch", json={"images_base64": ["a", "b"]})
+    assert response.status_code == 413
+    telemetry.flush()
+
+    event = json.loads((tmp_path / "sidecar.jsonl").read_text(encoding="utf-8"))
+    assert event["event"] == "dino_detect_batch"
+    assert event["status_code"] == 413
+
+
+def test_yolo_batch_route_writes_one_aggregated_event(tmp_path, monkeypatch):
+    import base64
+    import io
+
+    import numpy as np
+    from PIL import Image
+
+    from sidecar import telemetry
+    from sidecar.config import settings
+    from sidecar.main import app
+    from sidecar.models import yolo_wrapper
+    from sidecar.models.onnx_yolo import OnnxYoloResult
+
+    monkeypatch.setattr(settings, "telemetry_enabled", True, raising=False)
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
+    monkeypatch.setattr(yolo_wrapper, "_get_yolo_model", lambda: object())
+    monkeypatch.setattr(yolo_wrapper, "_using_custom_weights", True)
+
+    def fake_predict_many(model, arrays, confidence_threshold):
+        box = OnnxYoloResult(
+            xyxy=np.array([[1.0, 2.0, 3.0, 4.0]], dtype=np.float32),
+            conf=np.array([0.9], dtype=np.float32),
+            cls=np.array([0]),
+            names={0: "crack"},
+        )
+        return [box for _ in arrays]
+
+    monkeypatch.setattr(yolo_wrapper, "_predict_many", fake_predict_many)
+
+    def encode(arr: np.ndarray) -> str:
+        buf = io.BytesIO()
+        Image.fromarray(arr).save(buf, format="PNG")
+        return base64.b64encode(buf.getvalue()).decode()
+
+    rng = np.random.default_rng(0)
+    textured = [rng.integers(0, 256, (48, 64, 3), dtype=np.uint8) for _ in range(2)]
+    images = [encode(textured[0]), encode(np.zeros((48, 64, 3), np.uint8)), encode(textured[1])]
+
+    response = TestClient(app).post("/detect/yolo/batch", json={"images_base64": images})
+    assert response.status_code == 200
+    telemetry.flush()
+
+    (line,) = (tmp_path / "sidecar.jsonl").read_text(encoding="utf-8").splitlines()
+    event = json.loads(line)
+    results = response.json()["results"]
+    assert event["event"] == "yolo_detect_batch"
+    assert event["frame_count"] == len(images)
+    assert event["detection_count"] == sum(len(result["detections"]) for result in results) == 2
+    assert event["is_relevant"] is any(result["is_relevant"] for result in results) is True
@@ -0,0 +1,88 @@
+"""Tests fuer den Telemetrie-Bericht (python -m sidecar.telemetry_report)."""
+
+import gzip
+import json
+
+from sidecar import telemetry_report
+from sidecar.schemas.telemetry import SamSegmentEvent, YoloDetectEvent
+from sidecar.telemetry_report import TelemetryReport
+
+
+def _yolo(hour: int, total_ms: float, **fields) -> str:
+    defaults = {"is_relevant": True, "vram_allocated_gb": 1.5, "vram_total_gb": 8.0}
+    event = YoloDetectEvent(
+        timestamp_utc=f"2026-10-17T{hour:02d}:15:00+00:00",
+        event="yolo_detect",
+        endpoint="/detect/yolo",
+        total_ms=total_ms,
+        queue_ms=2.0,
+        model_ms=total_ms / 2,
+        model_name="best.pt",
+        backend="pytorch",
+        device="cuda",
+        **{**defaults, **fields},
+    )
+    return event.model_dump_json()
+
+
+def _write_logs(directory):
+    directory.mkdir()
+    rotated = [_yolo(8, 10.0 + i) for i in range(99)] + [_yolo(8, 900.0, vram_allocated_gb=3.25)]
+    with gzip.open(directory / "sidecar-20261017T090000000000.jsonl.gz", "wt", encoding="utf-8") as handle:
+        handle.write("\n".join(rotated) + "\n")
+    current = [
+        _yolo(9, 20.0, is_relevant=False, frame_class="too_dark"),
+        SamSegmentEvent(
+            timestamp_utc="2026-10-17T09:20:00+00:00", event="sam_segment", endpoint="/segment/sam",
+            status_code=503, total_ms=1200.0, precision="fp16",
+        ).model_dump_json(),
+        # Zeile aus einer Version vor den Stufenzeiten
+        json.dumps({"timestamp_utc": "2026-10-17T09:30:00+00:00", "event": "yolo_detect", "backend": "pytorch",
+                    "device": "cuda", "model_name": "best.pt", "roundtrip_ms": 30.0, "queue_wait_ms": 4.0}),
+        "{truncated",
+    ]
+    (directory / "sidecar.jsonl").write_text("\n".join(current) + "\n", encoding="utf-8")
+
+
+def test_report_reads_rotated_and_current_files(tmp_path):
+    _write_logs(tmp_path / "laptop")
+
+    data = TelemetryReport().read([tmp_path / "laptop"]).to_dict()
+
+    assert [name.rsplit("/", 1)[-1] for name in data["files"]] == [
+        "sidecar-20261017T090000000000.jsonl.gz", "sidecar.jsonl",
+    ]
+    assert data["events"] == 103
+    assert data["malformed_lines"] == 1
+    assert data["throughput_per_hour"] == [
+        {"hour_utc": "2026-10-17T08:00Z", "requests": 100, "frames": 100, "errors": 0},
+        {"hour_utc": "2026-10-17T09:00Z", "requests": 3, "frames": 3, "errors": 1},
+    ]
+
+    yolo = next(row for row in data["latency"] if row["event"] == "yolo_detect")
+    assert (yolo["backend"], yolo["device"], yolo["model"], yolo["requests"]) == ("pytorch", "cuda", "best.pt", 102)
+    assert 55 <= yolo["p50_ms"] <= 65
+    assert yolo["p99_ms"] <= yolo["max_ms"] == 900.0
+    sam = next(row for row in data["latency"] if row["event"] == "sam_segment")
+    assert (sam["model"], sam["errors"]) == ("fp16", 1)
+
+    queue = next(row for row in data["queue_wait"] if row["event"] == "yolo_detect")
+    assert queue["max_ms"] == 4.0
+    assert data["relevance"]["judged_frames"] == 101
+    assert data["relevance"]["rejected_by_frame_class"] == {"too_dark": 1}
+    assert data["vram_high_water"][0]["max_allocated_gb"] == 3.25
+    assert data["vram_high_water"][0]["at"].startswith("2026-10-17T08")
+
+
+def test_cli_writes_json_and_markdown(tmp_path):
+    _write_logs(tmp_path / "laptop")
+    json_path, markdown_path = tmp_path / "report.json", tmp_path / "report.md"
+
+    assert telemetry_report.main([str(tmp_path / "laptop"), "--format", "json", "--output", str(json_path)]) == 0
+    assert telemetry_report.main([str(tmp_path / "laptop"), "--output", str(markdown_path)]) == 0
+    assert telemetry_report.main([str(tmp_path / "missing")]) == 2
+
+    assert json.loads(json_path.read_text(encoding="utf-8"))["events"] == 103
+    markdown = markdown_path.read_text(encoding="utf-8")
+    assert "## Throughput per hour" in markdown
+    assert "| yolo_detect | pytorch | cuda | best.pt | 102 |" in markdown
@@ -0,0 +1,73 @@
+"""Tests fuer den Timing-Kontext (Stufenzeiten ueber Executor- und Batcher-Threads)."""
+
+import asyncio
+import time
+
+from sidecar import timing
+from sidecar.batching import MicroBatcher
+from sidecar.executors import SlotExecutor
+from sidecar.gpu_manager import ModelSlot
+
+
+def test_stage_without_open_timing_is_a_noop():
+    with timing.stage("model"):
+        pass
+    timing.annotate(detection_count=3)
+
+    assert timing.current() is None
+
+
+def test_stages_accumulate_and_track_restores_context():
+    with timing.track("/detect/yolo", request_bytes=10) as request_timing:
+        for _ in range(2):
+            with timing.stage("decode"):
+                time.sleep(0.002)
+        timing.annotate(detection_count=3)
+        assert timing.current() is request_timing
+
+    assert timing.current() is None
+    assert request_timing.stages_ms["decode"] >= 4
+    assert request_timing.fields == {"detection_count": 3}
+
+
+def test_executor_threads_record_into_caller_timing():
+    executor = SlotExecutor("test", max_workers=1, max_queue=0)
+
+    def work():
+        with timing.stage("model"):
+            time.sleep(0.005)
+        return "done"
+
+    async def main():
+        with timing.track("/segment/sam") as request_timing:
+            result = await executor.run(work)
+        return result, request_timing
+
+    try:
+        result, request_timing = asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+    assert result == "done"
+    assert request_timing.stages_ms["model"] >= 4
+    assert "queue" in request_timing.stages_ms
+    assert request_timing.handler_done is not None
+
+
+def test_batch_stages_are_handed_to_every_caller():
+    def run_batch(items):
+        with timing.stage("model"):
+            time.sleep(0.005)
+        return items
+
+    batcher = MicroBatcher(ModelSlot.YOLO, run_batch, window_ms=0, max_batch_size=1)
+    try:
+        with timing.track("/detect/yolo") as request_timing:
+            outcome = batcher.run(7)
+    finally:
+        batcher.shutdown()
+
+    assert outcome.value == 7
+    assert outcome.stages_ms["model"] >= 4
+    assert request_timing.stages_ms["model"] == outcome.stages_ms["model"]
+    assert request_timing.stages_ms["queue"] == outcome.queue_wait_ms
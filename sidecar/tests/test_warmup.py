@@ -0,0 +1,82 @@
+"""Tests fuer das parallele Vorladen der Modell-Slots beim Start (Fake-Loader)."""
+
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from sidecar import warmup
+from sidecar.config import settings
+from sidecar.gpu_manager import ModelSlot
+from sidecar.models import dino_wrapper, sam_wrapper, yolo_wrapper
+
+
+@pytest.fixture(autouse=True)
+def _clean_state():
+    warmup.reset()
+    yield
+    warmup.reset()
+
+
+def test_configured_slots_parses_and_skips_unknown(monkeypatch):
+    monkeypatch.setattr(settings, "preload_models", " SAM, yolo,bogus,yolo ", raising=False)
+
+    assert warmup.configured_slots() == [ModelSlot.SAM, ModelSlot.YOLO]
+
+
+def test_slots_load_concurrently(monkeypatch):
+    barrier = threading.Barrier(2, timeout=5)
+    monkeypatch.setattr(yolo_wrapper, "preload", barrier.wait)
+    monkeypatch.setattr(dino_wrapper, "preload", barrier.wait)
+
+    warmup.start([ModelSlot.YOLO, ModelSlot.DINO])
+    assert warmup.wait(timeout=5)
+
+    status = warmup.get_status()
+    # nur wenn beide gleichzeitig laufen, passieren sie die Barriere
+    assert status["slots"]["yolo"]["state"] == warmup.READY
+    assert status["slots"]["dino"]["state"] == warmup.READY
+    assert status["slots"]["sam"]["state"] == warmup.NOT_REQUESTED
+    assert status["ready"] is True
+    assert status["preload_time_sec"] is not None
+
+
+def test_loading_slot_is_not_ready_and_failure_is_reported(monkeypatch):
+    release = threading.Event()
+
+    def slow_yolo():
+        release.wait(5)
+
+    def broken_sam():
+        raise FileNotFoundError("SAM weights not found")
+
+    monkeypatch.setattr(yolo_wrapper, "preload", slow_yolo)
+    monkeypatch.setattr(sam_wrapper, "preload", broken_sam)
+
+    warmup.start([ModelSlot.YOLO, ModelSlot.SAM])
+    try:
+        assert warmup.get_status()["ready"] is False
+    finally:
+        release.set()
+    warmup.wait(timeout=5)
+
+    status = warmup.get_status()
+    assert status["ready"] is True
+    assert status["slots"]["sam"]["state"] == warmup.FAILED
+    assert "SAM weights" in status["slots"]["sam"]["error"]
+
+
+def test_lifespan_starts_preload_and_health_reports_it(monkeypatch):
+    from sidecar.main import app
+
+    loaded = []
+    monkeypatch.setattr(settings, "preload_models", "yolo", raising=False)
+    monkeypatch.setattr(yolo_wrapper, "preload", lambda: loaded.append("yolo"))
+
+    with TestClient(app) as client:
+        warmup.wait(timeout=5)
+        data = client.get("/health").json()
+
+    assert loaded == ["yolo"]
+    assert data["warmup"]["slots"]["yolo"]["state"] == "ready"
+    assert data["warmup"]["startup_time_sec"] is not None
@@ -0,0 +1,139 @@
+"""Tests fuer den gebuendelten YOLO-Endpunkt /detect/yolo/batch."""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+from fastapi.testclient import TestClient
+
+from sidecar.config import settings
+from sidecar.main import app
+from sidecar.models import yolo_wrapper
+
+
+def _encode(arr: np.ndarray) -> str:
+    buf = io.BytesIO()
+    Image.fromarray(arr.astype(np.uint8)).save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def _textured(seed: int, h: int = 48, w: int = 64) -> str:
+    rng = np.random.default_rng(seed)
+    return _encode(rng.integers(30, 220, size=(h, w, 3)))
+
+
+def _black(h: int = 48, w: int = 64) -> str:
+    return _encode(np.zeros((h, w, 3)))
+
+
+class _FakeTensor:
+    def __init__(self, values):
+        self._values = np.asarray(values, dtype=np.float32)
+
+    def __getitem__(self, index):
+        return _FakeTensor(self._values[index])
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self._values
+
+    def item(self):
+        return float(self._values)
+
+
+class _FakeBox:
+    def __init__(self, xyxy, cls_id, conf):
+        self.xyxy = _FakeTensor([xyxy])
+        self.cls = _FakeTensor([cls_id])
+        self.conf = _FakeTensor([conf])
+
+
+class _FakeResult:
+    def __init__(self, boxes):
+        self.boxes = boxes
+        self.names = {0: "crack"}
+
+
+class _FakeModel:
+    def __init__(self):
+        self.calls: list[dict] = []
+
+    def predict(self, source, conf, imgsz, verbose):
+        self.calls.append({"source": source, "conf": conf, "imgsz": imgsz})
+        # x2 = Batch-Position + 1 -> Zuordnung zum Eingabe-Frame pruefbar
+        return [
+            _FakeResult([_FakeBox([0, 0, float(position + 1), 4], 0, 0.9)])
+            for position, _ in enumerate(source)
+        ]
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    model = _FakeModel()
+    monkeypatch.setattr(yolo_wrapper, "_get_yolo_model", lambda: model)
+    monkeypatch.setattr(yolo_wrapper, "_using_custom_weights", True)
+    return model
+
+
+def test_detect_batch_runs_single_predict_for_usable_frames(fake_model):
+    frames = [_textured(1), _black(), _textured(2)]
+
+    response = yolo_wrapper.detect_batch(frames, confidence_threshold=0.4)
+
+    assert len(fake_model.calls) == 1
+    assert len(fake_model.calls[0]["source"]) == 2
+    assert fake_model.calls[0]["conf"] == 0.4
+    assert response.frame_count == 3
+    assert response.inferred_count == 2
+    assert [r.frame_class for r in response.results] == ["relevant", "too_dark", "relevant"]
+    # Batch-Position 0 -> Frame 0, Batch-Position 1 -> Frame 2
+    assert response.results[0].detections[0].x2 == 1.0
+    assert response.results[2].detections[0].x2 == 2.0
+    assert response.results[1].detections == []
+
+
+def test_detect_batch_skips_model_when_all_frames_rejected(monkeypatch):
+    def fail_load():
+        raise AssertionError("model must not be loaded")
+
+    monkeypatch.setattr(yolo_wrapper, "_get_yolo_model", fail_load)
+
+    response = yolo_wrapper.detect_batch([_black(), _black()], confidence_threshold=0.25)
+
+    assert response.inferred_count == 0
+    assert all(not r.is_relevant for r in response.results)
+
+
+def test_detect_batch_rejects_oversized_batch(fake_model, monkeypatch):
+    monkeypatch.setattr(settings, "yolo_batch_max_frames", 2, raising=False)
+
+    client = TestClient(app)
+    resp = client.post("/detect/yolo/batch", json={
+        "images_base64": [_textured(1), _textured(2), _textured(3)],
+        "confidence_threshold": 0.25,
+    })
+
+    assert resp.status_code == 413
+    assert fake_model.calls == []
+
+
+def test_detect_batch_endpoint_returns_results_in_input_order(fake_model, monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "telemetry_dir", str(tmp_path), raising=False)
+
+    client = TestClient(app)
+    resp = client.post("/detect/yolo/batch", json={
+        "images_base64": [_black(), _textured(5)],
+        "confidence_threshold": 0.25,
+    })
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["frame_count"] == 2
+    assert data["inferred_count"] == 1
+    assert [r["frame_class"] for r in data["results"]] == ["too_dark", "relevant"]
+    assert data["total_time_ms"] >= data["inference_time_ms"]
+
@@ -0,0 +1,138 @@
+"""Tests fuer die YOLO-cls-Klassifikation: ONNX-/INT8-Pfad und /classify/yolo/batch."""
+
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+from fastapi.testclient import TestClient
+
+from sidecar.config import settings
+from sidecar.main import app
+from sidecar.models import yolo_wrapper
+
+NAMES = "{0: 'BAB', 1: 'BCA', 2: 'BCD'}"
+
+
+def _encode(arr: np.ndarray) -> str:
+    buf = io.BytesIO()
+    Image.fromarray(arr.astype(np.uint8)).save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode()
+
+
+def _solid(rgb, h: int = 40, w: int = 60) -> np.ndarray:
+    return np.full((h, w, 3), rgb, dtype=np.uint8)
+
+
+def _softmax_model(path, size: int = 32):
+    """Kanal-Mittelwerte -> MatMul -> Softmax: der dominante Eingangskanal (BGR) gewinnt."""
+    onnx = pytest.importorskip("onnx")
+    from onnx import TensorProto, helper
+
+    images = helper.make_tensor_value_info("images", TensorProto.FLOAT, ["batch", 3, size, size])
+    output = helper.make_tensor_value_info("output0", TensorProto.FLOAT, ["batch", 3])
+    weights = (np.eye(3, dtype=np.float32) * 3).flatten().tolist()
+    nodes = [
+        helper.make_node("ReduceMean", ["images", "axes"], ["means"], keepdims=0),
+        helper.make_node("MatMul", ["means", "weights"], ["logits"]),
+        helper.make_node("Softmax", ["logits"], ["output0"], axis=1),
+    ]
+    initializers = [
+        helper.make_tensor("axes", TensorProto.INT64, [2], [2, 3]),
+        helper.make_tensor("weights", TensorProto.FLOAT, [3, 3], weights),
+    ]
+    graph = helper.make_graph(nodes, "tiny_cls", [images], [output], initializers)
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 18)])
+    model.ir_version = 9
+    helper.set_model_props(model, {"names": NAMES})
+    onnx.save(model, str(path))
+    return path
+
+
+@pytest.fixture
+def onnx_classifier(tmp_path, monkeypatch):
+    pytest.importorskip("onnxruntime")
+    _softmax_model(tmp_path / "cls.onnx")
+    monkeypatch.setattr(yolo_wrapper, "_resolve_cls_model_path", lambda: str(tmp_path / "cls.pt"))
+    monkeypatch.setattr(yolo_wrapper, "_cls_model", None)
+    return tmp_path
+
+
+def test_top_k_is_sorted_per_row():
+    probs = np.array([[0.1, 0.6, 0.3], [0.5, 0.2, 0.3]], dtype=np.float32)
+
+    indices, values = yolo_wrapper._top_k(probs, 2)
+
+    assert indices.tolist() == [[1, 2], [0, 2]]
+    np.testing.assert_allclose(values, [[0.6, 0.3], [0.5, 0.3]])
+    assert yolo_wrapper._top_k(probs, 10)[0].shape == (2, 3)
+
+
+def test_onnx_classifier_is_used_when_export_exists(onnx_classifier):
+    red, blue = _solid((200, 0, 0)), _solid((0, 0, 200))
+
+    predictions, _ = yolo_wrapper.classify_arrays([red, blue], top_k=1)
+
+    assert [frame[0][0] for frame in predictions] == ["BCD", "BAB"]
+    assert yolo_wrapper.classify_array(red, top_k=3)[0][0] == "BCD"
+    assert yolo_wrapper.get_runtime_status()["classifier"]["backend"] == "onnxruntime"
+
+
+def test_int8_classifier_keeps_top_class(onnx_classifier, monkeypatch):
+    pytest.importorskip("onnxruntime.quantization")
+    monkeypatch.setattr(settings, "yolo_cls_quantize_int8", True, raising=False)
+
+    predictions, _ = yolo_wrapper.classify_arrays([_solid((0, 180, 0))], top_k=1)
+
+    assert yolo_wrapper._cls_model.quantized is True
+    assert (onnx_classifier / "cls.int8.onnx").exists()
+    assert predictions[0][0][0] == "BCA"
+
+
+def test_pytorch_probs_are_transferred_once(monkeypatch):
+    torch = pytest.importorskip("torch")
+
+    class _Probs:
+        def __init__(self, values):
+            self.data = torch.tensor(values)
+
+    class _Result:
+        def __init__(self, values):
+            self.probs = _Probs(values)
+
+    class _FakeClassifier:
+        names = {0: "BAB", 1: "BCA", 2: "BCD"}
+
+        def predict(self, source, verbose=False):
+            return [_Result([0.1, 0.2, 0.7]), _Result([0.005, 0.9, 0.095])]
+
+    monkeypatch.setattr(yolo_wrapper, "_cls_model", _FakeClassifier())
+
+    predictions, _ = yolo_wrapper.classify_arrays([_solid(0), _solid(0)], top_k=3)
+
+    assert [[name for name, _, _ in frame] for frame in predictions] == [["BCD", "BCA", "BAB"], ["BCA", "BCD"]]
+
+
+def test_batch_endpoint_keeps_input_order(onnx_classifier):
+    client = TestClient(app)
+    frames = [_solid((0, 0, 200)), _solid((200, 0, 0)), _solid((0, 200, 0))]
+
+    resp = client.post("/classify/yolo/batch", json={"images_base64": [_encode(f) for f in frames], "top_k": 2})
+
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["frame_count"] == 3
+    assert [result["predictions"][0]["class_name"] for result in data["results"]] == ["BAB", "BCD", "BCA"]
+    assert all(len(result["predictions"]) == 2 for result in data["results"])
+
+
+def test_batch_endpoint_rejects_oversized_and_ambiguous_requests(onnx_classifier, monkeypatch):
+    monkeypatch.setattr(settings, "yolo_cls_batch_max_frames", 1, raising=False)
+    client = TestClient(app)
+    image = _encode(_solid(0))
+
+    assert client.post("/classify/yolo/batch", json={"images_base64": [image, image]}).status_code == 413
+    assert client.post(
+        "/classify/yolo/batch", json={"images_base64": [image], "image_ids": ["abc"]},
+    ).status_code == 422